@@ -0,0 +1,171 @@
+#!/usr/bin/python3
+"""Replays a script of console commands through `HBNBCommand.onecmd` and
+reports the throughput and latency percentiles of each command type
+
+The script is read from `--script` (one command per line, as piped into
+`./console.py`), or generated: `--commands` commands mixing `create`,
+`show`, `update`, `all`, `count` and the `<class>.<method>(...)` syntax
+on a store seeded with `--objects` objects, whose ids the generated
+commands use. `--store` starts from a copy of an existing storage file
+instead, so a recorded script can be replayed against its data.
+
+Usage:
+    $ python3 -m benchmarks.bench_console [--objects 10000]
+        [--commands 5000] [--script commands.txt] [--store file.json]
+        [--seed 0] [--json results.json] [--fsync]
+"""
+import argparse
+import io
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from time import perf_counter
+from console import HBNBCommand
+from models import storage
+from models.engine.file_storage import FileStorage
+from .bench_storage import clear, create
+
+# (weight, template) of the generated commands; {cls} and {id} are those
+# of a random stored object
+mix = [
+    (10, "create {cls}"),
+    (20, "show {cls} {id}"),
+    (10, "update {cls} {id} name \"bench {n}\""),
+    (2, "all State"),
+    (10, "{cls}.count()"),
+    (20, "{cls}.show(\"{id}\")"),
+    (10, "{cls}.update(\"{id}\", \"name\", \"bench {n}\")"),
+    (5, "{cls}.update(\"{id}\", {{'name': \"bench {n}\", 'rank': {n}}})"),
+    (2, "{cls}.all()"),
+]
+dotted = re.compile(r'^\w+\.(\w+)\(')
+
+
+def command_type(line):
+    """`str`: returns the type of the command `line`, e.g. "show" or
+    "<class>.show()" """
+    match = dotted.match(line)
+    if match:
+        return "<class>.{}()".format(match.group(1))
+    return line.split(" ", 1)[0]
+
+
+def generate(count, seed):
+    """`list`: returns `count` commands drawn from `mix`, on the stored
+    objects"""
+    rng = random.Random(seed)
+    objects = list(storage.all().values())
+    weights = [weight for weight, template in mix]
+    templates = rng.choices([template for weight, template in mix],
+                            weights, k=count)
+    commands = []
+    for n, template in enumerate(templates):
+        obj = rng.choice(objects)
+        commands.append(template.format(cls=obj.__class__.__name__,
+                                        id=obj.id, n=n))
+    return commands
+
+
+def percentile(ordered, fraction):
+    """`float`: returns the `fraction` percentile of the sorted list
+    `ordered`"""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def replay(commands):
+    """`dict`: runs `commands`, discarding their output, and returns the
+    command type to latencies (in seconds) dictionary"""
+    console = HBNBCommand()
+    latencies = {}
+    with redirect_stdout(io.StringIO()) as output:
+        for line in commands:
+            start = perf_counter()
+            console.onecmd(line)
+            elapsed = perf_counter() - start
+            latencies.setdefault(command_type(line), []).append(elapsed)
+            output.seek(0)
+            output.truncate()
+    return latencies
+
+
+def summarize(latencies):
+    """`list`: returns a result dictionary per command type, and one for
+    all of them, with throughput and latency percentiles"""
+    everything = [value for values in latencies.values() for value in values]
+    results = []
+    for kind, values in sorted(latencies.items()) + [("total", everything)]:
+        ordered = sorted(values)
+        total = sum(ordered)
+        results.append({
+            'command': kind, 'count': len(ordered), 'seconds': total,
+            'commands_per_second': len(ordered) / total if total else 0,
+            'p50_ms': percentile(ordered, 0.50) * 1e3,
+            'p90_ms': percentile(ordered, 0.90) * 1e3,
+            'p99_ms': percentile(ordered, 0.99) * 1e3,
+            'max_ms': ordered[-1] * 1e3})
+    return results
+
+
+def main(argv=None):
+    """Replays the commands, prints a table of the results and writes them
+    as JSON if asked; returns the exit status"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--objects", type=int, default=10000,
+                        help="objects to seed the store with")
+    parser.add_argument("--commands", type=int, default=5000,
+                        help="commands to generate")
+    parser.add_argument("--script", help="file of commands to replay")
+    parser.add_argument("--store", help="storage file to start from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="file to write the results to")
+    parser.add_argument("--fsync", action="store_true",
+                        help="fsync saves (off by default)")
+    args = parser.parse_args(argv)
+    old_path = FileStorage._FileStorage__file_path
+    old_fsync = FileStorage._FileStorage__fsync
+    FileStorage._FileStorage__fsync = args.fsync
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "file.json")
+            FileStorage._FileStorage__file_path = path
+            clear()
+            if args.store:
+                shutil.copy(args.store, path)
+                storage.reload()
+            else:
+                create(args.objects)
+                storage.save()
+            if args.script:
+                with open(args.script, 'r', encoding='utf-8') as file:
+                    commands = [line.strip() for line in file
+                                if line.strip()]
+            else:
+                commands = generate(args.commands, args.seed)
+            results = summarize(replay(commands))
+            stored = storage.count()
+    finally:
+        clear()
+        FileStorage._FileStorage__file_path = old_path
+        FileStorage._FileStorage__fsync = old_fsync
+    print("{} commands on {} objects".format(len(commands), stored))
+    print("{:<22} {:>6} {:>10} {:>9} {:>9} {:>9} {:>9}".format(
+        "command", "count", "cmds/s", "p50 ms", "p90 ms", "p99 ms",
+        "max ms"))
+    for result in results:
+        print("{command:<22} {count:>6} {commands_per_second:>10.1f} "
+              "{p50_ms:>9.3f} {p90_ms:>9.3f} {p99_ms:>9.3f} "
+              "{max_ms:>9.3f}".format(**result))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'objects': stored, 'commands': len(commands),
+                       'results': results}, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""Measures the peak memory (RSS) of `FileStorage.save` on a JSON store,
+writing each object as it is encoded versus building the whole
+`objects_json` dictionary and text first
+
+Each mode runs in its own process, as the peak RSS of a process never
+goes down.
+
+Usage:
+    $ python3 -m benchmarks.bench_memory [<number of objects>]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+from models import storage
+from models.engine.atomic import atomic_write
+from models.engine.file_storage import FileStorage
+from .bench_reload import make_store
+
+modes = {
+    "objects_json dict": "build every to_dict() copy, then dump them",
+    "streamed, cached": "write each object, keep encoded fragments",
+    "streamed": "write each object, cache nothing (HBNB_FS_STREAM=1)",
+}
+
+
+def peak_rss():
+    """`float`: returns the peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def save_whole():
+    """Saves the store the way `save` did before it streamed: a full
+    dictionary of `to_dict` copies, dumped to one string"""
+    objects_json = {key: obj.to_dict()
+                    for key, obj in storage.all().items()}
+    codec = FileStorage._FileStorage__codec
+    with atomic_write(FileStorage._FileStorage__file_path, False,
+                      False) as file:
+        file.write(codec.dumps(objects_json))
+
+
+def measure(mode, path):
+    """Prints the peak RSS of reloading `path`, then of saving it in
+    `mode`, as a tab separated line"""
+    FileStorage._FileStorage__file_path = path
+    FileStorage._FileStorage__fsync = False
+    # a streamed reload keeps its own peak below that of any save
+    FileStorage._FileStorage__stream = True
+    storage._FileStorage__objects = {}
+    storage.reload()
+    loaded = peak_rss()
+    FileStorage._FileStorage__stream = mode == "streamed"
+    start = perf_counter()
+    if mode == "objects_json dict":
+        save_whole()
+    else:
+        storage.save()
+    print("{}\t{:.1f}\t{:.1f}\t{:.3f}".format(
+        mode, loaded, peak_rss(), perf_counter() - start))
+
+
+def main(count=1000000):
+    """Prints the peak RSS of saving a `count` object store in each
+    mode"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "file.json")
+        make_store(path, count)
+        print("{} objects, {:.1f} MB file".format(
+            count, os.path.getsize(path) / (1 << 20)))
+        for mode, description in modes.items():
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_memory", "--mode",
+                 mode, path], capture_output=True, text=True, check=True)
+            mode, loaded, peak, elapsed = output.stdout.split("\t")
+            print("{} ({}): peak RSS {} MB after reload, {} MB after save "
+                  "(+{:.1f} MB) in {:.3f}s".format(
+                      mode, description, loaded, peak,
+                      float(peak) - float(loaded), float(elapsed)))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == "--mode":
+        measure(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+"""Compares searches for the places near a point through the spatial grid
+index of `storage.near` with measuring the distance to every place
+
+`--count` places are created at random points between latitudes 35 and
+60 and longitudes -10 and 40, an area about the size of Europe. The same
+searches within 1, 10 and 50 km, and for the 10 nearest places within
+50 km, are then timed as a scan of every place and through `near`. The
+time to build the index, its memory and the cost it adds to moving a
+place are reported too.
+
+Usage:
+    $ python3 -m benchmarks.bench_near [--count 1000000] [--queries 20]
+        [--seed 0] [--json results.json]
+"""
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+from heapq import nsmallest
+from time import perf_counter
+from models import storage
+from models.engine import spatial_index
+from models.engine.spatial_index import SpatialIndex, distances
+from models.place import Place
+from .bench_storage import clear
+
+region = ((35.0, 60.0), (-10.0, 40.0))
+
+
+def point(rng):
+    """`tuple`: returns a random `(lat, lon)` point of `region`"""
+    return (rng.uniform(*region[0]), rng.uniform(*region[1]))
+
+
+def create(count, rng):
+    """`list`: creates and returns `count` places at random points"""
+    places = []
+    for i in range(count):
+        place = Place()
+        place.latitude, place.longitude = point(rng)
+        places.append(place)
+    return places
+
+
+def scan(lat, lon, radius, limit):
+    """`list`: returns the places within `radius` km of the point at
+    `lat`, `lon`, nearest first, measuring the distance to every place"""
+    places = list(storage.all(Place).values())
+    found = distances(lat, lon, [(place.latitude, place.longitude)
+                                 for place in places])
+    pairs = [(distance, i) for i, distance in enumerate(found)
+             if distance <= radius]
+    pairs = sorted(pairs) if limit is None else nsmallest(limit, pairs)
+    return [places[i] for distance, i in pairs]
+
+
+def run(kinds, search):
+    """`dict`: runs the searches of each kind through `search` and returns
+    the kind to `(mean seconds, mean results)` dictionary"""
+    results = {}
+    for kind, batch in kinds.items():
+        found = 0
+        start = perf_counter()
+        for args in batch:
+            found += len(search(*args))
+        results[kind] = ((perf_counter() - start) / len(batch),
+                         found / len(batch))
+    return results
+
+
+def updates(places, rng):
+    """`float`: returns the mean seconds of moving random places"""
+    sample = rng.sample(places, min(10000, len(places)))
+    start = perf_counter()
+    for place in sample:
+        place.latitude, place.longitude = point(rng)
+    return (perf_counter() - start) / len(sample)
+
+
+def main(argv=None):
+    """Runs the benchmark, prints a table of the results and writes them
+    as JSON if asked; returns the exit status"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--count", type=int, default=1000000,
+                        help="places to create")
+    parser.add_argument("--queries", type=int, default=20,
+                        help="searches of each kind")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="file to write the results to")
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+    clear()
+    storage._FileStorage__spatial = None
+    try:
+        places = create(args.count, rng)
+        kinds = {}
+        for radius, limit in ((1, None), (10, None), (50, None), (50, 10)):
+            kind = "within {} km{}".format(
+                radius, "" if limit is None else ", {} nearest".format(limit))
+            kinds[kind] = [point(rng) + (radius, limit)
+                           for i in range(args.queries)]
+        scanned = run(kinds, scan)
+        scan_update = updates(places, rng)
+        tracemalloc.start()
+        index = SpatialIndex()
+        index.rebuild(storage.all(Place))
+        index_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del index
+        start = perf_counter()
+        storage.near(0, 0, 0)
+        build = perf_counter() - start
+        indexed = run(kinds, storage.near)
+        indexed_update = updates(places, rng)
+    finally:
+        storage._FileStorage__spatial = None
+        clear()
+    results = [{'operation': kind, 'scan_ms': scanned[kind][0] * 1e3,
+                'indexed_ms': indexed[kind][0] * 1e3,
+                'speedup': scanned[kind][0] / indexed[kind][0],
+                'results': scanned[kind][1]} for kind in kinds]
+    print("{} places, {} searches of each kind, {}".format(
+        args.count, args.queries,
+        "NumPy" if spatial_index.numpy is not None else "no NumPy"))
+    print("{:<26} {:>10} {:>12} {:>10} {:>10}".format(
+        "search", "scan ms", "indexed ms", "speedup", "results"))
+    for result in results:
+        print("{operation:<26} {scan_ms:>10.3f} {indexed_ms:>12.3f} "
+              "{speedup:>9.1f}x {results:>10.1f}".format(**result))
+    print("building the index: {:.3f}s, {:.1f} MB".format(
+        build, index_bytes / 2 ** 20))
+    print("moving a place: {:.2f}us, {:.2f}us without index".format(
+        indexed_update * 1e6, scan_update * 1e6))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'count': args.count, 'queries': args.queries,
+                       'numpy': spatial_index.numpy is not None,
+                       'build_seconds': build, 'index_bytes': index_bytes,
+                       'update_us': indexed_update * 1e6,
+                       'update_us_no_index': scan_update * 1e6,
+                       'results': results}, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
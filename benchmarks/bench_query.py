@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+"""Compares range queries on the numeric fields of `Place` through sorted
+indexes with a linear scan of every place
+
+`--count` places are created with random prices, guests, rooms and
+bathrooms. The same queries are then timed with no index, which scans
+every place, and with a sorted index of each of the four fields: range
+queries on `price_by_night` matching about 0.1%, 1% and 10% of the
+places, and a query combining ranges on all four fields. The time to
+build the indexes, their memory and the cost they add to setting an
+indexed field are reported too.
+
+Usage:
+    $ python3 -m benchmarks.bench_query [--count 1000000] [--queries 20]
+        [--seed 0] [--json results.json]
+"""
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+from time import perf_counter
+from models import storage
+from models.place import Place
+from .bench_storage import clear
+
+fields = {"price_by_night": 1000, "max_guest": 16, "number_rooms": 10,
+          "number_bathrooms": 5}
+
+
+def create(count, rng):
+    """`list`: creates and returns `count` places with random values of
+    `fields`, each between 1 and its maximum"""
+    places = []
+    for i in range(count):
+        place = Place()
+        for field, top in fields.items():
+            setattr(place, field, rng.randint(1, top))
+        places.append(place)
+    return places
+
+
+def queries(count, rng):
+    """`dict`: returns `count` queries of each kind, by kind"""
+    kinds = {}
+    for share in (0.001, 0.01, 0.1):
+        width = max(1, int(fields["price_by_night"] * share))
+        kind = "price range {:g}%".format(share * 100)
+        kinds[kind] = []
+        for i in range(count):
+            low = rng.randint(1, fields["price_by_night"] - width + 1)
+            kinds[kind].append(storage.query(Place).where(
+                price_by_night__gte=low, price_by_night__lt=low + width))
+    kinds["four ranges"] = [
+        storage.query(Place).where(
+            price_by_night__lte=rng.randint(50, 300),
+            max_guest__gte=rng.randint(8, 14),
+            number_rooms__gte=rng.randint(4, 8),
+            number_bathrooms__lte=rng.randint(1, 3))
+        for i in range(count)]
+    return kinds
+
+
+def run(kinds):
+    """`dict`: runs the queries and returns the kind to `(mean seconds,
+    mean results)` dictionary"""
+    results = {}
+    for kind, batch in kinds.items():
+        found = 0
+        start = perf_counter()
+        for query in batch:
+            found += len(query.all())
+        results[kind] = ((perf_counter() - start) / len(batch),
+                         found / len(batch))
+    return results
+
+
+def add_indexes():
+    """`float`: declares a sorted index of each of `fields` and returns
+    the seconds it took"""
+    start = perf_counter()
+    for field in fields:
+        storage.add_index(Place, field, "sorted")
+    return perf_counter() - start
+
+
+def drop_indexes():
+    """Drops the indexes of `fields`"""
+    for field in fields:
+        storage.drop_index(Place, field)
+
+
+def updates(places, rng):
+    """`float`: returns the mean seconds of setting the price of random
+    places"""
+    sample = rng.sample(places, min(10000, len(places)))
+    start = perf_counter()
+    for place in sample:
+        place.price_by_night = rng.randint(1, fields["price_by_night"])
+    return (perf_counter() - start) / len(sample)
+
+
+def main(argv=None):
+    """Runs the benchmark, prints a table of the results and writes them
+    as JSON if asked; returns the exit status"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--count", type=int, default=1000000,
+                        help="places to create")
+    parser.add_argument("--queries", type=int, default=20,
+                        help="queries of each kind")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="file to write the results to")
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+    clear()
+    drop_indexes()
+    try:
+        places = create(args.count, rng)
+        kinds = queries(args.queries, rng)
+        scan = run(kinds)
+        scan_update = updates(places, rng)
+        tracemalloc.start()
+        add_indexes()
+        index_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        drop_indexes()
+        build = add_indexes()
+        indexed = run(kinds)
+        indexed_update = updates(places, rng)
+    finally:
+        drop_indexes()
+        clear()
+    results = [{'operation': kind, 'scan_ms': scan[kind][0] * 1e3,
+                'indexed_ms': indexed[kind][0] * 1e3,
+                'speedup': scan[kind][0] / indexed[kind][0],
+                'results': scan[kind][1]} for kind in kinds]
+    print("{} places, {} queries of each kind".format(args.count,
+                                                      args.queries))
+    print("{:<22} {:>10} {:>12} {:>10} {:>10}".format(
+        "query", "scan ms", "indexed ms", "speedup", "results"))
+    for result in results:
+        print("{operation:<22} {scan_ms:>10.3f} {indexed_ms:>12.3f} "
+              "{speedup:>9.1f}x {results:>10.1f}".format(**result))
+    print("building the 4 indexes: {:.3f}s, {:.1f} MB".format(
+        build, index_bytes / 2 ** 20))
+    print("setting an indexed price: {:.2f}us, {:.2f}us without "
+          "index".format(indexed_update * 1e6, scan_update * 1e6))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'count': args.count, 'queries': args.queries,
+                       'build_seconds': build, 'index_bytes': index_bytes,
+                       'update_us': indexed_update * 1e6,
+                       'update_us_no_index': scan_update * 1e6,
+                       'results': results}, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""Measures how long `FileStorage.reload` takes to hydrate a store from
+its JSON and pickle snapshots
+
+Usage:
+    $ python3 -m benchmarks.bench_reload [<number of objects>]
+"""
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+from time import perf_counter
+from uuid import uuid4
+from models import storage, class_dict
+from models.engine.file_storage import FileStorage
+
+
+def make_store(path, count):
+    """Writes a `file.json` like store of `count` objects to `path`"""
+    names = list(class_dict.keys())
+    now = datetime.now().isoformat()
+    objects_json = {}
+    for i in range(count):
+        name = names[i % len(names)]
+        obj_id = str(uuid4())
+        objects_json[name + "." + obj_id] = {
+            "id": obj_id, "created_at": now, "updated_at": now,
+            "__class__": name, "name": "object {}".format(i)}
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(objects_json, file)
+
+
+def time_reload(path):
+    """`float`: returns the seconds `storage.reload` takes on `path`"""
+    FileStorage._FileStorage__file_path = path
+    storage._FileStorage__objects = {}
+    start = perf_counter()
+    storage.reload()
+    return perf_counter() - start
+
+
+def main(count=100000):
+    """Prints the reload time of a `count` object store per 100k objects,
+    for both the JSON and the pickle snapshot formats"""
+    old_path = FileStorage._FileStorage__file_path
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "file.json")
+        make_store(path, count)
+        storage.convert(path, os.path.join(tmp, "file.pickle"))
+        for name in ("file.json", "file.pickle"):
+            elapsed = time_reload(os.path.join(tmp, name))
+            print("reload {}: {} objects in {:.3f}s ({:.3f}s per 100k "
+                  "objects)".format(name, count, elapsed,
+                                    elapsed * 100000 / count))
+    FileStorage._FileStorage__file_path = old_path
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""Measures the cost of crash-safe `FileStorage.save` calls, with and
+without fsync, against writing the file in place
+
+Usage:
+    $ python3 -m benchmarks.bench_save [<number of objects>]
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from time import perf_counter
+from unittest.mock import patch
+from models import storage
+from models.engine.file_storage import FileStorage
+from .bench_reload import make_store
+
+
+def time_save(repeat=5):
+    """`float`: returns the best time of `repeat` `storage.save` calls"""
+    best = None
+    for i in range(repeat):
+        start = perf_counter()
+        storage.save()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+@contextmanager
+def in_place_write(path, binary=False, fsync=True):
+    """Stands in for `atomic_write` to write `path` in place, as saves
+    did before they were made crash-safe"""
+    with open(path, 'wb' if binary else 'w',
+              encoding=None if binary else 'utf-8') as file:
+        yield file
+
+
+def main(count=100000):
+    """Prints the save time of a `count` object store in each mode"""
+    old_path = FileStorage._FileStorage__file_path
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "file.json")
+        make_store(path, count)
+        FileStorage._FileStorage__file_path = path
+        storage._FileStorage__objects = {}
+        storage.reload()
+        storage.save()
+        with patch('models.engine.file_storage.atomic_write',
+                   in_place_write):
+            results = [("in place save", time_save())]
+        FileStorage._FileStorage__fsync = False
+        results.append(("atomic save, no fsync", time_save()))
+        FileStorage._FileStorage__fsync = True
+        results.append(("atomic save, fsync", time_save()))
+    FileStorage._FileStorage__file_path = old_path
+    for name, elapsed in results:
+        print("{}: {} objects in {:.3f}s ({:+.1f}% over in place)".format(
+            name, count, elapsed, (elapsed / results[0][1] - 1) * 100))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
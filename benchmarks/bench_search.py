@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+"""Compares word searches over the text of reviews through the inverted
+index of `storage.search` with substring matching every review
+
+`--count` reviews are created with `--words` words each, drawn from a
+vocabulary of 20,000 words with Zipf-like frequencies, as in natural text.
+The same searches for a rare word, a common word, two words and a word
+prefix are then timed as a scan of every review, keeping those whose
+lowercased text contains any of the words, and through `search` for the
+10 best matches. The time to build the index, its memory and the cost it
+adds to changing the text of a review are reported too.
+
+Usage:
+    $ python3 -m benchmarks.bench_search [--count 100000] [--words 30]
+        [--queries 20] [--seed 0] [--json results.json]
+"""
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+from itertools import accumulate
+from time import perf_counter
+from models import storage
+from models.engine.text_index import InvertedIndex
+from models.review import Review
+from .bench_storage import clear
+
+vocabulary = ["{}{}".format(stem, i) for i in range(2000)
+              for stem in ("room", "host", "view", "bed", "stay", "walk",
+                           "clean", "quiet", "place", "city")]
+weights = list(accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+
+
+def text(count, rng):
+    """`str`: returns a text of `count` random words"""
+    return " ".join(rng.choices(vocabulary, cum_weights=weights, k=count))
+
+
+def create(count, words, rng):
+    """`list`: creates and returns `count` reviews of `words` words"""
+    reviews = []
+    for i in range(count):
+        review = Review()
+        review.text = text(words, rng)
+        reviews.append(review)
+    return reviews
+
+
+def scan(words, limit):
+    """`list`: returns the reviews whose text contains any of `words`, up
+    to `limit` of them, matching the text of every review"""
+    words = [word.rstrip("*") for word in words.split()]
+    found = []
+    for review in storage.all(Review).values():
+        body = review.text.lower()
+        if any(word in body for word in words):
+            found.append(review)
+    return found[:limit]
+
+
+def search(words, limit):
+    """`list`: returns the `limit` best matches of `words`"""
+    return storage.search(Review, words, limit)
+
+
+def run(kinds, find):
+    """`dict`: runs the searches of each kind through `find` and returns the
+    kind to mean seconds dictionary"""
+    results = {}
+    for kind, batch in kinds.items():
+        start = perf_counter()
+        for words in batch:
+            find(words, 10)
+        results[kind] = (perf_counter() - start) / len(batch)
+    return results
+
+
+def updates(reviews, words, rng):
+    """`float`: returns the mean seconds of changing the text of random
+    reviews"""
+    sample = rng.sample(reviews, min(10000, len(reviews)))
+    start = perf_counter()
+    for review in sample:
+        review.text = text(words, rng)
+    return (perf_counter() - start) / len(sample)
+
+
+def main(argv=None):
+    """Runs the benchmark, prints a table of the results and writes them
+    as JSON if asked; returns the exit status"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--count", type=int, default=100000,
+                        help="reviews to create")
+    parser.add_argument("--words", type=int, default=30,
+                        help="words per review")
+    parser.add_argument("--queries", type=int, default=20,
+                        help="searches of each kind")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="file to write the results to")
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+    clear()
+    try:
+        reviews = create(args.count, args.words, rng)
+        rare, common = vocabulary[-5000:], vocabulary[:50]
+        kinds = {
+            "rare word": [rng.choice(rare) for i in range(args.queries)],
+            "common word": [rng.choice(common) for i in range(args.queries)],
+            "two words": ["{} {}".format(rng.choice(common),
+                                         rng.choice(rare))
+                          for i in range(args.queries)],
+            "prefix": [rng.choice(rare)[:-1] + "*"
+                       for i in range(args.queries)]}
+        scanned = run(kinds, scan)
+        scan_update = updates(reviews, args.words, rng)
+        tracemalloc.start()
+        index = InvertedIndex(("text",))
+        index.rebuild(storage.all(Review))
+        index_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del index
+        start = perf_counter()
+        storage.search(Review, "")
+        build = perf_counter() - start
+        indexed = run(kinds, search)
+        indexed_update = updates(reviews, args.words, rng)
+    finally:
+        clear()
+    results = [{'operation': kind, 'scan_ms': scanned[kind] * 1e3,
+                'indexed_ms': indexed[kind] * 1e3,
+                'speedup': scanned[kind] / indexed[kind]} for kind in kinds]
+    print("{} reviews of {} words, {} searches of each kind".format(
+        args.count, args.words, args.queries))
+    print("{:<14} {:>10} {:>12} {:>10}".format(
+        "search", "scan ms", "indexed ms", "speedup"))
+    for result in results:
+        print("{operation:<14} {scan_ms:>10.3f} {indexed_ms:>12.3f} "
+              "{speedup:>9.1f}x".format(**result))
+    print("building the index: {:.3f}s, {:.1f} MB".format(
+        build, index_bytes / 2 ** 20))
+    print("changing a text: {:.2f}us, {:.2f}us without index".format(
+        indexed_update * 1e6, scan_update * 1e6))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'count': args.count, 'words': args.words,
+                       'queries': args.queries, 'build_seconds': build,
+                       'index_bytes': index_bytes,
+                       'update_us': indexed_update * 1e6,
+                       'update_us_no_index': scan_update * 1e6,
+                       'results': results}, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
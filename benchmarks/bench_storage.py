@@ -0,0 +1,173 @@
+#!/usr/bin/python3
+"""Measures the hot paths of `FileStorage` at several store sizes:
+creating objects, saving, reloading, `all`, `count`, `get` and a few
+console commands, and optionally checks the results against a baseline
+
+Each operation is run `--repeat` times and its best time is kept. The
+results can be written as JSON with `--json`, and compared to such a
+file with `--compare`, in which case the exit status is 1 if any
+operation got slower than `--threshold` times its baseline.
+
+Usage:
+    $ python3 -m benchmarks.bench_storage [--sizes 10000,100000,1000000]
+        [--repeat 3] [--json results.json] [--compare baseline.json]
+        [--threshold 1.25] [--fsync]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from time import perf_counter
+from console import HBNBCommand
+from models import storage
+from models.engine.file_storage import FileStorage
+
+
+def best_time(operation, repeat, setup=None):
+    """`float`: returns the best time in seconds of `repeat` calls of
+    `operation`, each preceded by an untimed call of `setup` if given"""
+    best = None
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        start = perf_counter()
+        operation()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def create(count):
+    """Creates `count` objects, cycling through the model classes"""
+    classes = list(storage.classes().values())
+    for i in range(count):
+        classes[i % len(classes)]()
+
+
+def clear():
+    """Empties the storage"""
+    storage._FileStorage__objects = {}
+    storage._FileStorage__fragments.clear()
+
+
+def run_console(commands):
+    """Runs each of the console `commands`, discarding their output"""
+    console = HBNBCommand()
+    with redirect_stdout(io.StringIO()):
+        for command in commands:
+            console.onecmd(command)
+
+
+def measure(size, repeat):
+    """`list`: returns `(operation, seconds, calls)` tuples for a store of
+    `size` objects, `calls` being the number of calls timed"""
+    results = []
+
+    def record(operation, seconds, calls=1):
+        results.append((operation, seconds, calls))
+
+    record("new", best_time(lambda: create(size), repeat, clear), size)
+    record("save (cold)", best_time(
+        storage.save, repeat, storage._FileStorage__fragments.clear))
+    record("save (warm)", best_time(storage.save, repeat))
+    objects = list(storage.all().values())
+    touched = objects[::100]
+
+    def touch():
+        for obj in touched:
+            obj.name = "touched"
+    record("save (1% changed)", best_time(storage.save, repeat, touch))
+    record("reload", best_time(storage.reload, repeat, clear))
+    record("all", best_time(storage.all, repeat))
+    for name in storage.classes():
+        record("all({})".format(name),
+               best_time(lambda: storage.all(name), repeat))
+    record("count", best_time(storage.count, repeat))
+    record("count(cls)", best_time(
+        lambda: [storage.count(name) for name in storage.classes()],
+        repeat), len(storage.classes()))
+    sample = random.Random(0).sample(objects, min(1000, len(objects)))
+    record("get", best_time(
+        lambda: [storage.get(obj.__class__, obj.id) for obj in sample],
+        repeat), len(sample))
+    show = ["show {} {}".format(obj.__class__.__name__, obj.id)
+            for obj in sample[:100]]
+    record("console show", best_time(lambda: run_console(show), repeat),
+           len(show))
+    count = ["{}.count()".format(name) for name in storage.classes()]
+    record("console <class>.count()",
+           best_time(lambda: run_console(count), repeat), len(count))
+    record("console all State", best_time(
+        lambda: run_console(["all State"]), repeat))
+    return results
+
+
+def compare(results, path, threshold):
+    """`bool`: prints the operations of `results` slower than `threshold`
+    times their time in the JSON results file at `path`, and returns
+    whether there were any"""
+    with open(path, 'r', encoding='utf-8') as file:
+        baseline = {(r['size'], r['operation']): r['seconds']
+                    for r in json.load(file)['results']}
+    regressed = False
+    for result in results:
+        before = baseline.get((result['size'], result['operation']))
+        if before and result['seconds'] > before * threshold:
+            regressed = True
+            print("REGRESSION {} @ {}: {:.6f}s -> {:.6f}s ({:.2f}x)".format(
+                result['operation'], result['size'], before,
+                result['seconds'], result['seconds'] / before))
+    return regressed
+
+
+def main(argv=None):
+    """Runs the benchmarks, prints a table of the results and writes or
+    compares them as asked; returns the exit status"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", default="10000,100000",
+                        help="comma separated store sizes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="file to write the results to")
+    parser.add_argument("--compare", help="results file to compare to")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--fsync", action="store_true",
+                        help="fsync saves (off by default)")
+    args = parser.parse_args(argv)
+    old_path = FileStorage._FileStorage__file_path
+    old_fsync = FileStorage._FileStorage__fsync
+    FileStorage._FileStorage__fsync = args.fsync
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            FileStorage._FileStorage__file_path = os.path.join(tmp,
+                                                               "file.json")
+            for size in map(int, args.sizes.split(",")):
+                clear()
+                for operation, seconds, calls in measure(size, args.repeat):
+                    results.append({'size': size, 'operation': operation,
+                                    'seconds': seconds, 'calls': calls,
+                                    'us_per_call': seconds / calls * 1e6})
+                    print("{:>8} {:<28} {:10.6f}s {:12.3f}us/call".format(
+                        size, operation, seconds, seconds / calls * 1e6))
+    finally:
+        clear()
+        FileStorage._FileStorage__file_path = old_path
+        FileStorage._FileStorage__fsync = old_fsync
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'python': platform.python_version(),
+                       'codec': FileStorage._FileStorage__codec.name,
+                       'repeat': args.repeat, 'results': results},
+                      file, indent=2)
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -40,15 +40,13 @@ class HBNBCommand(cmd.Cmd):
         """$ show <class name> <id>
         Prints the string representation of an instance"""
         if not self.errorCheck(arg):
-            key = arg.split()[0] + "." + arg.split()[1]
-            print(storage.all()[key])
+            print(storage.get(arg.split()[0], arg.split()[1]))
 
     def do_destroy(self, arg):
         """$ destroy <class name> <id>
         Deletes an instance based on the class name and id"""
         if not self.errorCheck(arg):
-            key = arg.split()[0] + "." + arg.split()[1]
-            del storage.all()[key]
+            storage.delete(storage.get(arg.split()[0], arg.split()[1]))
             storage.save()
 
     def do_all(self, arg):
@@ -58,8 +56,7 @@ class HBNBCommand(cmd.Cmd):
             objs = [str(obj) for obj in storage.all().values()]
             print(objs)
         elif arg in classes:
-            objs = [str(obj)
-                    for key, obj in storage.all().items() if arg in key]
+            objs = [str(obj) for obj in storage.all(arg).values()]
             print(objs)
         else:
             print("** class doesn't exist **")
@@ -75,9 +72,10 @@ class HBNBCommand(cmd.Cmd):
             print("** attribute name missing **")
         elif len(args) < 4:
             print("** value missing **")
+        elif self.readOnly(storage.get(args[0], args[1]), args[2]):
+            print("** attribute can't be updated **")
         else:
-            key = args[0] + "." + args[1]
-            obj = storage.all()[key]
+            obj = storage.get(args[0], args[1])
             if hasattr(obj, args[2]):
                 attr_type = type(getattr(obj, args[2]))
                 setattr(obj, args[2], attr_type(args[3]))
@@ -85,6 +83,78 @@ class HBNBCommand(cmd.Cmd):
                 setattr(obj, args[2], args[3])
             obj.save()
 
+    def do_convert(self, arg):
+        """$ convert <source file> <destination file>
+        Converts a storage file between the storage formats"""
+        from os.path import isfile
+        from pickle import UnpicklingError
+        args = arg.split()
+        if len(args) == 0:
+            print("** source file missing **")
+        elif len(args) == 1:
+            print("** destination file missing **")
+        elif not hasattr(storage, "convert"):
+            print("** storage can't convert files **")
+        elif not isfile(args[0]):
+            print("** source file doesn't exist **")
+        else:
+            try:
+                storage.convert(args[0], args[1])
+            except (ValueError, EOFError, UnpicklingError):
+                print("** source file is invalid **")
+            except OSError as e:
+                if e.filename == args[0]:
+                    print("** source file can't be read **")
+                else:
+                    print("** destination file can't be written **")
+
+    def do_near(self, arg):
+        """$ near <latitude> <longitude> <radius in km> [<limit>]
+        Prints the places within a radius of a point, nearest first"""
+        args = arg.split()
+        if len(args) == 0:
+            print("** latitude missing **")
+        elif len(args) == 1:
+            print("** longitude missing **")
+        elif len(args) == 2:
+            print("** radius missing **")
+        else:
+            try:
+                lat, lon, radius = (float(value) for value in args[:3])
+                limit = int(args[3]) if len(args) > 3 else None
+                objs = storage.near(lat, lon, radius, limit)
+            except ValueError:
+                print("** invalid location **")
+                return
+            print([str(obj) for obj in objs])
+
+    def do_search(self, arg):
+        """$ search <class name> "<words>" [<limit>]
+        Prints the instances whose texts best match the words"""
+        from shlex import split
+        try:
+            args = split(arg)
+        except ValueError:
+            args = arg.split()
+        if len(args) == 0:
+            print("** class name missing **")
+        elif args[0] not in classes:
+            print("** class doesn't exist **")
+        elif len(args) == 1:
+            print("** words missing **")
+        else:
+            try:
+                limit = int(args[2]) if len(args) > 2 else None
+            except ValueError:
+                print("** invalid limit **")
+                return
+            try:
+                objs = storage.search(args[0], args[1], limit)
+            except ValueError:
+                print("** class can't be searched **")
+                return
+            print([str(obj) for obj in objs])
+
     def help_create(self):
         print("$ create <class name>",
               "Create a new instance of a class", sep="\n")
@@ -105,6 +175,21 @@ class HBNBCommand(cmd.Cmd):
         print("$ update <class name> <id> <attribute name> '<value>'",
               "Updates an instance based on the class name and id", sep="\n")
 
+    def help_convert(self):
+        print("$ convert <source file> <destination file>",
+              "Converts a storage file between the storage formats",
+              sep="\n")
+
+    def help_search(self):
+        print('$ search <class name> "<words>" [<limit>]',
+              "Prints the instances whose texts best match the words",
+              sep="\n")
+
+    def help_near(self):
+        print("$ near <latitude> <longitude> <radius in km> [<limit>]",
+              "Prints the places within a radius of a point, nearest first",
+              sep="\n")
+
     def default(self, line):
         """Called for the following commands:
         <class name>.all()
@@ -112,6 +197,8 @@ class HBNBCommand(cmd.Cmd):
         <class name>.show(<id>)
         <class name>.destroy(<id>)
         <class name>.update(<id>, <attribute name>, <attribute value>)
+        <class name>.where(<field>[__<op>]=<value>, ..., [order_by=<field>],
+                           [limit=<count>], [offset=<count>])
         """
         from re import compile
         from ast import literal_eval
@@ -125,9 +212,7 @@ class HBNBCommand(cmd.Cmd):
                 if cmdComm[0] not in classes:
                     print("** class doesn't exist **")
                     return
-                objs = [obj for key, obj in storage.all().items()
-                        if cmdComm[0] in key]
-                print(len(objs))
+                print(storage.count(cmdComm[0]))
             elif command[0] == "show":
                 id = command[1][:-1].strip("\"")
                 self.do_show(f"{cmdComm[0]} {id}")
@@ -145,7 +230,8 @@ class HBNBCommand(cmd.Cmd):
                     return
                 args = args.groups()
                 id = args[0].strip("\"")
-                if (cmdComm[0] + "." + id) not in storage.all():
+                obj = storage.get(cmdComm[0], id)
+                if obj is None:
                     print("** no instance found **")
                     return
                 if not args[1]:
@@ -154,8 +240,13 @@ class HBNBCommand(cmd.Cmd):
                 attrs = args[1]
                 if attrs.startswith('{') and attrs.endswith('}'):
                     attrs = literal_eval(attrs)
-                    for attr, value in attrs.items():
-                        self.do_update(f"{cmdComm[0]} {id} {attr} {value}")
+                    if any(self.readOnly(obj, attr) for attr in attrs):
+                        print("** attribute can't be updated **")
+                        return
+                    with storage.batch():
+                        for attr, value in attrs.items():
+                            self.do_update(
+                                f"{cmdComm[0]} {id} {attr} {value}")
                 else:
                     args = attrs.split(",")
                     if len(args) < 2:
@@ -164,18 +255,54 @@ class HBNBCommand(cmd.Cmd):
                     attr = args[0].strip().strip("\"")
                     value = args[1].strip()
                     self.do_update(f"{cmdComm[0]} {id} {attr} {value}")
+            elif command[0] == "where":
+                if cmdComm[0] not in classes:
+                    print("** class doesn't exist **")
+                    return
+                self.where(cmdComm[0], cmdComm[1][1:].partition("(")[2])
             else:
                 return super().default(line)
         else:
             return super().default(line)
 
+    @staticmethod
+    def where(cls, arg):
+        """Prints the instances of the class named `cls` matching the
+        keyword arguments `arg` of a `<class name>.where(...)` call:
+        `Query.where` conditions, and the `order_by` (a field or list of
+        fields), `limit` and `offset` of the results"""
+        from ast import literal_eval, parse
+        try:
+            call = parse("where({}".format(arg), mode="eval").body
+            if call.args or not all(kw.arg for kw in call.keywords):
+                raise ValueError
+            conditions = {kw.arg: literal_eval(kw.value)
+                          for kw in call.keywords}
+            query = storage.query(cls)
+            order_by = conditions.pop("order_by", ())
+            if isinstance(order_by, str):
+                order_by = (order_by,)
+            if order_by:
+                query = query.order_by(*order_by)
+            if "limit" in conditions:
+                query = query.limit(int(conditions.pop("limit")))
+            if "offset" in conditions:
+                query = query.offset(int(conditions.pop("offset")))
+            objs = query.where(**conditions).all()
+        except (SyntaxError, TypeError, ValueError):
+            print("** invalid query **")
+            return
+        print([str(obj) for obj in objs])
+
     def do_quit(self, arg):
         """Quit command to exit the program"""
+        storage.flush()
         return True
 
     def do_EOF(self, arg):
         """EOF command to exit the program"""
         print()
+        storage.flush()
         return True
 
     def emptyline(self):
@@ -193,11 +320,18 @@ class HBNBCommand(cmd.Cmd):
         if len(arg.split()) == 1:
             print("** instance id missing **")
             return (1)
-        if (arg.split()[0] + "." + arg.split()[1]) not in storage.all():
+        if storage.get(arg.split()[0], arg.split()[1]) is None:
             print("** no instance found **")
             return (1)
         return (0)
 
+    @staticmethod
+    def readOnly(obj, attr):
+        """`bool`: returns whether `attr` is a read-only property of `obj`,
+        such as `State.cities`"""
+        member = getattr(type(obj), attr, None)
+        return isinstance(member, property) and member.fset is None
+
 
 if __name__ == '__main__':
     HBNBCommand().cmdloop()
@@ -1,10 +1,9 @@
 """Initializes the `models` package by creating
-a unique FileStorage instance `storage` to store created objects"""
-from .engine.file_storage import FileStorage
+a unique storage instance `storage` to store created objects: a
+`DBStorage` if `HBNB_TYPE_STORAGE` is "db", a `FileStorage` otherwise"""
+from os import getenv
 
 
-storage = FileStorage()
-storage.reload()
 class_dict = {
     "Amenity": "amenity",
     "BaseModel": "base_model",
@@ -14,3 +13,10 @@ class_dict = {
     "State": "state",
     "User": "user"
 }
+if getenv("HBNB_TYPE_STORAGE") == "db":
+    from .engine.db_storage import DBStorage
+    storage = DBStorage()
+else:
+    from .engine.file_storage import FileStorage
+    storage = FileStorage()
+storage.reload()
@@ -3,20 +3,27 @@
 from datetime import datetime
 from uuid import uuid4
 from . import storage
+from .compact import (ModelType, add_name, attributes, compact,
+                      get_default, intern_id, set_extra)
 
 
-class BaseModel():
+class BaseModel(metaclass=ModelType):
     """A base class that defines common attributes and methods
     for other classes.
+
+    In compact mode (`HBNB_COMPACT=1`) instances store their fields in
+    slots instead of a `__dict__`, see `models.compact.ModelType`.
+    The ids held in reference fields such as `City.state_id` are interned,
+    so objects referencing the same object share one id string.
+    `created_at` and `updated_at` may hold the ISO format strings they
+    were created from until read, see `models.compact.Timestamp`.
     """
 
     def __init__(self, *args, **kwargs):
         """Creates a `BaseModel` instance object"""
         if kwargs:
             for key, value in kwargs.items():
-                if key in ('created_at', 'updated_at'):
-                    self.__setattr__(key, datetime.fromisoformat(value))
-                elif key != '__class__':
+                if key != '__class__':
                     self.__setattr__(key, value)
         else:
             self.id = str(uuid4())
@@ -24,10 +31,35 @@ class BaseModel():
             self.updated_at = datetime.now()
             storage.new(self)
 
+    def __setattr__(self, name, value):
+        """Sets an attribute and flags the instance as changed in storage,
+        which re-indexes it if `name` is a reference or indexed field"""
+        reference = name in type(self)._references
+        if reference:
+            old = getattr(self, name, None)
+            value = intern_id(value)
+        if compact and name not in type(self)._members:
+            set_extra(self, name, value)
+        else:
+            super().__setattr__(name, value)
+        if compact:
+            add_name(self, name)
+        if reference:
+            storage.relink(self, name, old)
+        storage.touch(self, name)
+
+    def __getattr__(self, name):
+        """Returns the attribute `name` that normal lookup missed, which in
+        compact mode may be an ad-hoc attribute or an unset field"""
+        return get_default(self, name)
+
     def __str__(self):
         """`str`: returns a fancier string representation"""
+        attrs = attributes(self)
+        attrs['created_at'] = self.created_at
+        attrs['updated_at'] = self.updated_at
         return ("[{}] ({}) {}".format(self.__class__.__name__,
-                                      self.id, self.__dict__))
+                                      self.id, attrs))
 
     def save(self):
         """Updates `updated_at` instance attribute with the current datetime,
@@ -38,8 +70,9 @@ class BaseModel():
     def to_dict(self):
         """`dict`: returns a dictionary containing all keys/values of
         `__dict__` of the instance"""
-        dict_copy = self.__dict__.copy()
+        dict_copy = attributes(self)
         dict_copy['__class__'] = self.__class__.__name__
-        dict_copy['created_at'] = self.created_at.isoformat()
-        dict_copy['updated_at'] = self.updated_at.isoformat()
+        for name in ('created_at', 'updated_at'):
+            if type(dict_copy[name]) is not str:
+                dict_copy[name] = dict_copy[name].isoformat()
         return (dict_copy)
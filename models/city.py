@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 """Contains the `City` class"""
+from . import storage
 from .base_model import BaseModel
 
 
@@ -9,3 +10,8 @@ class City(BaseModel):
     """
     state_id = ""
     name = ""
+
+    @property
+    def places(self):
+        """`list`: returns the places in this city"""
+        return storage.related("Place", "city_id", self.id)
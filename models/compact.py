@@ -0,0 +1,274 @@
+#!/usr/bin/python3
+"""Contains the `ModelType` metaclass and the helpers that read and write
+the attributes of model instances, whether their classes use slots or not,
+and intern the ids they reference, the `Order` of those attributes and
+the `Timestamp` descriptor
+
+Attributes:
+    compact (bool): whether compact mode (`HBNB_COMPACT=1`) is on
+"""
+from datetime import datetime
+from os import getenv
+from sys import intern
+
+compact = getenv("HBNB_COMPACT") == "1"
+
+
+def is_field(name, value):
+    """`bool`: returns whether the class attribute `name` is a model field,
+    i.e. a public attribute holding a default value"""
+    return (not name.startswith('_') and not callable(value) and
+            not isinstance(value, (property, classmethod, staticmethod)))
+
+
+class ModelType(type):
+    """Metaclass of `BaseModel` and the model classes
+
+    Every model class gets `_defaults`, its field name to default value
+    dictionary, inherited fields included. In compact mode, the fields
+    are declared as slots instead of class attributes: instances have no
+    `__dict__`, unset fields fall back to `_defaults` in
+    `BaseModel.__getattr__`, and the attributes that are not fields are
+    kept in an `_extra` dictionary, created on first use. `_order` holds
+    the `Order` the attributes were set in, so that they are listed in
+    that order as in a `__dict__`. `_members` maps the name of each slot
+    (`id`, the timestamps and the fields) to its descriptor. `_references`
+    names the fields holding the ids of other objects: those ending in
+    `_id` (or `_ids` for lists of ids). The base class gets a `Timestamp`
+    descriptor for `created_at` and `updated_at`.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        """Creates a model class, with slots for its fields in compact
+        mode"""
+        root = not any(isinstance(base, ModelType) for base in bases)
+        defaults = {}
+        members = {}
+        for base in reversed(bases):
+            defaults.update(getattr(base, '_defaults', {}))
+            members.update(getattr(base, '_members', {}))
+        own = {attr: value for attr, value in namespace.items()
+               if is_field(attr, value)}
+        defaults.update(own)
+        namespace['_defaults'] = defaults
+        namespace['_references'] = tuple(
+            attr for attr in defaults if attr.endswith(('_id', '_ids')))
+        if compact:
+            slots = tuple(attr for attr in own if attr not in members)
+            if root:
+                slots = ('id', 'created_at', 'updated_at') + slots
+                namespace['__slots__'] = slots + ('_extra', '_order')
+            else:
+                namespace['__slots__'] = slots
+            for attr in own:
+                del namespace[attr]
+        cls = super().__new__(mcs, name, bases, namespace)
+        if compact:
+            members.update((attr, cls.__dict__[attr]) for attr in slots)
+        cls._members = members
+        if root:
+            for attr in ('created_at', 'updated_at'):
+                setattr(cls, attr, Timestamp(attr, members.get(attr)))
+        return cls
+
+
+class Order():
+    """Names of the attributes of a compact model instance in the order
+    they were first set
+
+    Orders are shared: every instance whose attributes were set in the same
+    order holds the same `Order`, and each `Order` caches the one following
+    it for each name, so recording a name costs a dictionary lookup.
+    """
+    __slots__ = ('names', '__next')
+
+    def __init__(self, names=()):
+        """Creates the `Order` of the tuple of attribute names `names`"""
+        self.names = names
+        self.__next = {}
+
+    def add(self, name):
+        """`Order`: returns the order with `name` last, or this one if it
+        already holds `name`"""
+        try:
+            return self.__next[name]
+        except KeyError:
+            pass
+        order = self if name in self.names else Order(self.names + (name,))
+        self.__next[name] = order
+        return order
+
+
+_unset = Order()
+
+
+def add_name(obj, name):
+    """Records that the attribute `name` of the compact model instance
+    `obj` was set"""
+    slot = type(obj)._order
+    try:
+        order = slot.__get__(obj)
+    except AttributeError:
+        order = _unset
+    slot.__set__(obj, order.add(name))
+
+
+class Timestamp():
+    """Data descriptor of the `created_at` and `updated_at` attributes
+
+    A timestamp may be stored as the ISO format string it was loaded from.
+    It is parsed into a `datetime`, which replaces the string, the first
+    time it is read, so objects that are only loaded and saved again are
+    never parsed and keep their string as is.
+    """
+
+    def __init__(self, name, member=None):
+        """Creates the descriptor of the attribute `name`, stored in the
+        instance `__dict__` or, in compact mode, in the slot `member`"""
+        self.name = name
+        self.member = member
+
+    def __get__(self, obj, cls=None):
+        """`datetime`: returns the timestamp of `obj`, parsing it first if
+        it is still a string"""
+        if obj is None:
+            return self
+        if self.member is not None:
+            value = self.member.__get__(obj)
+        else:
+            try:
+                value = obj.__dict__[self.name]
+            except KeyError:
+                raise AttributeError(self.name) from None
+        if type(value) is str:
+            value = datetime.fromisoformat(value)
+            self.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        """Stores the timestamp (a `datetime` or an ISO format string) of
+        `obj` as is"""
+        if self.member is not None:
+            self.member.__set__(obj, value)
+        else:
+            obj.__dict__[self.name] = value
+
+
+def intern_id(value):
+    """Returns the id or list of ids `value` with its strings interned, so
+    that every reference to an object shares one string; a list is
+    interned in place, so that it is still the one assigned"""
+    if type(value) is str:
+        return intern(value)
+    if type(value) is list:
+        for i, item in enumerate(value):
+            if type(item) is str:
+                value[i] = intern(item)
+    return value
+
+
+def intern_references(cls, attrs):
+    """`dict`: interns in place the ids that the attribute dictionary
+    `attrs` of an instance of `cls` references, and returns it"""
+    for name in cls._references:
+        if name in attrs:
+            attrs[name] = intern_id(attrs[name])
+    return attrs
+
+
+def attributes(obj):
+    """`dict`: returns a new dictionary of the attributes of the model
+    instance `obj`, as its `__dict__` would hold them"""
+    if not compact:
+        return obj.__dict__.copy()
+    cls = type(obj)
+    try:
+        names = cls._order.__get__(obj).names
+    except AttributeError:
+        return {}
+    members = cls._members
+    attrs = {}
+    extra = None
+    for name in names:
+        member = members.get(name)
+        if member is not None:
+            try:
+                attrs[name] = member.__get__(obj)
+            except AttributeError:
+                # a deleted slot, which `__dict__` would not hold either
+                pass
+        else:
+            if extra is None:
+                extra = cls._extra.__get__(obj)
+            attrs[name] = extra[name]
+    return attrs
+
+
+def update_attributes(obj, attrs):
+    """Sets the attributes of the model instance `obj` from the dictionary
+    `attrs`, without flagging it as changed in storage"""
+    if not compact:
+        obj.__dict__.update(attrs)
+        return
+    cls = type(obj)
+    members = cls._members
+    try:
+        order = cls._order.__get__(obj)
+    except AttributeError:
+        order = _unset
+    for name, value in attrs.items():
+        order = order.add(name)
+        member = members.get(name)
+        if member is None:
+            set_extra(obj, name, value)
+        else:
+            member.__set__(obj, value)
+    cls._order.__set__(obj, order)
+
+
+def set_extra(obj, name, value):
+    """Sets the attribute `name`, which is not a field, of the compact
+    model instance `obj`"""
+    slot = type(obj)._extra
+    try:
+        extra = slot.__get__(obj)
+    except AttributeError:
+        extra = {}
+        slot.__set__(obj, extra)
+    extra[name] = value
+
+
+def own_attribute(obj, name, default=None):
+    """Returns the attribute `name` that `obj` set itself, or `default` if
+    it is unset, even if its class gives it a default value"""
+    cls = type(obj)
+    if compact and isinstance(cls, ModelType):
+        member = cls._members.get(name)
+        try:
+            if member is None:
+                return cls._extra.__get__(obj)[name]
+            return member.__get__(obj)
+        except (AttributeError, KeyError):
+            return default
+    return obj.__dict__.get(name, default)
+
+
+def get_default(obj, name):
+    """Returns the attribute `name` of the model instance `obj` that normal
+    lookup missed: an attribute that is not a field in compact mode, or
+    the default value of an unset field
+
+    Raises:
+        AttributeError: if `obj` has no attribute `name`
+    """
+    cls = type(obj)
+    if compact:
+        try:
+            return cls._extra.__get__(obj)[name]
+        except (AttributeError, KeyError):
+            pass
+    try:
+        return cls._defaults[name]
+    except KeyError:
+        raise AttributeError("'{}' object has no attribute '{}'".format(
+            cls.__name__, name)) from None
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""Contains helpers to replace storage files without ever leaving them
+half written"""
+import os
+from contextlib import contextmanager
+
+
+def sync(file):
+    """Flushes `file` and waits until the OS has written it to disk"""
+    file.flush()
+    os.fsync(file.fileno())
+
+
+def sync_directory(path):
+    """Waits until the directory entry of `path` is written to disk, which
+    makes a rename to `path` durable"""
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        # directories can't be opened on some platforms (Windows)
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(path, binary=False, fsync=True):
+    """Yields a temporary file to write the new content of `path` to
+
+    On success the temporary file is fsynced (unless `fsync` is False)
+    and renamed over `path`, so a crash leaves either the old or the new
+    content at `path`, never a truncated file. On error it is removed.
+    """
+    tmp_path = path + ".tmp"
+    if binary:
+        file = open(tmp_path, 'wb')
+    else:
+        file = open(tmp_path, 'w', encoding='utf-8')
+    try:
+        with file:
+            yield file
+            if fsync:
+                sync(file)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    if fsync:
+        sync_directory(path)
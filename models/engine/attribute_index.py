@@ -0,0 +1,456 @@
+#!/usr/bin/python3
+"""Contains the `AttributeIndex` class, the `HashIndex` and `SortedIndex`
+classes of the indexes it holds and the `SortedKeys` list of the latter
+
+Attributes:
+    bounds (tuple): condition operators a `SortedIndex` can answer
+    collections (tuple): types of the values of the "in" conditions that
+        indexes can answer
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+bounds = ("eq", "lt", "lte", "gt", "gte")
+_missing = object()
+_groups = {int: float, float: float, bool: float, str: str,
+           datetime: datetime}
+collections = (list, tuple, set, frozenset)
+
+
+class _Top():
+    """Sorts after any key, to bound the pairs of a value from above"""
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+_top = _Top()
+
+
+class SortedKeys():
+    """The keys of an index, sorted by `(value, key)`
+
+    The pairs are kept in chunks of at most `2 * load` values and keys,
+    `__maxes` holding the last pair of each chunk, so an insertion or
+    removal only moves the items of one chunk rather than of the whole
+    list, and a range of `k` keys is found in `O(log n + k)`.
+    """
+    load = 512
+
+    def __init__(self, values=(), keys=()):
+        """Creates the list of the pairs of `values` and `keys`, lists
+        sorted by `(value, key)`"""
+        load = self.load
+        self.__values = [values[i:i + load]
+                         for i in range(0, len(values), load)]
+        self.__keys = [keys[i:i + load] for i in range(0, len(keys), load)]
+        self.__maxes = [(chunk[-1], chunk_keys[-1]) for chunk, chunk_keys
+                        in zip(self.__values, self.__keys)]
+
+    def __len__(self):
+        """`int`: returns the number of keys"""
+        return sum(map(len, self.__keys))
+
+    def __locate(self, value, key):
+        """`tuple`: returns the chunk and the position in it of the pair
+        `(value, key)`, or where it would be inserted"""
+        c = min(bisect_left(self.__maxes, (value, key)),
+                len(self.__maxes) - 1)
+        values = self.__values[c]
+        i = bisect_left(values, value)
+        j = bisect_right(values, value, i)
+        return c, bisect_left(self.__keys[c], key, i, j)
+
+    def add(self, value, key):
+        """Inserts the pair `(value, key)`"""
+        if not self.__maxes:
+            self.__values.append([value])
+            self.__keys.append([key])
+            self.__maxes.append((value, key))
+            return
+        c, i = self.__locate(value, key)
+        values, keys = self.__values[c], self.__keys[c]
+        values.insert(i, value)
+        keys.insert(i, key)
+        if i == len(keys) - 1:
+            self.__maxes[c] = (value, key)
+        if len(keys) > 2 * self.load:
+            self.__values.insert(c + 1, values[self.load:])
+            self.__keys.insert(c + 1, keys[self.load:])
+            del values[self.load:], keys[self.load:]
+            self.__maxes.insert(c, (values[-1], keys[-1]))
+
+    def remove(self, value, key):
+        """Removes the pair `(value, key)`, which must be in the list"""
+        c, i = self.__locate(value, key)
+        values, keys = self.__values[c], self.__keys[c]
+        del values[i], keys[i]
+        if not keys:
+            del self.__values[c], self.__keys[c], self.__maxes[c]
+        elif i == len(keys):
+            self.__maxes[c] = (values[-1], keys[-1])
+
+    def between(self, lower=None, upper=None):
+        """`list`: returns the keys of the values within `lower` and
+        `upper`, each a `(value, inclusive)` pair or None if unbounded,
+        in ascending order of value"""
+        maxes = self.__maxes
+        if lower is None:
+            c, i = 0, 0
+        else:
+            value, inclusive = lower
+            if inclusive:
+                c = bisect_left(maxes, (value,))
+            else:
+                c = bisect_right(maxes, (value, _top))
+            if c < len(maxes):
+                find = bisect_left if inclusive else bisect_right
+                i = find(self.__values[c], value)
+        if upper is None:
+            d, j = len(maxes) - 1, None
+        else:
+            value, inclusive = upper
+            if inclusive:
+                d = bisect_right(maxes, (value, _top))
+            else:
+                d = bisect_left(maxes, (value,))
+            if d < len(maxes):
+                find = bisect_right if inclusive else bisect_left
+                j = find(self.__values[d], value)
+            else:
+                d, j = len(maxes) - 1, None
+        if c > d or c == len(maxes):
+            return []
+        if c == d:
+            return self.__keys[c][i:j]
+        keys = self.__keys[c][i:]
+        for chunk in self.__keys[c + 1:d]:
+            keys.extend(chunk)
+        keys.extend(self.__keys[d][:j])
+        return keys
+
+
+class HashIndex():
+    """Index of the objects of a class by the value of one attribute, for
+    equality lookups
+
+    Objects whose value is not hashable (e.g. a list) are not indexed, as
+    no hashable value can equal theirs.
+    """
+    kind = "hash"
+
+    def __init__(self, field):
+        """Creates an empty index of the attribute `field`"""
+        self.field = field
+        self.__values = {}
+        self.__buckets = {}
+
+    def rebuild(self, objects):
+        """Indexes the `{key: obj}` dictionary `objects` from scratch"""
+        self.__values = {}
+        self.__buckets = {}
+        for key, obj in objects.items():
+            self.update(key, obj)
+
+    def update(self, key, obj):
+        """Indexes `obj`, stored under `key`, or re-indexes it if its
+        value changed"""
+        value = getattr(obj, self.field, _missing)
+        old = self.__values.get(key, _missing)
+        if old is not _missing:
+            if type(old) is type(value) and old == value:
+                return
+            self.remove(key)
+        if value is _missing:
+            return
+        try:
+            self.__buckets.setdefault(value, {})[key] = None
+        except TypeError:
+            return
+        self.__values[key] = value
+
+    def remove(self, key):
+        """Removes the object stored under `key` from the index"""
+        value = self.__values.pop(key, _missing)
+        if value is not _missing:
+            bucket = self.__buckets[value]
+            del bucket[key]
+            if not bucket:
+                del self.__buckets[value]
+
+    def lookup(self, conditions):
+        """`list`: returns the keys of the objects with a value satisfying
+        the first "eq" or "in" (of a collection) condition of the
+        `(op, value)` pairs `conditions`, or None if there is none"""
+        for op, value in conditions:
+            try:
+                if op == "eq":
+                    return list(self.__buckets.get(value, ()))
+                if op == "in" and type(value) in collections:
+                    keys = []
+                    for item in set(value):
+                        keys.extend(self.__buckets.get(item, ()))
+                    return keys
+            except TypeError:
+                pass
+        return None
+
+    @staticmethod
+    def exact(conditions):
+        """`bool`: returns whether `lookup` finds the keys of the objects
+        satisfying all the `(op, value)` pairs `conditions` and no
+        others"""
+        if len(conditions) != 1:
+            return False
+        op, value = conditions[0]
+        return op == "eq" or op == "in" and type(value) in collections
+
+
+class SortedIndex():
+    """Index of the objects of a class sorted by the value of one
+    attribute, for range and equality lookups
+
+    Values are kept in one `SortedKeys` per group of mutually comparable
+    types: numbers, strings and datetimes. Objects whose value belongs to
+    none of them are not indexed; a comparison with them would raise, so
+    they can match no range anyway.
+    """
+    kind = "sorted"
+
+    def __init__(self, field):
+        """Creates an empty index of the attribute `field`"""
+        self.field = field
+        self.__values = {}
+        self.__groups = {}
+
+    @staticmethod
+    def group(value):
+        """`type`: returns the group of `value` (`float` for all numbers),
+        or None if it cannot be indexed"""
+        return _groups.get(type(value))
+
+    def rebuild(self, objects):
+        """Indexes the `{key: obj}` dictionary `objects` from scratch,
+        sorting each group once: by key, then by value, the sort being
+        stable"""
+        field = self.field
+        values = {key: getattr(obj, field, _missing)
+                  for key, obj in objects.items()}
+        groups = {_groups.get(kind) for kind in set(map(type,
+                                                        values.values()))}
+        if len(groups) == 1 and None not in groups:
+            # the usual case of a single group, e.g. all numbers
+            members = {groups.pop(): list(values)}
+        else:
+            members = {}
+            for key, value in values.items():
+                group = _groups.get(type(value))
+                if group is not None:
+                    members.setdefault(group, []).append(key)
+            values = {key: values[key] for keys in members.values()
+                      for key in keys}
+        self.__values = values
+        self.__groups = {}
+        for group, keys in members.items():
+            keys.sort()
+            keys.sort(key=values.__getitem__)
+            self.__groups[group] = SortedKeys(
+                list(map(values.__getitem__, keys)), keys)
+
+    def update(self, key, obj):
+        """Indexes `obj`, stored under `key`, or re-indexes it if its
+        value changed"""
+        value = getattr(obj, self.field, _missing)
+        old = self.__values.get(key, _missing)
+        if old is not _missing:
+            if type(old) is type(value) and old == value:
+                return
+            self.remove(key)
+        group = self.group(value)
+        if group is not None:
+            if group not in self.__groups:
+                self.__groups[group] = SortedKeys()
+            self.__groups[group].add(value, key)
+            self.__values[key] = value
+
+    def remove(self, key):
+        """Removes the object stored under `key` from the index"""
+        value = self.__values.pop(key, _missing)
+        if value is not _missing:
+            self.__groups[self.group(value)].remove(value, key)
+
+    def lookup(self, conditions):
+        """`list`: returns the keys of the objects with a value within the
+        bounds that the "eq", "lt", "lte", "gt" and "gte" conditions of
+        the `(op, value)` pairs `conditions` set, in ascending order of
+        value, or satisfying their first "in" condition if there are no
+        bounds, or None if there is neither"""
+        group = lower = upper = None
+        for op, value in conditions:
+            if op not in bounds or self.group(value) is None:
+                continue
+            if group is None:
+                group = self.group(value)
+            elif self.group(value) is not group:
+                # no value is in two groups
+                return []
+            if op in ("eq", "gt", "gte"):
+                bound = (value, op != "gt")
+                if (lower is None or value > lower[0] or
+                        value == lower[0] and not bound[1]):
+                    lower = bound
+            if op in ("eq", "lt", "lte"):
+                bound = (value, op != "lt")
+                if (upper is None or value < upper[0] or
+                        value == upper[0] and not bound[1]):
+                    upper = bound
+        if group is not None:
+            keys = self.__groups.get(group)
+            return keys.between(lower, upper) if keys is not None else []
+        for op, value in conditions:
+            if op == "in" and type(value) in collections:
+                try:
+                    items = set(value)
+                except TypeError:
+                    return None
+                keys = []
+                for item in items:
+                    found = self.lookup([("eq", item)])
+                    if found is None:
+                        return None
+                    keys.extend(found)
+                return keys
+        return None
+
+    def exact(self, conditions):
+        """`bool`: returns whether `lookup` finds the keys of the objects
+        satisfying all the `(op, value)` pairs `conditions` and no
+        others"""
+        if len(conditions) == 1 and conditions[0][0] == "in":
+            return type(conditions[0][1]) in collections
+        groups = {self.group(value) if op in bounds else None
+                  for op, value in conditions}
+        return len(groups) == 1 and None not in groups
+
+
+class AttributeIndex():
+    """The `HashIndex` and `SortedIndex` indexes declared on the
+    attributes of stored objects, by class name and attribute
+
+    A lookup on several indexed attributes intersects the smallest set of
+    keys an index finds with those other indexes find, if it has more than
+    `intersect_above` keys and they have at most `intersect_ratio` times
+    as many: checking the conditions of an index on the objects of fewer
+    keys costs less than going over all of its keys.
+    """
+    kinds = {"hash": HashIndex, "sorted": SortedIndex}
+    intersect_above = 256
+    intersect_ratio = 16
+
+    def __init__(self, spec=None):
+        """Creates an `AttributeIndex` with the indexes that `spec` lists,
+        if given: comma separated `<class name>.<field>[:<kind>]` items,
+        as in `HBNB_FS_INDEXES`
+
+        Raises:
+            ValueError: if an item of `spec` is not of that form
+        """
+        self.__indexes = {}
+        for item in (spec or "").split(","):
+            item = item.strip()
+            if not item:
+                continue
+            target, sep, kind = item.partition(":")
+            name, dot, field = target.partition(".")
+            if not name or not dot or not field:
+                raise ValueError("invalid index '{}'".format(item))
+            self.declare(name, field, kind or "hash", {})
+
+    def __bool__(self):
+        """`bool`: returns whether any index is declared"""
+        return bool(self.__indexes)
+
+    def declare(self, name, field, kind, objects):
+        """Declares an index of kind `kind` ("hash" or "sorted") of the
+        attribute `field` of the class named `name`, replacing any other
+        on it, and builds it from the `{key: obj}` dictionary `objects`
+
+        Raises:
+            ValueError: if `kind` is not a kind of index
+        """
+        if kind not in self.kinds:
+            raise ValueError("unknown index kind '{}'".format(kind))
+        index = self.kinds[kind](field)
+        index.rebuild(objects)
+        self.__indexes.setdefault(name, {})[field] = index
+
+    def drop(self, name, field):
+        """Removes the index of the attribute `field` of the class named
+        `name`, if any"""
+        fields = self.__indexes.get(name, {})
+        fields.pop(field, None)
+        if not fields:
+            self.__indexes.pop(name, None)
+
+    def declared(self):
+        """`dict`: returns the class name to `{field: kind}` dictionary of
+        the declared indexes"""
+        return {name: {field: index.kind for field, index in fields.items()}
+                for name, fields in self.__indexes.items()}
+
+    def rebuild(self, classes):
+        """Rebuilds every index from the class name to `{key: obj}`
+        dictionary `classes`"""
+        for name, fields in self.__indexes.items():
+            for index in fields.values():
+                index.rebuild(classes.get(name, {}))
+
+    def update(self, key, obj, field=None):
+        """(Re-)indexes `obj`, stored under `key`, or only its attribute
+        `field` if given"""
+        fields = self.__indexes.get(obj.__class__.__name__)
+        if not fields:
+            return
+        if field is None:
+            for index in fields.values():
+                index.update(key, obj)
+        elif field in fields:
+            fields[field].update(key, obj)
+
+    def remove(self, key, obj):
+        """Removes `obj`, stored under `key`, from the indexes"""
+        for index in self.__indexes.get(obj.__class__.__name__, {}).values():
+            index.remove(key)
+
+    def lookup(self, name, conditions):
+        """`tuple`: returns the keys of a superset of the objects of the
+        class named `name` whose attributes satisfy `conditions`, a field
+        to `(op, value)` pairs dictionary, found through the indexes of
+        its fields, and the set of the fields whose conditions all the
+        objects of the keys satisfy, or None if no index can narrow them
+        down"""
+        fields = self.__indexes.get(name, {})
+        found = []
+        for field, pairs in conditions.items():
+            index = fields.get(field)
+            keys = None if index is None else index.lookup(pairs)
+            if keys is not None:
+                found.append((keys, field if index.exact(pairs) else None))
+        if not found:
+            return None
+        found.sort(key=lambda item: len(item[0]))
+        keys, field = found[0]
+        answered = {field}
+        if len(found) > 1 and len(keys) > self.intersect_above:
+            common = set(keys)
+            for keys, field in found[1:]:
+                if len(keys) > len(common) * self.intersect_ratio:
+                    break
+                common.intersection_update(keys)
+                answered.add(field)
+            keys = list(common)
+        answered.discard(None)
+        return keys, answered
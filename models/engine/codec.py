@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+"""Contains the JSON codecs `FileStorage` can serialize objects with
+
+Attributes:
+    codecs (dict): codec name to codec class, fastest first
+"""
+import json
+from datetime import datetime
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def encode_default(obj):
+    """`str`: encodes the values JSON has no type for (datetimes)"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError("Object of type {} is not JSON serializable".format(
+        type(obj).__name__))
+
+
+class JSONCodec():
+    """Encodes and decodes JSON text with the standard `json` module"""
+    name = "json"
+    available = True
+
+    def dumps(self, obj):
+        """`str`: returns the JSON text of `obj`, datetimes included"""
+        return json.dumps(obj, default=encode_default)
+
+    def encode(self, obj):
+        """`bytes`: returns the UTF-8 JSON text of `obj`, datetimes
+        included"""
+        return self.dumps(obj).encode('utf-8')
+
+    def loads(self, text):
+        """Returns the object decoded from the JSON text `text`"""
+        return json.loads(text)
+
+
+class OrjsonCodec(JSONCodec):
+    """Encodes and decodes JSON text with `orjson`, which serializes
+    datetimes natively"""
+    name = "orjson"
+    available = orjson is not None
+
+    def dumps(self, obj):
+        """`str`: returns the JSON text of `obj`, datetimes included"""
+        return orjson.dumps(obj).decode('utf-8')
+
+    def encode(self, obj):
+        """`bytes`: returns the UTF-8 JSON text of `obj`, datetimes
+        included"""
+        return orjson.dumps(obj)
+
+    def loads(self, text):
+        """Returns the object decoded from the JSON text `text`"""
+        return orjson.loads(text)
+
+
+class MsgspecCodec(JSONCodec):
+    """Encodes and decodes JSON text with `msgspec`, which serializes
+    datetimes natively"""
+    name = "msgspec"
+    available = msgspec is not None
+
+    def dumps(self, obj):
+        """`str`: returns the JSON text of `obj`, datetimes included"""
+        return msgspec.json.encode(obj).decode('utf-8')
+
+    def encode(self, obj):
+        """`bytes`: returns the UTF-8 JSON text of `obj`, datetimes
+        included"""
+        return msgspec.json.encode(obj)
+
+    def loads(self, text):
+        """Returns the object decoded from the JSON text `text`
+
+        Raises:
+            ValueError: if `text` is not valid JSON, like the other codecs
+        """
+        try:
+            return msgspec.json.decode(text)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from None
+
+
+class UjsonCodec(JSONCodec):
+    """Encodes and decodes JSON text with `ujson`"""
+    name = "ujson"
+    available = ujson is not None
+
+    def dumps(self, obj):
+        """`str`: returns the JSON text of `obj`, datetimes included"""
+        return ujson.dumps(obj, default=encode_default)
+
+    def loads(self, text):
+        """Returns the object decoded from the JSON text `text`"""
+        return ujson.loads(text)
+
+
+codecs = {codec.name: codec
+          for codec in (OrjsonCodec, MsgspecCodec, UjsonCodec, JSONCodec)}
+
+
+def get_codec(name="auto"):
+    """`JSONCodec`: returns an instance of the codec called `name`, or of
+    the fastest installed one if `name` is "auto"
+
+    Raises:
+        ValueError: if `name` is not a known and installed codec
+    """
+    if name == "auto":
+        return next(codec() for codec in codecs.values() if codec.available)
+    if name not in codecs:
+        raise ValueError("unknown codec '{}'".format(name))
+    if not codecs[name].available:
+        raise ValueError("codec '{}' is not installed".format(name))
+    return codecs[name]()
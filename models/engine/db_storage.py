@@ -0,0 +1,368 @@
+#!/usr/bin/python3
+"""Contains the `DBStorage` class"""
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from importlib import import_module
+from ..compact import attributes, intern_references, update_attributes
+from .attribute_index import AttributeIndex
+from .query import Query
+from .reference_index import ReferenceIndex
+from .spatial_index import SpatialIndex
+from .text_index import TextIndex
+
+
+class DBStorage():
+    """Stores instances in a SQLite database, with the same interface as
+    `FileStorage`
+
+    Each model class has its own table with an `id` primary key, the two
+    timestamps, one column per public class attribute of the model and an
+    `extra` column holding any other attribute as a JSON object. Columns
+    ending in `_id` (foreign keys such as `City.state_id`) are indexed.
+    Loaded objects are kept in memory, indexed by class and by the ids in
+    their reference fields (see `related`) and, for `query`, by the
+    attributes declared with `add_index`, and by their coordinates for
+    `near` once it is first called, and by the words of their texts for
+    `search` once a class is first searched. `save` only writes the objects
+    created, changed or deleted since the previous save, or once at the
+    end of a `batch` (or `transaction`) block for the saves made in it.
+    """
+    __db_path = os.getenv("HBNB_DB_PATH", "hbnb.db")
+
+    def __init__(self):
+        """Creates a `DBStorage` for the database at `HBNB_DB_PATH`"""
+        self.__connection = None
+        self.__objects = {}
+        self.__classes = {}
+        self.__references = ReferenceIndex()
+        self.__attributes = AttributeIndex()
+        self.__spatial = None
+        self.__text = TextIndex()
+        self.__registry = {}
+        self.__columns = {}
+        self.__changed = set()
+        self.__deleted = {}
+        self.__batch_depth = 0
+        self.__batch_saved = False
+
+    def all(self, cls=None):
+        """`dict`: returns all stored objects by `<class name>.id` key, or
+        a new dictionary of the objects of `cls` (a class or class name)"""
+        if cls is None:
+            return self.__objects
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return dict(self.__classes.get(cls, {}))
+
+    def count(self, cls=None):
+        """`int`: returns the number of stored objects, or of stored
+        objects of `cls` (a class or class name)"""
+        if cls is None:
+            return len(self.__objects)
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return len(self.__classes.get(cls, {}))
+
+    def get(self, cls, id):
+        """`BaseModel`: returns the stored object of `cls` (a class or
+        class name) with the given `id`, or None if there is none"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return self.__objects.get(cls + "." + id)
+
+    def classes(self):
+        """`dict`: returns the class name to model class registry built
+        from `models.class_dict`"""
+        if not self.__registry:
+            from .. import class_dict
+            for name, module in class_dict.items():
+                module = import_module(f"models.{module}")
+                self.__registry[name] = getattr(module, name)
+        return self.__registry
+
+    def new(self, obj):
+        """Adds `obj` to the stored objects, to be inserted on save"""
+        name = obj.__class__.__name__
+        key = name + "." + obj.id
+        self.__store(key, obj)
+        self.__changed.add(key)
+        self.__deleted.pop(key, None)
+
+    def touch(self, obj, name=None):
+        """Flags `obj` as changed so the next save writes it, and
+        re-indexes its indexed attributes, or only `name` if given, if it
+        is stored"""
+        key = obj.__class__.__name__ + "." + getattr(obj, 'id', '')
+        self.__changed.add(key)
+        spatial = self.__spatial is not None and (
+            name is None or name in self.__spatial.fields)
+        text = self.__text.watches(obj.__class__.__name__, name)
+        if ((self.__attributes or spatial or text) and
+                self.__objects.get(key) is obj):
+            self.__attributes.update(key, obj, name)
+            if spatial:
+                self.__spatial.update(key, obj)
+            if text:
+                self.__text.update(key, obj)
+
+    def relink(self, obj, name, old):
+        """Re-indexes the reference field `name` of `obj`, if stored, which
+        held `old` before it was set"""
+        key = obj.__class__.__name__ + "." + getattr(obj, 'id', '')
+        if self.__objects.get(key) is obj:
+            self.__references.move(key, obj, name, old)
+
+    def related(self, cls, field, id):
+        """`list`: returns the stored objects of `cls` (a class or class
+        name) whose reference field `field` holds `id`"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return self.__references.get(cls, field, id)
+
+    def query(self, cls):
+        """`Query`: returns a query of the stored objects of `cls` (a class
+        or class name)"""
+        return Query(self, cls)
+
+    def add_index(self, cls, field, kind="hash"):
+        """Indexes the attribute `field` of the stored objects of `cls` (a
+        class or class name) for queries: a "hash" index for equality
+        conditions or a "sorted" one for ranges as well
+
+        Raises:
+            ValueError: if `kind` is not a kind of index
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__attributes.declare(cls, field, kind,
+                                  self.__classes.get(cls, {}))
+
+    def drop_index(self, cls, field):
+        """Removes the index of the attribute `field` of `cls` (a class or
+        class name), if any"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__attributes.drop(cls, field)
+
+    def indexes(self):
+        """`dict`: returns the class name to `{field: kind}` dictionary of
+        the indexed attributes"""
+        return self.__attributes.declared()
+
+    def lookup(self, cls, conditions):
+        """`tuple`: returns stored objects of `cls` (a class or class
+        name), among which all those satisfying `conditions`, a field to
+        `(op, value)` pairs dictionary (see `Query`), found through the
+        indexes of its fields, and the set of the fields whose conditions
+        they all satisfy, or None if no index can narrow them down"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        found = self.__attributes.lookup(cls, conditions)
+        if found is None:
+            return None
+        return [self.__objects[key] for key in found[0]], found[1]
+
+    def near(self, lat, lon, radius_km, limit=None):
+        """`list`: returns the stored places within `radius_km` kilometers
+        of the point at `lat`, `lon` (in degrees), nearest first, at most
+        `limit` of them if given
+
+        Raises:
+            ValueError: if the point, radius or limit is out of range
+        """
+        if self.__spatial is None:
+            self.__spatial = SpatialIndex()
+            self.__spatial.rebuild(self.__classes.get("Place", {}))
+        return [self.__objects[key] for distance, key in
+                self.__spatial.near(lat, lon, radius_km, limit)]
+
+    def search(self, cls, text, limit=None):
+        """`list`: returns the stored objects of `cls` (a class or class
+        name) whose text attributes hold any of the words of `text`, best
+        match first, at most `limit` of them if given (see
+        `FileStorage.search`)
+
+        Raises:
+            ValueError: if the class has no text attributes to search
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        if not self.__text.built(cls):
+            self.__text.build(cls, self.__classes.get(cls, {}))
+        return [self.__objects[key] for score, key in
+                self.__text.search(cls, text, limit)]
+
+    def delete(self, obj=None):
+        """Removes `obj` from the stored objects, to be deleted on save"""
+        if obj is None:
+            return
+        name = obj.__class__.__name__
+        key = name + "." + obj.id
+        stored = self.__objects.pop(key, None)
+        if stored is not None:
+            self.__references.remove(key, stored)
+            self.__attributes.remove(key, stored)
+            if self.__spatial is not None:
+                self.__spatial.remove(key)
+            if self.__text:
+                self.__text.remove(key)
+            self.__classes[name].pop(key, None)
+            self.__changed.discard(key)
+            self.__deleted[key] = (name, obj.id)
+
+    def save(self):
+        """Writes the objects changed or deleted since the last save to
+        the database, in one transaction"""
+        if self.__batch_depth:
+            self.__batch_saved = True
+            return
+        connection = self.__connect()
+        with connection:
+            for name, obj_id in self.__deleted.values():
+                connection.execute(
+                    'DELETE FROM "{}" WHERE id = ?'.format(name), (obj_id,))
+            for key in self.__changed:
+                obj = self.__objects.get(key)
+                if obj is not None:
+                    self.__write(connection, obj)
+        self.__changed.clear()
+        self.__deleted.clear()
+
+    def flush(self):
+        """Does nothing: `save` always writes to the database right away,
+        outside of `batch` blocks"""
+        pass
+
+    @contextmanager
+    def batch(self, fsync=None):
+        """Defers the saves made in the block to a single save on exit,
+        even if the block raises. `fsync` is accepted for compatibility
+        with `FileStorage.batch`; SQLite manages its own syncing."""
+        self.__batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.__batch_depth -= 1
+            if not self.__batch_depth and self.__batch_saved:
+                self.__batch_saved = False
+                self.save()
+
+    transaction = batch
+
+    def reload(self):
+        """Loads every row of every model table into the stored objects"""
+        connection = self.__connect()
+        for name, cls in self.classes().items():
+            columns = self.__columns[name]
+            rows = connection.execute(
+                'SELECT id, created_at, updated_at, extra{} FROM "{}"'.format(
+                    self.__column_list(name), name))
+            for row in rows:
+                obj = cls.__new__(cls)
+                # the timestamps are parsed when first read
+                attrs = {'id': row[0], 'created_at': row[1],
+                         'updated_at': row[2]}
+                for (column, kind), value in zip(columns.items(), row[4:]):
+                    if value is not None:
+                        attrs[column] = (json.loads(value) if kind is list
+                                         else value)
+                if row[3]:
+                    attrs.update(json.loads(row[3]))
+                update_attributes(obj, intern_references(cls, attrs))
+                self.__store(name + "." + row[0], obj)
+
+    def close(self):
+        """Closes the database connection"""
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+
+    def __store(self, key, obj):
+        """Adds `obj` under `key` to the stored objects and indexes"""
+        old = self.__objects.get(key)
+        if old is not obj:
+            if old is not None:
+                self.__references.remove(key, old)
+            self.__references.add(key, obj)
+        self.__classes.setdefault(key.partition(".")[0], {})[key] = obj
+        self.__objects[key] = obj
+        if self.__attributes:
+            self.__attributes.update(key, obj)
+        if self.__spatial is not None:
+            self.__spatial.update(key, obj)
+        if self.__text:
+            self.__text.update(key, obj)
+
+    def __connect(self):
+        """`sqlite3.Connection`: returns the database connection, opening
+        it and creating the tables and indexes on first use"""
+        if self.__connection is None:
+            self.__connection = sqlite3.connect(self.__db_path)
+            for name, cls in self.classes().items():
+                self.__create_table(name, cls)
+        return self.__connection
+
+    def __create_table(self, name, cls):
+        """Creates the table of the model class `cls` named `name`, or adds
+        the columns it is missing, and indexes its foreign keys"""
+        columns = {attr: type(value) for attr, value in cls._defaults.items()}
+        self.__columns[name] = columns
+        connection = self.__connection
+        connection.execute('CREATE TABLE IF NOT EXISTS "{}" (id TEXT PRIMARY '
+                           'KEY, created_at TEXT NOT NULL, updated_at TEXT '
+                           'NOT NULL, extra TEXT)'.format(name))
+        existing = {row[1] for row in connection.execute(
+            'PRAGMA table_info("{}")'.format(name))}
+        for column, kind in columns.items():
+            if column not in existing:
+                connection.execute('ALTER TABLE "{}" ADD COLUMN "{}" {}'
+                                   .format(name, column,
+                                           self.__sql_type(kind)))
+            if column.endswith('_id'):
+                connection.execute('CREATE INDEX IF NOT EXISTS "{0}_{1}" ON '
+                                   '"{0}" ("{1}")'.format(name, column))
+        connection.commit()
+
+    def __column_list(self, name):
+        """`str`: returns the quoted attribute columns of the table `name`,
+        each preceded by a comma"""
+        return "".join(', "{}"'.format(column)
+                       for column in self.__columns[name])
+
+    @staticmethod
+    def __sql_type(kind):
+        """`str`: returns the SQLite column type for the Python type
+        `kind`"""
+        if kind is int:
+            return "INTEGER"
+        if kind is float:
+            return "REAL"
+        return "TEXT"
+
+    def __write(self, connection, obj):
+        """Inserts or replaces the row of `obj`"""
+        name = obj.__class__.__name__
+        columns = self.__columns[name]
+        attrs = attributes(obj)
+        row = [attrs.pop('id')]
+        for stamp in (attrs.pop('created_at'), attrs.pop('updated_at')):
+            row.append(stamp if type(stamp) is str else stamp.isoformat())
+        values = []
+        for column, kind in columns.items():
+            value = attrs.get(column)
+            if value is not None and type(value) is kind:
+                del attrs[column]
+                if kind is list:
+                    value = json.dumps(value)
+            else:
+                # a value of another type is kept in `extra` instead
+                value = None
+            values.append(value)
+        row.append(json.dumps(attrs) if attrs else None)
+        connection.execute(
+            'INSERT OR REPLACE INTO "{}" (id, created_at, updated_at, extra{})'
+            ' VALUES ({})'.format(name, self.__column_list(name),
+                                  ", ".join("?" * (len(columns) + 4))),
+            row + values)
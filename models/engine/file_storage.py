@@ -1,46 +1,813 @@
 #!/usr/bin/python3
 """Contains the `FileStorage` class"""
-import json
+import atexit
+import os
+import pickle
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from importlib import import_module
+from ..compact import (attributes, compact, intern_references,
+                       update_attributes)
+from .atomic import atomic_write, sync
+from .attribute_index import AttributeIndex
+from .codec import get_codec
+from .json_stream import iter_items
+from .query import Query
+from .record_file import RecordFile
+from .reference_index import ReferenceIndex
+from .spatial_index import SpatialIndex
+from .text_index import TextIndex
 
 
 class FileStorage():
     """Serializes instances to a JSON file and deserializes
-    JSON file to instances"""
-    __file_path = "file.json"
+    JSON file to instances
+
+    The file may also be a pickle or a JSON lines record file, and saves
+    may be journaled, batched or deferred to a background thread, as the
+    `HBNB_FS_*` environment variables listed in the README choose (see
+    `save` and `reload`). Stored objects are indexed by class and by the
+    ids they reference, and on demand by attribute (`query`), location
+    (`near`) and words (`search`); every index follows the changes made
+    through `new`, `touch` and `delete`.
+    """
+    __file_path = os.getenv("HBNB_FS_PATH", "file.json")
     __objects = {}
+    __journal = os.getenv("HBNB_FS_JOURNAL") == "1"
+    __journal_limit = int(os.getenv("HBNB_FS_JOURNAL_LIMIT", "1000"))
+    __journal_size = 0
+    __changed = set()
+    __deleted = set()
+    __fragments = {}
+    __mutable = set()
+    __suffixes = {}
+    __classes = {}
+    __references = ReferenceIndex()
+    __attributes = AttributeIndex(os.getenv("HBNB_FS_INDEXES"))
+    __spatial = None
+    __text = TextIndex()
+    __indexed = None
+    __registry = {}
+    __lazy = os.getenv("HBNB_FS_LAZY") == "1"
+    __stream = os.getenv("HBNB_FS_STREAM") == "1"
+    __raw = {}
+    __codec = get_codec(os.getenv("HBNB_FS_CODEC", "auto"))
+    __format = os.getenv("HBNB_FS_FORMAT")
+    __records = None
+    __fsync = os.getenv("HBNB_FS_FSYNC", "1") != "0"
+    __batch_depth = 0
+    __batch_saved = False
+    __lock = threading.RLock()
+    __flush_interval = int(os.getenv("HBNB_FS_FLUSH_MS", "0")) / 1000
+    __flush_wakeup = threading.Event()
+    __flusher = None
+    __save_due = False
+
+    def all(self, cls=None):
+        """`dict`: returns `_objects` private class attribute, or a new
+        dictionary of the objects of `cls` (a class or class name)"""
+        with self.__lock:
+            if cls is None:
+                for name in list(self.__pending()):
+                    self.__hydrate_class(name)
+                return self.__objects
+            if not isinstance(cls, str):
+                cls = cls.__name__
+            self.__hydrate_class(cls)
+            return dict(self.__index().get(cls, {}))
+
+    def count(self, cls=None):
+        """`int`: returns the number of stored objects, or of stored
+        objects of `cls` (a class or class name)"""
+        pending = self.__pending()
+        if cls is None:
+            return len(self.__objects) + sum(map(len, pending.values()))
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return len(self.__index().get(cls, {})) + len(pending.get(cls, {}))
+
+    def get(self, cls, id):
+        """`BaseModel`: returns the stored object of `cls` (a class or
+        class name) with the given `id`, or None if there is none"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        key = cls + "." + id
+        obj = self.__objects.get(key)
+        if obj is None:
+            with self.__lock:
+                record = self.__pending().get(cls, {}).pop(key, None)
+                if record is not None:
+                    obj = self.__store(key, self.__hydrate(record))
+        return obj
 
-    def all(self):
-        """`dict`: returns `_objects` private class attribute"""
-        return self.__objects
+    def classes(self):
+        """`dict`: returns the class name to model class registry built
+        from `models.class_dict`"""
+        if not self.__registry:
+            from .. import class_dict
+            for name, module in class_dict.items():
+                module = import_module(f"models.{module}")
+                self.__registry[name] = getattr(module, name)
+        return self.__registry
 
     def new(self, obj):
-        """Adds `<obj class name>.id`: `obj` key value pair to `__objects`"""
-        self.__objects[obj.__class__.__name__ + "." + obj.id] = obj
+        """Adds `<obj class name>.id`: `obj` key value pair to `__objects`,
+        replacing any raw record of that key not hydrated yet"""
+        name = obj.__class__.__name__
+        key = name + "." + obj.id
+        with self.__lock:
+            self.__pending().get(name, {}).pop(key, None)
+            self.__store(key, obj)
+            self.__changed.add(key)
+            self.__deleted.discard(key)
+
+    def touch(self, obj, name=None):
+        """Flags `obj` as changed so the next save re-serializes it, and
+        re-indexes its indexed attributes, or only `name` if given, if it
+        is stored"""
+        key = obj.__class__.__name__ + "." + getattr(obj, 'id', '')
+        with self.__lock:
+            self.__changed.add(key)
+            spatial = self.__spatial is not None and (
+                name is None or name in self.__spatial.fields)
+            text = self.__text.watches(obj.__class__.__name__, name)
+            if ((self.__attributes or spatial or text) and
+                    self.__objects.get(key) is obj):
+                self.__index()
+                self.__attributes.update(key, obj, name)
+                if spatial:
+                    self.__spatial.update(key, obj)
+                if text:
+                    self.__text.update(key, obj)
+
+    def relink(self, obj, name, old):
+        """Re-indexes the reference field `name` of `obj`, if stored, which
+        held `old` before it was set"""
+        key = obj.__class__.__name__ + "." + getattr(obj, 'id', '')
+        with self.__lock:
+            if self.__objects.get(key) is obj:
+                self.__index()
+                self.__references.move(key, obj, name, old)
+
+    def related(self, cls, field, id):
+        """`list`: returns the stored objects of `cls` (a class or class
+        name) whose reference field `field` holds `id`"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        with self.__lock:
+            self.__hydrate_class(cls)
+            self.__index()
+            return self.__references.get(cls, field, id)
+
+    def query(self, cls):
+        """`Query`: returns a query of the stored objects of `cls` (a class
+        or class name)"""
+        return Query(self, cls)
+
+    def add_index(self, cls, field, kind="hash"):
+        """Indexes the attribute `field` of the stored objects of `cls` (a
+        class or class name) for queries: a "hash" index for equality
+        conditions or a "sorted" one for ranges as well
+
+        Raises:
+            ValueError: if `kind` is not a kind of index
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        with self.__lock:
+            self.__hydrate_class(cls)
+            self.__attributes.declare(cls, field, kind,
+                                      self.__index().get(cls, {}))
+
+    def drop_index(self, cls, field):
+        """Removes the index of the attribute `field` of `cls` (a class or
+        class name), if any"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        with self.__lock:
+            self.__attributes.drop(cls, field)
+
+    def indexes(self):
+        """`dict`: returns the class name to `{field: kind}` dictionary of
+        the indexed attributes"""
+        return self.__attributes.declared()
+
+    def lookup(self, cls, conditions):
+        """`tuple`: returns stored objects of `cls` (a class or class
+        name), among which all those satisfying `conditions`, a field to
+        `(op, value)` pairs dictionary (see `Query`), found through the
+        indexes of its fields, and the set of the fields whose conditions
+        they all satisfy, or None if no index can narrow them down"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        with self.__lock:
+            self.__hydrate_class(cls)
+            self.__index()
+            found = self.__attributes.lookup(cls, conditions)
+            if found is None:
+                return None
+            objects = self.__objects
+            return [objects[key] for key in found[0]], found[1]
+
+    def near(self, lat, lon, radius_km, limit=None):
+        """`list`: returns the stored places within `radius_km` kilometers
+        of the point at `lat`, `lon` (in degrees), nearest first, at most
+        `limit` of them if given
+
+        Raises:
+            ValueError: if the point, radius or limit is out of range
+        """
+        with self.__lock:
+            self.__hydrate_class("Place")
+            self.__index()
+            if self.__spatial is None:
+                self.__spatial = SpatialIndex()
+                self.__spatial.rebuild(self.__classes.get("Place", {}))
+            objects = self.__objects
+            return [objects[key] for distance, key in
+                    self.__spatial.near(lat, lon, radius_km, limit)]
+
+    def search(self, cls, text, limit=None):
+        """`list`: returns the stored objects of `cls` (a class or class
+        name) whose text attributes (`Place.name` and `description`,
+        `Review.text`) hold any of the words of `text`, best match first by
+        BM25, at most `limit` of them if given; a word ending in "*"
+        matches every word starting with it
+
+        Raises:
+            ValueError: if the class has no text attributes to search
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        with self.__lock:
+            self.__hydrate_class(cls)
+            self.__index()
+            if not self.__text.built(cls):
+                self.__text.build(cls, self.__classes.get(cls, {}))
+            objects = self.__objects
+            return [objects[key] for score, key in
+                    self.__text.search(cls, text, limit)]
+
+    def delete(self, obj=None):
+        """Removes `obj` from `__objects` if it is stored there"""
+        if obj is None:
+            return
+        key = obj.__class__.__name__ + "." + obj.id
+        with self.__lock:
+            if self.__discard(key):
+                self.__fragments.pop(key, None)
+                self.__mutable.discard(key)
+                self.__changed.discard(key)
+                self.__deleted.add(key)
 
     def save(self):
-        """Serializes `__object` to a JSON file named in `__file_path`"""
-        with open(self.__file_path, 'w', encoding='utf-8') as file:
-            objects_json = {}
-            for key, obj in self.__objects.items():
-                objects_json[key] = obj.to_dict()
-            json.dump(objects_json, file)
+        """Serializes `__object` to a JSON file named in `__file_path`,
+        or appends the pending changes to the journal when enabled
+
+        The snapshot is written to a temporary file, fsynced unless
+        `HBNB_FS_FSYNC=0`, then renamed over the old one, re-encoding only
+        the objects changed since the last save and those holding lists or
+        dictionaries, which may have changed in place. With journaling enabled
+        (`HBNB_FS_JOURNAL=1`) the changes are appended to `<file>.journal`
+        until it holds `__journal_limit` records and is folded into a new
+        snapshot. Inside a `batch` block the save is made when the block
+        exits, and in write-behind mode (`HBNB_FS_FLUSH_MS=<n>`) by a
+        background thread at most every n milliseconds (see `flush`).
+        """
+        if self.__batch_depth:
+            self.__batch_saved = True
+        elif self.__flush_interval:
+            self.__save_due = True
+            if self.__flusher is None or not self.__flusher.is_alive():
+                self.__start_flusher()
+            self.__flush_wakeup.set()
+        else:
+            self.__save_now()
+
+    def flush(self):
+        """Makes the save deferred by write-behind mode right now, if one
+        is due"""
+        if self.__save_due:
+            self.__save_now()
+
+    @contextmanager
+    def batch(self, fsync=None):
+        """Defers the saves made in the block to a single save on exit
+
+        The save is made even if the block raises, as its changes are
+        already applied to the stored objects. `fsync` overrides the
+        `HBNB_FS_FSYNC` setting for that save, e.g. False for bulk loads;
+        in write-behind mode, such a save is made when the block exits
+        rather than by the background thread. Blocks can be nested; only
+        the outermost one saves.
+        """
+        self.__batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.__batch_depth -= 1
+            if not self.__batch_depth and self.__batch_saved:
+                self.__batch_saved = False
+                default = self.__fsync
+                if fsync is not None:
+                    self.__fsync = fsync
+                try:
+                    self.save()
+                    if fsync is not None:
+                        self.flush()
+                finally:
+                    self.__fsync = default
+
+    transaction = batch
 
     def reload(self):
         """Deseralizes the JSON file named in `__file_path` and assign
-        it to `__objects`"""
-        from ..base_model import BaseModel
-        from ..user import User
-        from ..state import State
-        from ..city import City
-        from ..place import Place
-        from ..amenity import Amenity
-        from ..review import Review
-        objects_json = {}
+        it to `__objects`, then replays any pending journal records
+
+        Instances are built without running `BaseModel.__init__`, and
+        their timestamps are left as ISO strings until read. With lazy
+        loading enabled (`HBNB_FS_LAZY=1`), or from a record file, records
+        are kept raw until their object is first looked up; with streaming
+        enabled (`HBNB_FS_STREAM=1`), a JSON file is parsed one record at
+        a time.
+        """
+        with self.__lock:
+            self.__reload()
+
+    def convert(self, source, destination):
+        """Converts the snapshot file `source` to `destination`, each in
+        the format given by its file extension (JSON, JSON lines record
+        file or pickle), or by `HBNB_FS_FORMAT` for the storage file
+        itself. The records of the journal of `source`, if any, are
+        applied first. Only convert pickles you wrote yourself, as
+        unpickling can run arbitrary code.
+
+        Raises:
+            ValueError: if `source` does not hold records
+            pickle.UnpicklingError: if a pickle `source` is corrupt
+        """
+        records = self.__read(source)
+        if type(records) is not dict or not all(
+                type(record) is dict for record in records.values()):
+            raise ValueError("{} holds no records".format(source))
+        for record in self.__journal_records(source + ".journal"):
+            key, obj = record['key'], record.get('obj')
+            if obj is None:
+                records.pop(key, None)
+            else:
+                records[key] = obj
+        if self.__layout(destination) == "pickle":
+            for record in records.values():
+                self.__typed(record)
+        self.__dump(destination, records)
+
+    def __reload(self):
+        """Loads the snapshot file and replays the journal"""
+        layout = self.__layout(self.__file_path)
+        try:
+            if layout == "jsonl":
+                self.__load_all(self.__record_file().index().items(), True)
+            elif layout == "json" and self.__stream:
+                with open(self.__file_path, 'r', encoding='utf-8') as file:
+                    self.__load_all(iter_items(file))
+            else:
+                self.__load_all(self.__read(self.__file_path).items())
+        except FileNotFoundError:
+            pass
+        self.__journal_size = 0
+        for record in self.__journal_records(self.__journal_path(), True):
+            self.__journal_size += 1
+            key, obj = record['key'], record.get('obj')
+            if obj is None:
+                self.__discard(key)
+            else:
+                self.__load(key, obj)
+
+    def __journal_records(self, path, repair=False):
+        """Yields the records of the journal at `path`, if any, up to a
+        torn last record from an interrupted append, which is cut off if
+        `repair` so that the next append starts on a new line"""
         try:
-            with open(self.__file_path, 'r', encoding='utf-8') as file:
-                objects_json = json.load(file)
-                for key, obj in objects_json.items():
-                    self.__objects[key] = eval(obj['__class__'] + '(**obj)')
+            file = open(path, 'rb')
+        except FileNotFoundError:
+            return
+        with file:
+            end = 0
+            for line in file:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated record")
+                    record = self.__codec.loads(line)
+                except ValueError:
+                    if repair:
+                        os.truncate(path, end)
+                    return
+                end += len(line)
+                yield record
+
+    def __save_now(self):
+        """Writes the pending changes to the journal, or a new snapshot"""
+        with self.__lock:
+            self.__save_due = False
+            try:
+                if (self.__journal and
+                        self.__journal_size < self.__journal_limit and
+                        os.path.exists(self.__file_path)):
+                    self.__append_journal()
+                else:
+                    self.__write_snapshot()
+            except BaseException:
+                self.__save_due = True
+                raise
+
+    def __start_flusher(self):
+        """Starts the write-behind thread, and flushes at exit"""
+        if self.__flusher is None:
+            atexit.register(self.flush)
+        self.__flusher = threading.Thread(target=self.__flush_loop,
+                                          name="FileStorage flusher",
+                                          daemon=True)
+        self.__flusher.start()
+
+    def __flush_loop(self):
+        """Saves in the background, at most once every `__flush_interval`
+        seconds, whenever a save is due"""
+        last = 0
+        while True:
+            self.__flush_wakeup.wait()
+            time.sleep(max(0, last + self.__flush_interval - time.monotonic()))
+            self.__flush_wakeup.clear()
+            last = time.monotonic()
+            try:
+                self.flush()
+            except Exception:
+                # left due; the error surfaces on the next `flush` call
+                pass
+
+    def __layout(self, path):
+        """`str`: returns the format of the snapshot at `path`: "json",
+        "jsonl" or "pickle", given by its extension or, for `__file_path`
+        only, by `HBNB_FS_FORMAT`"""
+        if self.__format and path == self.__file_path:
+            return self.__format
+        if path.endswith((".pickle", ".pkl")):
+            return "pickle"
+        if path.endswith(".jsonl"):
+            return "jsonl"
+        return "json"
+
+    def __record_file(self):
+        """`RecordFile`: returns the record file at `__file_path`"""
+        if self.__records is None or self.__records.path != self.__file_path:
+            if self.__records is not None:
+                self.__records.close()
+            self.__records = RecordFile(self.__file_path, self.__codec)
+        return self.__records
+
+    def __read(self, path):
+        """`dict`: returns the key to record dictionary of the snapshot
+        file at `path`"""
+        layout = self.__layout(path)
+        if layout == "pickle":
+            with open(path, 'rb') as file:
+                return pickle.load(file)
+        if layout == "jsonl":
+            records = RecordFile(path, self.__codec)
+            try:
+                return {key: self.__codec.loads(records.read(*span))
+                        for key, span in records.index().items()}
+            finally:
+                records.close()
+        with open(path, 'r', encoding='utf-8') as file:
+            return self.__codec.loads(file.read())
+
+    def __dump(self, path, records):
+        """Writes the key to record dictionary `records` to `path`"""
+        layout = self.__layout(path)
+        if layout == "pickle":
+            with atomic_write(path, True, self.__fsync) as file:
+                pickle.dump(records, file, protocol=5)
+        elif layout == "jsonl":
+            encode = self.__codec.encode
+            record_file = RecordFile(path, self.__codec)
+            record_file.write(((key, encode(record))
+                               for key, record in records.items()),
+                              self.__fsync)
+            record_file.close()
+        else:
+            with atomic_write(path, True, self.__fsync) as file:
+                file.write(self.__codec.encode(records))
+
+    def __resolve(self, record):
+        """`dict`: returns the raw record `record`, decoding it from the
+        record file first if it is an `[offset, length]` span"""
+        if type(record) is list:
+            return self.__codec.loads(self.__records.read(*record))
+        return record
+
+    @staticmethod
+    def __typed(record):
+        """`dict`: parses the ISO format timestamps of `record`, if any, in
+        place"""
+        for name in ('created_at', 'updated_at'):
+            if type(record.get(name)) is str:
+                record[name] = datetime.fromisoformat(record[name])
+        return record
+
+    @staticmethod
+    def __record(obj):
+        """`dict`: returns the same dictionary as `obj.to_dict()`, minus
+        formatting the datetimes, which the codecs serialize themselves"""
+        record = attributes(obj)
+        record['__class__'] = obj.__class__.__name__
+        return record
+
+    def __load(self, key, record, lazy=False):
+        """Stores the `to_dict` output `record` under `key`, hydrated now
+        or kept raw until first use when `lazy` or lazy loading is
+        enabled"""
+        self.__fragments.pop(key, None)
+        if lazy or self.__lazy:
+            self.__discard(key)
+            name = key.partition(".")[0]
+            self.__pending().setdefault(name, {})[key] = record
+        else:
+            self.__store(key, self.__hydrate(record))
+
+    def __load_all(self, records, lazy=False):
+        """Stores every record of the iterable of `(key, record)` pairs
+        `records`, hydrating them in one tight loop unless `lazy` or lazy
+        loading is enabled"""
+        if lazy or self.__lazy:
+            for key, record in records:
+                self.__load(key, record, True)
+            return
+        classes = self.classes()
+        index = self.__index()
+        for name in classes:
+            index.setdefault(name, {})
+        objects = self.__objects
+        references = self.__references
+        fragments = self.__fragments
+        for key, record in records:
+            fragments.pop(key, None)
+            name = record.pop('__class__')
+            cls = classes[name]
+            obj = object.__new__(cls)
+            if cls._references:
+                intern_references(cls, record)
+            if compact:
+                update_attributes(obj, record)
+            else:
+                obj.__dict__.update(record)
+            if key in objects:
+                references.remove(key, objects[key])
+            objects[key] = obj
+            index[name][key] = obj
+            if cls._references:
+                references.add(key, obj)
+        if self.__attributes:
+            self.__attributes.rebuild(index)
+        if self.__spatial is not None:
+            self.__spatial.rebuild(index.get("Place", {}))
+        if self.__text:
+            self.__text.rebuild(index)
+
+    def __hydrate_class(self, name):
+        """Hydrates all the raw records of the class named `name`"""
+        records = self.__pending().pop(name, None)
+        if records:
+            for key, record in records.items():
+                self.__store(key, self.__hydrate(record))
 
+    def __hydrate(self, record):
+        """`BaseModel`: builds the instance described by the `to_dict`
+        output `record` without calling `__init__` or `__setattr__`"""
+        record = self.__resolve(record)
+        cls = self.classes()[record.pop('__class__')]
+        obj = cls.__new__(cls)
+        update_attributes(obj, intern_references(cls, record))
+        return obj
+
+    def __store(self, key, obj):
+        """`BaseModel`: adds `obj` under `key` to `__objects` and indexes"""
+        self.__index().setdefault(key.partition(".")[0], {})[key] = obj
+        old = self.__objects.get(key)
+        if old is not obj:
+            if old is not None:
+                self.__references.remove(key, old)
+            self.__references.add(key, obj)
+        self.__objects[key] = obj
+        if self.__attributes:
+            self.__attributes.update(key, obj)
+        if self.__spatial is not None:
+            self.__spatial.update(key, obj)
+        if self.__text:
+            self.__text.update(key, obj)
+        return obj
+
+    def __discard(self, key):
+        """`bool`: removes `key` from `__objects`, indexes and raw records,
+        returning whether anything was stored under it"""
+        name = key.partition(".")[0]
+        found = self.__pending().get(name, {}).pop(key, None) is not None
+        obj = self.__objects.pop(key, None)
+        if obj is not None:
+            self.__classes[name].pop(key, None)
+            self.__references.remove(key, obj)
+            self.__attributes.remove(key, obj)
+            if self.__spatial is not None:
+                self.__spatial.remove(key)
+            if self.__text:
+                self.__text.remove(key)
+            found = True
+        return found
+
+    def __pending(self):
+        """`dict`: returns the class name to `{key: record}` raw records
+        not hydrated yet"""
+        self.__index()
+        return self.__raw
+
+    def __index(self):
+        """`dict`: returns the class name to `{key: obj}` index of
+        `__objects`, rebuilding it and the reference, attribute, spatial
+        and text indexes, and dropping the raw records, if `__objects` was
+        replaced"""
+        if self.__indexed is not self.__objects:
+            self.__raw = {}
+            self.__classes = {}
+            self.__references = ReferenceIndex()
+            for key, obj in self.__objects.items():
+                name = key.partition(".")[0]
+                self.__classes.setdefault(name, {})[key] = obj
+                self.__references.add(key, obj)
+            self.__attributes.rebuild(self.__classes)
+            if self.__spatial is not None:
+                self.__spatial.rebuild(self.__classes.get("Place", {}))
+            self.__text.rebuild(self.__classes)
+            self.__indexed = self.__objects
+        return self.__classes
+
+    def __journal_path(self):
+        """`str`: returns the path of the journal next to `__file_path`"""
+        return self.__file_path + ".journal"
+
+    def __fragment(self, key, obj):
+        """`bytes`: returns the JSON text of `obj` (an instance or a raw
+        record), re-encoding it only when it changed since last cached.
+        Objects holding lists or dictionaries, which can change in place
+        without `touch` knowing, are listed in `__mutable` and re-encoded
+        every time. Fragments are not cached in streaming mode."""
+        fragment = self.__fragments.get(key)
+        if (fragment is None or key in self.__changed or
+                key in self.__mutable):
+            if type(obj) is list:
+                record = self.__resolve(obj)
+            elif type(obj) is dict:
+                record = obj
+            else:
+                record = None
+            if record is None:
+                fragment = self.__encode(obj)
+                values = (attributes(obj) if compact else
+                          obj.__dict__).values()
+            else:
+                fragment = self.__codec.encode(record)
+                values = record.values()
+            if any(type(value) in (list, dict) for value in values):
+                self.__mutable.add(key)
+            else:
+                self.__mutable.discard(key)
+            if not self.__stream:
+                self.__fragments[key] = fragment
+        return fragment
+
+    def __encode(self, obj):
+        """`bytes`: returns the JSON text of the record of the instance
+        `obj`, encoding its `__dict__` as is and appending the `__class__`
+        member to the text instead of copying it into a new dictionary"""
+        if compact or not obj.__dict__:
+            return self.__codec.encode(self.__record(obj))
+        cls = obj.__class__
+        suffix = self.__suffixes.get(cls)
+        if suffix is None:
+            suffix = ', "__class__": "{}"}}'.format(cls.__name__).encode()
+            self.__suffixes[cls] = suffix
+        return self.__codec.encode(obj.__dict__)[:-1] + suffix
+
+    def __write_snapshot(self):
+        """Rewrites the whole snapshot file and drops the folded-in
+        journal"""
+        layout = self.__layout(self.__file_path)
+        if layout == "pickle":
+            self.__write_binary()
+        elif layout == "jsonl":
+            self.__write_records()
+        else:
+            self.__write_json()
+        try:
+            os.remove(self.__journal_path())
         except FileNotFoundError:
             pass
+        self.__journal_size = 0
+        self.__changed.clear()
+        self.__deleted.clear()
+
+    def __write_binary(self):
+        """Writes all stored objects to the pickle snapshot"""
+        records = {key: self.__record(obj)
+                   for key, obj in self.__objects.items()}
+        for raw in self.__pending().values():
+            for key, record in raw.items():
+                records[key] = self.__typed(self.__resolve(record))
+        self.__dump(self.__file_path, records)
+
+    def __write_records(self):
+        """Writes all stored objects to the record file, copying the bytes
+        of records that were never hydrated straight from the old file"""
+        def encoded():
+            for key, obj in self.__objects.items():
+                yield key, self.__fragment(key, obj)
+            for raw in pending.values():
+                for key, record in raw.items():
+                    if type(record) is list:
+                        yield key, record_file.read(*record)
+                    else:
+                        yield key, self.__fragment(key, record)
+        pending = self.__pending()
+        record_file = self.__record_file()
+        index = record_file.write(encoded(), self.__fsync)
+        for raw in pending.values():
+            for key, record in raw.items():
+                if type(record) is list:
+                    raw[key] = index[key]
+
+    def __write_json(self):
+        """Writes all stored objects to the JSON snapshot through the
+        buffered file, 1024 at a time, reusing the cached fragments of
+        unchanged objects"""
+        encode = self.__codec.encode
+        fragments = self.__fragments
+        changed = self.__changed
+        mutable = self.__mutable
+        count = 0
+        with atomic_write(self.__file_path, True, self.__fsync) as file:
+            file.write(b"{")
+            for records in [self.__objects] + list(self.__pending().values()):
+                entries = []
+                for key, obj in records.items():
+                    fragment = fragments.get(key)
+                    if (fragment is None or key in changed or
+                            key in mutable):
+                        fragment = self.__fragment(key, obj)
+                    entries.append(encode(key) + b": " + fragment)
+                    if len(entries) == 1024:
+                        file.write((b", " if count else b"") +
+                                   b", ".join(entries))
+                        count += len(entries)
+                        entries = []
+                if entries:
+                    file.write((b", " if count else b"") + b", ".join(entries))
+                    count += len(entries)
+            file.write(b"}")
+        if len(self.__fragments) > count:
+            # forget fragments of objects that are no longer stored
+            stored = set(self.__objects)
+            for records in self.__pending().values():
+                stored.update(records)
+            for key in self.__fragments.keys() - stored:
+                del self.__fragments[key]
+            self.__mutable &= stored
+
+    def __append_journal(self):
+        """Appends one record per changed or deleted object to the journal,
+        including the objects holding lists or dictionaries whose JSON text
+        changed in place"""
+        encode = self.__codec.encode
+        lines = []
+        for key in self.__changed:
+            obj = self.__objects.get(key)
+            if obj is not None:
+                lines.append(b'{"key": ' + encode(key) + b', "obj": ' +
+                             self.__fragment(key, obj) + b'}')
+        for key in self.__mutable - self.__changed:
+            obj = self.__objects.get(key)
+            if obj is not None:
+                old = self.__fragments.get(key)
+                fragment = self.__fragment(key, obj)
+                if fragment != old:
+                    lines.append(b'{"key": ' + encode(key) + b', "obj": ' +
+                                 fragment + b'}')
+        for key in self.__deleted:
+            lines.append(encode({'key': key}))
+        if lines:
+            with open(self.__journal_path(), 'ab') as file:
+                file.write(b"\n".join(lines) + b"\n")
+                if self.__fsync:
+                    sync(file)
+            self.__journal_size += len(lines)
+        self.__changed.clear()
+        self.__deleted.clear()
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""Contains the `iter_items` function, an incremental parser for the
+top-level JSON object of a storage file"""
+import json
+import re
+
+decoder = json.JSONDecoder()
+whitespace = re.compile(r'[ \t\n\r]*')
+
+
+class Reader():
+    """Reads JSON values one at a time from a text file, keeping only the
+    unparsed part of the last chunks read in memory"""
+
+    def __init__(self, file, chunk_size):
+        """Creates a `Reader` reading `file` `chunk_size` characters at a
+        time"""
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """`bool`: appends the next chunk of the file to the buffer, and
+        returns False if the end of the file was already reached"""
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return not self.eof
+
+    def next_char(self):
+        """`str`: skips whitespace and returns the next character, without
+        consuming it, or "" at the end of the file"""
+        while True:
+            self.pos = whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, chars):
+        """`str`: consumes and returns the next character, which must be
+        one of `chars`
+
+        Raises:
+            ValueError: if the next character is not one of `chars`
+        """
+        char = self.next_char()
+        if not char or char not in chars:
+            raise ValueError("expected one of {!r} at {!r}".format(
+                chars, self.buffer[self.pos:self.pos + 20]))
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Consumes and returns the next JSON value, which must be a
+        string, an object or an array so that it can't be cut short
+        by the end of a chunk
+
+        Raises:
+            ValueError: if the next value is not valid JSON
+        """
+        if self.next_char() not in ('"', '{', '['):
+            raise ValueError("expected a string, object or array")
+        while True:
+            try:
+                value, self.pos = decoder.raw_decode(self.buffer, self.pos)
+                return value
+            except json.JSONDecodeError:
+                # the value may continue in the next chunk
+                if not self.fill():
+                    raise
+
+
+def iter_items(file, chunk_size=1 << 16):
+    """Yields the `(key, value)` pairs of the JSON object in the text file
+    `file` one at a time, reading `chunk_size` characters at a time, so the
+    whole object is never held in memory
+
+    Raises:
+        ValueError: if the file does not hold a JSON object whose values
+            are objects, arrays or strings
+    """
+    reader = Reader(file, chunk_size)
+    reader.expect("{")
+    if reader.next_char() == "}":
+        reader.pos += 1
+        return
+    while True:
+        key = reader.value()
+        if type(key) is not str:
+            raise ValueError("expected a string key")
+        reader.expect(":")
+        yield key, reader.value()
+        if reader.expect(",}") == "}":
+            return
@@ -0,0 +1,197 @@
+#!/usr/bin/python3
+"""Contains the `Query` class
+
+Attributes:
+    operators (dict): condition operator name to function of the
+        attribute value and the condition value
+"""
+import operator
+from heapq import nlargest, nsmallest
+from itertools import islice
+
+operators = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "in": lambda attr, value: attr in value,
+    "contains": operator.contains,
+}
+_missing = object()
+
+
+def sort_key(value):
+    """`tuple`: returns a key sorting `value` among values of any type:
+    numbers first, then strings, then other values by type and text, then
+    missing values"""
+    kind = type(value)
+    if kind in (int, float, bool):
+        return (0, value)
+    if kind is str:
+        return (1, value)
+    if value is _missing or value is None:
+        return (3,)
+    return (2, kind.__name__, str(value))
+
+
+class Query():
+    """A query of the stored objects of one class, built by chaining
+    `where`, `order_by`, `limit` and `offset`, each returning a new query,
+    and run by `all`, `first`, `count` or iterating over it
+
+    `where` takes `<field>=<value>` or `<field>__<op>=<value>` conditions,
+    `<op>` being one of `operators` ("eq" by default). An object matches
+    when all the conditions hold for it; an object without the attribute,
+    or whose value cannot be compared with the condition value, does not.
+    When some of the conditions are on an attribute indexed by the storage
+    (see `FileStorage.add_index`), only the objects the indexes find are
+    checked instead of every object of the class; the bounds
+    set on a field by several conditions, as in `price_by_night__gte=50,
+    price_by_night__lt=100`, make a single lookup.
+
+    `order_by` takes field names, prefixed with "-" for descending order;
+    without it, results come in no particular order.
+    """
+
+    def __init__(self, storage, cls, conditions=(), ordering=(), skip=0,
+                 size=None):
+        """Creates a query of the objects of `cls` (a class or class name)
+        stored in `storage`"""
+        self.__storage = storage
+        self.__cls = cls if isinstance(cls, str) else cls.__name__
+        self.__conditions = tuple(conditions)
+        self.__ordering = tuple(ordering)
+        self.__skip = skip
+        self.__size = size
+
+    def __copy(self, **changes):
+        """`Query`: returns a copy of the query with `changes` made"""
+        attrs = {'conditions': self.__conditions,
+                 'ordering': self.__ordering, 'skip': self.__skip,
+                 'size': self.__size}
+        attrs.update(changes)
+        return Query(self.__storage, self.__cls, **attrs)
+
+    def where(self, **conditions):
+        """`Query`: returns the query with `conditions` added
+
+        Raises:
+            ValueError: if a condition has an unknown operator
+        """
+        added = []
+        for name, value in conditions.items():
+            field, sep, op = name.rpartition("__")
+            if not sep:
+                field, op = name, "eq"
+            elif op not in operators or not field:
+                raise ValueError("unknown operator in '{}'".format(name))
+            added.append((field, op, value))
+        return self.__copy(conditions=self.__conditions + tuple(added))
+
+    def order_by(self, *fields):
+        """`Query`: returns the query sorted by `fields`, in ascending
+        order or descending for those prefixed with "-" """
+        ordering = tuple((field[1:], True) if field.startswith("-")
+                         else (field, False) for field in fields)
+        return self.__copy(ordering=ordering)
+
+    def limit(self, count):
+        """`Query`: returns the query with at most `count` results
+
+        Raises:
+            ValueError: if `count` is not a non-negative `int`
+        """
+        if type(count) is not int or count < 0:
+            raise ValueError("invalid limit {!r}".format(count))
+        return self.__copy(size=count)
+
+    def offset(self, count):
+        """`Query`: returns the query skipping its first `count`
+        results
+
+        Raises:
+            ValueError: if `count` is not a non-negative `int`
+        """
+        if type(count) is not int or count < 0:
+            raise ValueError("invalid offset {!r}".format(count))
+        return self.__copy(skip=count)
+
+    def all(self):
+        """`list`: returns the objects matching the query"""
+        objs = self.__matches()
+        stop = None if self.__size is None else self.__skip + self.__size
+        if self.__ordering:
+            return self.__sorted(objs, stop)[self.__skip:stop]
+        return list(islice(objs, self.__skip, stop))
+
+    def first(self):
+        """`BaseModel`: returns the first object matching the query, or
+        None if there is none"""
+        found = self.limit(1).all()
+        return found[0] if found else None
+
+    def count(self):
+        """`int`: returns the number of objects matching the query"""
+        return len(self.__copy(ordering=()).all())
+
+    def __iter__(self):
+        """Iterates over the objects matching the query"""
+        return iter(self.all())
+
+    def __matches(self):
+        """Yields the objects matching the conditions, checking only those
+        the indexes of their fields find, if any, against the conditions
+        the indexes did not answer"""
+        conditions = self.__conditions
+        fields = {}
+        for field, op, value in conditions:
+            fields.setdefault(field, []).append((op, value))
+        found = None
+        if fields:
+            found = self.__storage.lookup(self.__cls, fields)
+        if found is None:
+            candidates = self.__storage.all(self.__cls).values()
+        else:
+            candidates, answered = found
+            conditions = [condition for condition in conditions
+                          if condition[0] not in answered]
+        if not conditions:
+            yield from candidates
+            return
+        for obj in candidates:
+            for field, op, value in conditions:
+                attr = getattr(obj, field, _missing)
+                if attr is _missing:
+                    break
+                try:
+                    if not operators[op](attr, value):
+                        break
+                except TypeError:
+                    break
+            else:
+                yield obj
+
+    def __sorted(self, objs, stop):
+        """`list`: returns `objs` sorted by the ordering, or only their
+        first `stop` unless it is None"""
+        ordering = self.__ordering
+        if len({descending for field, descending in ordering}) == 1:
+            fields = [field for field, descending in ordering]
+
+            def key(obj):
+                return tuple(sort_key(getattr(obj, field, _missing))
+                             for field in fields)
+            if stop is None:
+                objs = sorted(objs, key=key, reverse=ordering[0][1])
+            elif ordering[0][1]:
+                objs = nlargest(stop, objs, key=key)
+            else:
+                objs = nsmallest(stop, objs, key=key)
+        else:
+            objs = list(objs)
+            for field, descending in reversed(ordering):
+                objs.sort(key=lambda obj: sort_key(
+                    getattr(obj, field, _missing)), reverse=descending)
+        return objs
@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""Contains the `RecordFile` class"""
+import mmap
+import os
+from .atomic import atomic_write
+
+
+class RecordFile():
+    """A storage file of JSON records that can be read one at a time
+
+    The file holds one JSON record per line, followed by a line with the
+    `{key: [offset, length]}` index of those records and a fixed size
+    trailer line with the offset of the index. It is memory-mapped, so
+    reading one record only touches the bytes of that record.
+    """
+    trailer = 21
+
+    def __init__(self, path, codec):
+        """Creates a `RecordFile` for `path`, using `codec` to encode and
+        decode its index"""
+        self.path = path
+        self.__codec = codec
+        self.__file = None
+        self.__map = None
+
+    def index(self):
+        """`dict`: (re)opens the file and returns its key to
+        `[offset, length]` index
+
+        Raises:
+            FileNotFoundError: if there is no file at `path`
+        """
+        self.close()
+        self.__file = open(self.path, 'rb')
+        if os.fstat(self.__file.fileno()).st_size < self.trailer:
+            return {}
+        self.__map = mmap.mmap(self.__file.fileno(), 0,
+                               access=mmap.ACCESS_READ)
+        start = int(self.__map[-self.trailer:])
+        return self.__codec.loads(self.__map[start:-self.trailer])
+
+    def read(self, offset, length):
+        """`bytes`: returns the JSON text of the record at `offset`"""
+        return self.__map[offset:offset + length]
+
+    def write(self, records, fsync=True):
+        """`dict`: replaces the file with the `(key, JSON bytes)` pairs of
+        the iterable `records`, and returns the index of the new file
+
+        The records are written to a temporary file (fsynced unless `fsync`
+        is False) that is then renamed over `path`, so they may be read
+        from the current file meanwhile.
+        """
+        index = {}
+        offset = 0
+        with atomic_write(self.path, True, fsync) as file:
+            for key, data in records:
+                file.write(data + b"\n")
+                index[key] = [offset, len(data)]
+                offset += len(data) + 1
+            file.write(self.__codec.encode(index) + b"\n")
+            file.write(b"%020d\n" % offset)
+        return self.index()
+
+    def close(self):
+        """Unmaps and closes the file if it is open"""
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""Contains the `ReferenceIndex` class"""
+
+
+class ReferenceIndex():
+    """Reverse index of the reference fields of stored objects, such as
+    `City.state_id`, from each referenced id to the objects referencing it
+
+    The reference fields of a class are those in its `_references` that
+    hold a single id; lists of ids such as `Place.amenity_ids` can change
+    in place without the index knowing, so they are not indexed.
+    """
+
+    def __init__(self):
+        """Creates an empty `ReferenceIndex`"""
+        self.__index = {}
+
+    @staticmethod
+    def __ids(value):
+        """`list`: returns the id held by the reference field value
+        `value`, if any"""
+        return [value] if value and type(value) is str else []
+
+    def add(self, key, obj):
+        """Indexes the references of `obj`, stored under `key`"""
+        for field in obj.__class__._references:
+            self.__link(key, obj, field)
+
+    def remove(self, key, obj):
+        """Removes the references of `obj`, stored under `key`"""
+        for field in obj.__class__._references:
+            self.unlink(key, obj, field, getattr(obj, field, None))
+
+    def unlink(self, key, obj, field, value):
+        """Removes the references of the field `field` of `obj`, stored
+        under `key`, when it held `value`"""
+        refs = self.__index.get((obj.__class__.__name__, field))
+        if refs is None:
+            return
+        for ref in self.__ids(value):
+            objs = refs.get(ref)
+            if objs is not None and objs.get(key) is obj:
+                del objs[key]
+                if not objs:
+                    del refs[ref]
+
+    def move(self, key, obj, field, old):
+        """Re-indexes the field `field` of `obj`, stored under `key`, which
+        held `old` before it was set"""
+        self.unlink(key, obj, field, old)
+        self.__link(key, obj, field)
+
+    def __link(self, key, obj, field):
+        """Indexes the references of the field `field` of `obj`, stored
+        under `key`"""
+        refs = None
+        for ref in self.__ids(getattr(obj, field, None)):
+            if refs is None:
+                refs = self.__index.setdefault(
+                    (obj.__class__.__name__, field), {})
+            refs.setdefault(ref, {})[key] = obj
+
+    def get(self, name, field, ref):
+        """`list`: returns the objects of the class named `name` whose field
+        `field` references the id `ref`"""
+        return list(self.__index.get((name, field), {}).get(ref, {})
+                    .values())
@@ -0,0 +1,194 @@
+#!/usr/bin/python3
+"""Contains the `SpatialIndex` class and the `distances` function it
+measures with
+
+Attributes:
+    earth_radius (float): mean radius of the Earth in kilometers
+"""
+from heapq import nsmallest
+from math import asin, cos, degrees, floor, isfinite, radians, sin, sqrt
+from ..compact import own_attribute
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+earth_radius = 6371.0088
+
+
+def distances(lat, lon, points):
+    """`list`: returns the great-circle distances in kilometers from the
+    point at `lat`, `lon` to each of the `(lat, lon)` pairs `points`, all
+    in degrees, by the haversine formula; computed over whole arrays, and
+    returned as one, when NumPy is installed"""
+    phi0 = radians(lat)
+    cos0 = cos(phi0)
+    if numpy is not None:
+        points = numpy.asarray(points, dtype=float).reshape(-1, 2)
+        phi = numpy.radians(points[:, 0])
+        lam = numpy.radians(points[:, 1] - lon)
+        h = (numpy.sin((phi - phi0) / 2) ** 2 +
+             cos0 * numpy.cos(phi) * numpy.sin(lam / 2) ** 2)
+        return 2 * earth_radius * numpy.arcsin(numpy.sqrt(
+            numpy.minimum(h, 1.0)))
+    found = []
+    for plat, plon in points:
+        phi = radians(plat)
+        h = (sin((phi - phi0) / 2) ** 2 +
+             cos0 * cos(phi) * sin(radians(plon - lon) / 2) ** 2)
+        found.append(2 * earth_radius * asin(sqrt(min(h, 1.0))))
+    return found
+
+
+class SpatialIndex():
+    """Uniform grid index of the stored objects of one class by the
+    latitude and longitude in two of their fields, `Place.latitude` and
+    `Place.longitude` by default
+
+    The grid divides latitudes and longitudes into cells of `cell`
+    degrees, numbered row by row, each holding the `{key: (lat, lon)}`
+    dictionary of the points in it. `near` only measures the distance to
+    the points of the cells overlapping the bounding box of the circle
+    searched, wrapping around the antimeridian and spanning every
+    longitude near the poles, or of every occupied cell when there are
+    fewer of them. Objects whose coordinates are unset (such as a `Place`
+    left at its default 0.0, 0.0) or are not numbers within the latitude
+    and longitude ranges are not indexed.
+    """
+    cell = 0.1
+
+    def __init__(self, name="Place", fields=("latitude", "longitude")):
+        """Creates an empty `SpatialIndex` of the objects of the class named
+        `name` by their `fields` latitude and longitude attributes"""
+        self.name = name
+        self.fields = fields
+        self.__rows = round(180 / self.cell)
+        self.__columns = round(360 / self.cell)
+        self.__cells = {}
+        self.__points = {}
+
+    def __len__(self):
+        """`int`: returns the number of indexed points"""
+        return len(self.__points)
+
+    def __row(self, lat):
+        """`int`: returns the grid row of the latitude `lat`"""
+        return min(int((lat + 90) / self.cell), self.__rows - 1)
+
+    def __point(self, obj):
+        """`tuple`: returns the `(lat, lon)` point of `obj`, or None if its
+        fields are unset, their class defaults not counting, or do not hold
+        valid coordinates"""
+        lat = own_attribute(obj, self.fields[0])
+        lon = own_attribute(obj, self.fields[1])
+        if type(lat) not in (int, float) or type(lon) not in (int, float):
+            return None
+        if not -90 <= lat <= 90 or not isfinite(lon):
+            return None
+        return float(lat), float(lon)
+
+    def rebuild(self, objects):
+        """Rebuilds the index from the `{key: obj}` dictionary `objects`"""
+        self.__cells = {}
+        self.__points = {}
+        for key, obj in objects.items():
+            self.update(key, obj)
+
+    def update(self, key, obj):
+        """(Re-)indexes the point of `obj`, stored under `key`, if it is an
+        object of the indexed class"""
+        if obj.__class__.__name__ != self.name:
+            return
+        point = self.__point(obj)
+        if point is None:
+            self.remove(key)
+            return
+        cell = (self.__row(point[0]) * self.__columns +
+                floor((point[1] + 180) / self.cell) % self.__columns)
+        if self.__points.get(key) != cell:
+            self.remove(key)
+            self.__points[key] = cell
+        self.__cells.setdefault(cell, {})[key] = point
+
+    def remove(self, key):
+        """Removes the point stored under `key`, if any"""
+        cell = self.__points.pop(key, None)
+        if cell is not None:
+            points = self.__cells[cell]
+            del points[key]
+            if not points:
+                del self.__cells[cell]
+
+    def near(self, lat, lon, radius, limit=None):
+        """`list`: returns the `(distance, key)` pairs of the points within
+        `radius` kilometers of the point at `lat`, `lon` (in degrees),
+        nearest first, at most `limit` of them if given
+
+        Raises:
+            ValueError: if the point, radius or limit is out of range
+        """
+        if (type(lat) not in (int, float) or type(lon) not in (int, float)
+                or not -90 <= lat <= 90 or not isfinite(lon)):
+            raise ValueError("invalid point ({}, {})".format(lat, lon))
+        if not radius >= 0:
+            raise ValueError("invalid radius {}".format(radius))
+        if limit is not None and limit < 0:
+            raise ValueError("invalid limit {}".format(limit))
+        keys, points = self.__candidates(lat, lon, radius / earth_radius)
+        if not keys:
+            return []
+        found = distances(lat, lon, points)
+        if numpy is not None:
+            inside = numpy.flatnonzero(found <= radius)
+            if limit is not None and limit < len(inside):
+                inside = inside[numpy.argpartition(found[inside],
+                                                   limit)[:limit]]
+            inside = inside[numpy.argsort(found[inside], kind="stable")]
+            return [(float(found[i]), keys[i]) for i in inside]
+        pairs = [(distance, key) for distance, key in zip(found, keys)
+                 if distance <= radius]
+        if limit is not None and limit < len(pairs):
+            return nsmallest(limit, pairs)
+        pairs.sort()
+        return pairs
+
+    def __candidates(self, lat, lon, angle):
+        """`tuple`: returns the keys and points of the cells overlapping
+        the bounding box of the circle of `angle` radians around the point
+        at `lat`, `lon`"""
+        # a margin keeps rounding from leaving out points on the edge
+        span = degrees(angle) + 1e-9
+        rows = range(self.__row(max(lat - span, -90)),
+                     self.__row(min(lat + span, 90)) + 1)
+        columns = None
+        if (lat - span > -90 and lat + span < 90 and
+                sin(angle) < cos(radians(lat))):
+            width = degrees(asin(sin(angle) / cos(radians(lat)))) + 1e-9
+            first = floor((lon - width + 180) / self.cell)
+            last = floor((lon + width + 180) / self.cell)
+            if last - first + 1 < self.__columns:
+                columns = [column % self.__columns
+                           for column in range(first, last + 1)]
+        cells = self.__cells
+        size = len(rows) * (self.__columns if columns is None
+                            else len(columns))
+        if size > len(cells):
+            wanted = None if columns is None else set(columns)
+            groups = [points for cell, points in cells.items()
+                      if cell // self.__columns in rows and (
+                          wanted is None or cell % self.__columns in wanted)]
+        else:
+            groups = []
+            for row in rows:
+                first = row * self.__columns
+                for column in (range(self.__columns) if columns is None
+                               else columns):
+                    points = cells.get(first + column)
+                    if points:
+                        groups.append(points)
+        keys = []
+        points = []
+        for group in groups:
+            keys.extend(group)
+            points.extend(group.values())
+        return keys, points
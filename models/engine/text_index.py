@@ -0,0 +1,238 @@
+#!/usr/bin/python3
+"""Contains the `TextIndex` class and the `InvertedIndex` class of the
+indexes it holds
+
+Attributes:
+    words (re.Pattern): matches the words text is split into
+"""
+import re
+from collections import Counter
+from heapq import nsmallest
+from math import log
+from .attribute_index import SortedKeys
+
+words = re.compile(r"\w+")
+_terms = re.compile(r"(\w+)(\*?)")
+
+
+def tokenize(text):
+    """`list`: returns the casefolded words of `text`"""
+    return words.findall(text.casefold())
+
+
+class InvertedIndex():
+    """Inverted index of the words in some text attributes of the stored
+    objects of a class, ranking the objects a search matches by BM25
+
+    Each word maps to its postings, the `{key: count}` dictionary of the
+    objects it occurs in, and the words are kept sorted in `__vocabulary`
+    for prefix searches. The words of all the attributes of an object count
+    as a single text. Only the texts of each object are kept, and split
+    again to remove it, so each word is held once however many objects it
+    occurs in. An object is only re-tokenized when one of its texts
+    changed.
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, fields):
+        """Creates an empty index of the text attributes `fields`"""
+        self.fields = fields
+        self.__postings = {}
+        self.__documents = {}
+        self.__lengths = {}
+        self.__total = 0
+        self.__vocabulary = SortedKeys()
+
+    def __len__(self):
+        """`int`: returns the number of indexed objects"""
+        return len(self.__lengths)
+
+    def __texts(self, obj):
+        """`tuple`: returns the values of the text attributes of `obj`,
+        None for those that are not strings"""
+        texts = []
+        for field in self.fields:
+            text = getattr(obj, field, None)
+            texts.append(text if type(text) is str else None)
+        return tuple(texts)
+
+    @staticmethod
+    def __counts(texts):
+        """`Counter`: returns the number of occurrences of each word of
+        `texts`"""
+        counts = Counter()
+        for text in texts:
+            if text:
+                counts.update(tokenize(text))
+        return counts
+
+    def rebuild(self, objects):
+        """Indexes the `{key: obj}` dictionary `objects` from scratch"""
+        self.__postings = {}
+        self.__documents = {}
+        self.__lengths = {}
+        self.__total = 0
+        for key, obj in objects.items():
+            self.__add(key, self.__texts(obj), False)
+        vocabulary = sorted(self.__postings)
+        self.__vocabulary = SortedKeys(vocabulary, vocabulary)
+
+    def update(self, key, obj):
+        """Indexes `obj`, stored under `key`, or re-indexes it if one of
+        its texts changed"""
+        texts = self.__texts(obj)
+        old = self.__documents.get(key)
+        if old is not None:
+            if old == texts:
+                return
+            self.remove(key)
+        self.__add(key, texts, True)
+
+    def __add(self, key, texts, sort):
+        """Indexes the words of `texts`, of the object stored under `key`,
+        adding the new words to the vocabulary if `sort`"""
+        counts = self.__counts(texts)
+        postings = self.__postings
+        for term, count in counts.items():
+            try:
+                postings[term][key] = count
+            except KeyError:
+                postings[term] = {key: count}
+                if sort:
+                    self.__vocabulary.add(term, term)
+        length = sum(counts.values())
+        self.__documents[key] = texts
+        self.__lengths[key] = length
+        self.__total += length
+
+    def remove(self, key):
+        """Removes the object stored under `key` from the index"""
+        texts = self.__documents.pop(key, None)
+        if texts is None:
+            return
+        self.__total -= self.__lengths.pop(key)
+        postings = self.__postings
+        for term in self.__counts(texts):
+            found = postings[term]
+            del found[key]
+            if not found:
+                del postings[term]
+                self.__vocabulary.remove(term, term)
+
+    def search(self, text, limit=None):
+        """`list`: returns the `(score, key)` pairs of the objects matching
+        any of the words of `text`, best first, at most `limit` of them if
+        given; a word ending in "*" matches every word starting with it"""
+        lengths = self.__lengths
+        if not lengths or not self.__total:
+            return []
+        count = len(lengths)
+        k1 = self.k1
+        # the part of the BM25 denominator due to the length of the text
+        scale = k1 * self.b * count / self.__total
+        base = k1 * (1 - self.b)
+        scores = {}
+        for word, star in dict.fromkeys(_terms.findall(text.casefold())):
+            if star:
+                terms = self.__vocabulary.between((word, True),
+                                                  (word + "\U0010ffff", False))
+            else:
+                terms = [word]
+            # a prefix counts once, by the best word it matches
+            best = {}
+            for term in terms:
+                postings = self.__postings.get(term)
+                if not postings:
+                    continue
+                weight = (k1 + 1) * log(1 + (count - len(postings) + 0.5) /
+                                        (len(postings) + 0.5))
+                if star:
+                    for key, frequency in postings.items():
+                        score = weight * frequency / (
+                            frequency + base + scale * lengths[key])
+                        if score > best.get(key, 0):
+                            best[key] = score
+                elif not scores:
+                    scores = {key: weight * frequency / (
+                        frequency + base + scale * lengths[key])
+                        for key, frequency in postings.items()}
+                else:
+                    for key, frequency in postings.items():
+                        scores[key] = scores.get(key, 0) + weight * (
+                            frequency / (frequency + base +
+                                         scale * lengths[key]))
+            for key, score in best.items():
+                scores[key] = scores.get(key, 0) + score
+        ranked = ((-score, key) for key, score in scores.items())
+        if limit is None:
+            ranked = sorted(ranked)
+        else:
+            ranked = nsmallest(limit, ranked)
+        return [(-score, key) for score, key in ranked]
+
+
+class TextIndex():
+    """The `InvertedIndex` indexes of the text attributes of the classes
+    in `fields`, by class name
+
+    The index of a class is only built when it is first searched, through
+    `build`, and kept current from then on.
+    """
+    fields = {"Place": ("name", "description"), "Review": ("text",)}
+
+    def __init__(self):
+        """Creates a `TextIndex` without any index built"""
+        self.__indexes = {}
+
+    def __bool__(self):
+        """`bool`: returns whether any index is built"""
+        return bool(self.__indexes)
+
+    def built(self, name):
+        """`bool`: returns whether the index of the class named `name` is
+        built"""
+        return name in self.__indexes
+
+    def build(self, name, objects):
+        """Builds the index of the class named `name` from the `{key: obj}`
+        dictionary `objects`
+
+        Raises:
+            ValueError: if the class has no text attributes to index
+        """
+        if name not in self.fields:
+            raise ValueError("{} has no text attributes".format(name))
+        index = InvertedIndex(self.fields[name])
+        index.rebuild(objects)
+        self.__indexes[name] = index
+
+    def watches(self, name, field=None):
+        """`bool`: returns whether the attribute `field` of the class named
+        `name`, or any if None, is indexed"""
+        index = self.__indexes.get(name)
+        return index is not None and (field is None or field in index.fields)
+
+    def rebuild(self, classes):
+        """Rebuilds every built index from the class name to `{key: obj}`
+        dictionary `classes`"""
+        for name, index in self.__indexes.items():
+            index.rebuild(classes.get(name, {}))
+
+    def update(self, key, obj):
+        """(Re-)indexes `obj`, stored under `key`"""
+        index = self.__indexes.get(obj.__class__.__name__)
+        if index is not None:
+            index.update(key, obj)
+
+    def remove(self, key):
+        """Removes the object stored under `key`, if indexed"""
+        index = self.__indexes.get(key.partition(".")[0])
+        if index is not None:
+            index.remove(key)
+
+    def search(self, name, text, limit=None):
+        """`list`: returns the `(score, key)` pairs of the objects of the
+        class named `name` matching `text`, best first (see
+        `InvertedIndex.search`), at most `limit` of them if given"""
+        return self.__indexes[name].search(text, limit)
@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 """Contains the `Place` class"""
+from . import storage
 from .base_model import BaseModel
 
 
@@ -18,3 +19,8 @@ class Place(BaseModel):
     latitude = 0.0
     longitude = 0.0
     amenity_ids = []
+
+    @property
+    def reviews(self):
+        """`list`: returns the reviews of this place"""
+        return storage.related("Review", "place_id", self.id)
@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 """Contains the `State` class"""
+from . import storage
 from .base_model import BaseModel
 
 
@@ -8,3 +9,8 @@ class State(BaseModel):
     defines a state with name class attribute.
     """
     name = ""
+
+    @property
+    def cities(self):
+        """`list`: returns the cities of this state"""
+        return storage.related("City", "state_id", self.id)
@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 """Contains the `User` class"""
+from . import storage
 from .base_model import BaseModel
 
 
@@ -11,3 +12,13 @@ class User(BaseModel):
     password = ""
     first_name = ""
     last_name = ""
+
+    @property
+    def places(self):
+        """`list`: returns the places this user owns"""
+        return storage.related("Place", "user_id", self.id)
+
+    @property
+    def reviews(self):
+        """`list`: returns the reviews this user wrote"""
+        return storage.related("Review", "user_id", self.id)
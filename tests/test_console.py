@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 """Contains test cases for the command line interface of the AirBnB project"""
+import json
 import os
 import pycodestyle
 from io import StringIO
@@ -652,6 +653,146 @@ class TestCountCommand(TestCase):
             self.assertEqual(f.getvalue(), output)
 
 
+class TestWhereCommand(TestCase):
+    """Test the <class name>.where() command"""
+
+    def setUp(self):
+        """Create places with various prices"""
+        storage._FileStorage__objects = {}
+        self.places = []
+        for i in range(5):
+            p = Place()
+            p.price_by_night = i * 50
+            p.max_guest = i
+            self.places.append(p)
+
+    def tearDown(self):
+        """Tear down for where method tests."""
+        storage._FileStorage__objects = {}
+        if os.path.exists(storage._FileStorage__file_path):
+            os.remove(storage._FileStorage__file_path)
+
+    def where(self, line):
+        """`str`: returns the output of the command `line`"""
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd(line)
+            return f.getvalue()
+
+    def test_where(self):
+        """Test conditions, ordering and limit"""
+        output = self.where('Place.where(price_by_night__lt=150, '
+                            'max_guest__gte=1, order_by="-price_by_night")')
+        self.assertEqual(output.strip(), str([str(self.places[2]),
+                                              str(self.places[1])]))
+        output = self.where('Place.where(order_by=["max_guest"], limit=2, '
+                            'offset=1)')
+        self.assertEqual(output.strip(), str([str(self.places[1]),
+                                              str(self.places[2])]))
+        self.assertEqual(self.where('Place.where(max_guest=9)'), "[]\n")
+        self.assertEqual(self.where('User.where()'), "[]\n")
+
+    def test_error_message(self):
+        """Test invalid classes and queries"""
+        self.assertEqual(self.where("MyModel.where()"),
+                         "** class doesn't exist **\n")
+        for line in ('Place.where(max_guest)', 'Place.where(a__b=1)',
+                     'Place.where(limit="x")', 'Place.where(x=len)',
+                     'Place.where(x=1', 'Place.where(limit=-1)',
+                     'Place.where(order_by="name", offset=-1)'):
+            self.assertEqual(self.where(line), "** invalid query **\n")
+
+
+class TestNearCommand(TestCase):
+    """Test the near command"""
+
+    def setUp(self):
+        """Create places along the equator, 0.1 degree apart"""
+        storage._FileStorage__objects = {}
+        self.places = []
+        for i in range(4):
+            p = Place()
+            p.latitude = 0.0
+            p.longitude = i / 10
+            self.places.append(p)
+
+    def tearDown(self):
+        """Tear down for near method tests."""
+        storage._FileStorage__objects = {}
+        if os.path.exists(storage._FileStorage__file_path):
+            os.remove(storage._FileStorage__file_path)
+
+    def near(self, line):
+        """`str`: returns the output of the command `line`"""
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd(line)
+            return f.getvalue()
+
+    def test_near(self):
+        """Test places are printed nearest first, up to the limit"""
+        self.assertEqual(self.near("near 0 0.22 15").strip(),
+                         str([str(self.places[2]), str(self.places[3]),
+                              str(self.places[1])]))
+        self.assertEqual(self.near("near 0.0 0.22 15 1").strip(),
+                         str([str(self.places[2])]))
+        self.assertEqual(self.near("near -45 120 100"), "[]\n")
+        Place()
+        self.assertEqual(self.near("near 0 0 1").strip(),
+                         str([str(self.places[0])]))
+
+    def test_error_message(self):
+        """Test missing and invalid arguments"""
+        self.assertEqual(self.near("near"), "** latitude missing **\n")
+        self.assertEqual(self.near("near 0"), "** longitude missing **\n")
+        self.assertEqual(self.near("near 0 0"), "** radius missing **\n")
+        for line in ("near 0 x 10", "near 91 0 10", "near 0 0 -1",
+                     "near 0 0 10 1.5"):
+            self.assertEqual(self.near(line), "** invalid location **\n")
+
+
+class TestSearchCommand(TestCase):
+    """Test the search command"""
+
+    def setUp(self):
+        """Create reviews"""
+        storage._FileStorage__objects = {}
+        self.reviews = []
+        for text in ("Clean and quiet", "Noisy street", "Very clean room"):
+            r = Review()
+            r.text = text
+            self.reviews.append(r)
+
+    def tearDown(self):
+        """Tear down for search method tests."""
+        storage._FileStorage__objects = {}
+        if os.path.exists(storage._FileStorage__file_path):
+            os.remove(storage._FileStorage__file_path)
+
+    def search(self, line):
+        """`str`: returns the output of the command `line`"""
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd(line)
+            return f.getvalue()
+
+    def test_search(self):
+        """Test the best matches are printed first, up to the limit"""
+        self.assertEqual(self.search('search Review "clean room"').strip(),
+                         str([str(self.reviews[2]), str(self.reviews[0])]))
+        self.assertEqual(self.search('search Review "noi*" 1').strip(),
+                         str([str(self.reviews[1])]))
+        self.assertEqual(self.search("search Review garden"), "[]\n")
+
+    def test_error_message(self):
+        """Test missing and invalid arguments"""
+        self.assertEqual(self.search("search"), "** class name missing **\n")
+        self.assertEqual(self.search("search MyModel x"),
+                         "** class doesn't exist **\n")
+        self.assertEqual(self.search("search Review"), "** words missing **\n")
+        self.assertEqual(self.search('search Review "x" y'),
+                         "** invalid limit **\n")
+        self.assertEqual(self.search('search User "x"'),
+                         "** class can't be searched **\n")
+
+
 class TestUpdateCommand(TestCase):
     """Test the update command"""
 
@@ -812,6 +953,41 @@ class TestUpdateCommand(TestCase):
             self.assertIn("'email': 'ma@mail.com'", f.getvalue())
             self.assertIn("'password': '1234'", f.getvalue())
 
+    def test_update_dict_single_save(self):
+        """Test a dictionary update writes the storage file once"""
+        u = User()
+        u.save()
+        write = type(storage)._FileStorage__write_snapshot
+        with patch.object(type(storage), '_FileStorage__write_snapshot',
+                          autospec=True, side_effect=write) as w:
+            with patch('sys.stdout', new=StringIO()):
+                HBNBCommand().onecmd("User.update({}, {})".format(
+                    u.id, {'email': 'ma@mail.com', 'password': '1234',
+                           'first_name': 'Bola'}))
+            self.assertEqual(w.call_count, 1)
+        with open(storage._FileStorage__file_path, 'r') as file:
+            self.assertEqual(json.load(file)[f"User.{u.id}"]['first_name'],
+                             'Bola')
+
+    def test_update_read_only(self):
+        """Test relationship properties can't be updated"""
+        s = State()
+        s.name = "Lagos"
+        s.save()
+        output = "** attribute can't be updated **\n"
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd(f"update State {s.id} cities Ikeja")
+            self.assertEqual(f.getvalue(), output)
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd(f"State.update({s.id}, cities, Ikeja)")
+            self.assertEqual(f.getvalue(), output)
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd(
+                f"State.update({s.id}, {{'name': 'Osun', 'cities': []}})")
+            self.assertEqual(f.getvalue(), output)
+        self.assertEqual(s.name, "Lagos")
+        self.assertEqual(s.cities, [])
+
     def test_error_message(self):
         with patch('sys.stdout', new=StringIO()) as f:
             HBNBCommand().onecmd("create User")
@@ -862,3 +1038,61 @@ class TestUpdateCommand(TestCase):
         with patch('sys.stdout', new=StringIO()) as f:
             HBNBCommand().onecmd(f"User.update({uid}, first_name)")
             self.assertEqual(f.getvalue(), output)
+
+
+class TestConvertCommand(TestCase):
+    """Test the convert command"""
+
+    def tearDown(self):
+        """Resets FileStorage data and removes converted files"""
+        storage._FileStorage__objects = {}
+        for path in (storage._FileStorage__file_path, "test_convert.pickle",
+                     "test_convert.json", "test_convert.jsonl"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_convert(self):
+        """Test converting to pickle and back gives the same records"""
+        u = User()
+        u.first_name = "Bola"
+        u.save()
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd(
+                f"convert {storage._FileStorage__file_path} "
+                "test_convert.pickle")
+            HBNBCommand().onecmd(
+                "convert test_convert.pickle test_convert.json")
+            self.assertEqual(f.getvalue(), "")
+        with open("test_convert.json", 'r', encoding='utf-8') as file:
+            self.assertEqual(json.load(file), {f"User.{u.id}": u.to_dict()})
+
+    def test_error_message(self):
+        output = "** source file missing **\n"
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd("convert")
+            self.assertEqual(f.getvalue(), output)
+        output = "** destination file missing **\n"
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd("convert file.json")
+            self.assertEqual(f.getvalue(), output)
+        output = "** source file doesn't exist **\n"
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd("convert missing.json test_convert.pickle")
+            self.assertEqual(f.getvalue(), output)
+        storage.save()
+        output = "** destination file can't be written **\n"
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd(
+                f"convert {storage._FileStorage__file_path} "
+                "missing/test_convert.pickle")
+            self.assertEqual(f.getvalue(), output)
+        output = "** source file is invalid **\n"
+        for name, content in (("test_convert.json", b"{not json"),
+                              ("test_convert.pickle", b"not a pickle"),
+                              ("test_convert.json", b"[1, 2]"),
+                              ("test_convert.json", b'{"User.1": 5}')):
+            with open(name, 'wb') as file:
+                file.write(content)
+            with patch('sys.stdout', new=StringIO()) as f:
+                HBNBCommand().onecmd(f"convert {name} test_convert.jsonl")
+                self.assertEqual(f.getvalue(), output)
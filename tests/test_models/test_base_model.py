@@ -3,6 +3,7 @@
 `TestBaseModel` test case to test the `BaseModel` class
 """
 from models.base_model import BaseModel
+from models import storage
 from datetime import datetime
 import time
 import uuid
@@ -48,6 +49,16 @@ class TestBaseModel(unittest.TestCase):
         self.assertTrue(all([a.id != '123', a.created_at != '0',
                             a.updated_at != '0']))
 
+    def test_init_parses_timestamps_lazily(self):
+        """Tests timestamps passed as strings are parsed when first read"""
+        data = self.a.to_dict()
+        obj = BaseModel(**data)
+        self.assertEqual(obj.__dict__['created_at'], data['created_at'])
+        self.assertEqual(obj.to_dict(), data)
+        self.assertEqual(obj.created_at, self.a.created_at)
+        self.assertIs(type(obj.__dict__['created_at']), datetime)
+        self.assertEqual(obj.to_dict(), data)
+
     def test_attributes(self):
         """Tests if required attributes exist"""
         attributes = ['id', 'created_at', 'updated_at']
@@ -130,6 +141,16 @@ class TestBaseModel(unittest.TestCase):
                   for new, old in zip(update_at_new, updated_at_old)]
         self.assertTrue(all(delta >= 1 for delta in deltas))
 
+    def test_save_unstored(self):
+        """Tests saving a destroyed object or a copy does not store it"""
+        key = "BaseModel." + self.a.id
+        copy = BaseModel(**self.a.to_dict())
+        copy.save()
+        self.assertIs(storage.all()[key], self.a)
+        storage.delete(self.a)
+        self.a.save()
+        self.assertNotIn(key, storage.all())
+
     def test_to_dict(self):
         """Tests the to_dict method"""
         with self.assertRaises(TypeError) as e:
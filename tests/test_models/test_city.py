@@ -156,6 +156,14 @@ class TestCity(unittest.TestCase):
             obj_dict['updated_at'] = obj.updated_at.isoformat()
             self.assertEqual(obj.to_dict(), obj_dict)
 
+    def test_state_id_interned(self):
+        """Tests cities of the same state share its id string"""
+        state_id = str(uuid.uuid4())
+        self.a.state_id = state_id[:18] + state_id[18:]
+        self.b.state_id = state_id[:9] + state_id[9:]
+        self.assertEqual(self.a.state_id, state_id)
+        self.assertIs(self.a.state_id, self.b.state_id)
+
     def test_doc(self):
         """Tests presence of documentation"""
         self.assertIsNotNone(__import__('models.city').__doc__)
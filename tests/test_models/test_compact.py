@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+"""
+`TestCompactMode` test case to test the slots based compact mode of the
+model classes
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# run in a new interpreter, as the mode is chosen when classes are created
+SCRIPT = """
+import json
+from datetime import datetime
+from console import HBNBCommand
+from models import storage
+from models.place import Place
+from models.user import User
+
+place = Place(id="p1", created_at="2017-09-28T21:05:54.119427",
+              updated_at="2017-09-28T21:05:54.119572", city_id="c1",
+              name="Loft", max_guest=4, latitude=1.5)
+place.rooms_note = "quiet"
+storage.new(place)
+user = User(id="u1", created_at="2017-09-28T21:05:54.119427",
+            updated_at="2017-09-28T21:05:54.119572")
+storage.new(user)
+HBNBCommand().onecmd('update User u1 email "a@b.c"')
+HBNBCommand().onecmd('update Place p1 max_guest "6"')
+place.updated_at = user.updated_at = datetime(2017, 9, 29)
+storage.save()
+storage._FileStorage__objects = {}
+storage.reload()
+place = storage.get(Place, "p1")
+other = Place()
+other.rooms_note = "new"
+other.name = "Flat"
+other.city_id = "c1"
+print(json.dumps({
+    "keys": [list(place.to_dict()), list(other.to_dict())],
+    "str": [str(place), str(storage.get(User, "u1"))],
+    "dict": place.to_dict(),
+    "defaults": [place.description, place.amenity_ids, place.rooms_note,
+                 type(place.max_guest).__name__],
+    "missing": hasattr(place, "nothing"),
+    "has_dict": hasattr(place, "__dict__"),
+}))
+"""
+
+
+class TestCompactMode(unittest.TestCase):
+    """Tests for the compact mode (`HBNB_COMPACT=1`) of the models"""
+
+    def run_script(self, compact):
+        """`dict`: returns the output of `SCRIPT` run in or out of compact
+        mode"""
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, HBNB_COMPACT=compact,
+                       HBNB_FS_PATH=os.path.join(tmp, "file.json"))
+            env.pop("HBNB_TYPE_STORAGE", None)
+            result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=root,
+                                    env=env, capture_output=True, text=True,
+                                    check=True)
+        return json.loads(result.stdout)
+
+    def test_same_output(self):
+        """Tests compact instances print and serialize as usual"""
+        normal = self.run_script("0")
+        compact = self.run_script("1")
+        self.assertTrue(normal.pop("has_dict"))
+        self.assertFalse(compact.pop("has_dict"))
+        self.assertEqual(compact, normal)
+        self.assertEqual(compact["defaults"], ["", [], "quiet", "int"])
+        self.assertFalse(compact["missing"])
+        self.assertEqual(compact["dict"]["max_guest"], 6)
+        self.assertEqual(compact["keys"][1][3:], ["rooms_note", "name",
+                                                  "city_id", "__class__"])
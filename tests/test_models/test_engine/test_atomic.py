@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""
+Test cases for the `models.engine.atomic` helpers
+"""
+from models.engine.atomic import atomic_write
+from models.user import User
+from models import storage
+from unittest.mock import patch
+import json
+import os
+import unittest
+
+
+class TestAtomicWrite(unittest.TestCase):
+    """Tests for the `atomic_write` context manager"""
+
+    def setUp(self):
+        """Create a file to replace"""
+        self.path = "test_atomic.txt"
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write("old")
+
+    def tearDown(self):
+        """Remove the scratch files"""
+        for path in (self.path, self.path + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def read(self):
+        """`str`: returns the content of the scratch file"""
+        with open(self.path, 'r', encoding='utf-8') as file:
+            return file.read()
+
+    def test_replace(self):
+        """Tests the new content replaces the old one"""
+        with atomic_write(self.path) as file:
+            file.write("new")
+            self.assertEqual(self.read(), "old")
+        self.assertEqual(self.read(), "new")
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        with atomic_write(self.path, binary=True) as file:
+            file.write(b"bytes")
+        self.assertEqual(self.read(), "bytes")
+
+    def test_error(self):
+        """Tests a failed write leaves the old content in place"""
+        with self.assertRaises(ZeroDivisionError):
+            with atomic_write(self.path) as file:
+                file.write("half")
+                1 / 0
+        self.assertEqual(self.read(), "old")
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_fsync(self):
+        """Tests the file is fsynced unless disabled"""
+        with patch('os.fsync') as fsync:
+            with atomic_write(self.path) as file:
+                file.write("new")
+            self.assertTrue(fsync.called)
+        with patch('os.fsync') as fsync:
+            with atomic_write(self.path, fsync=False) as file:
+                file.write("new")
+            fsync.assert_not_called()
+
+    def test_storage_save_error(self):
+        """Tests a failing `FileStorage.save` keeps the previous file"""
+        storage._FileStorage__objects = {}
+        User().save()
+        path = storage._FileStorage__file_path
+        with open(path, 'r', encoding='utf-8') as file:
+            before = json.load(file)
+        User().tags = object()
+        with self.assertRaises(TypeError):
+            storage.save()
+        with open(path, 'r', encoding='utf-8') as file:
+            self.assertEqual(json.load(file), before)
+        storage._FileStorage__objects = {}
+        storage.save()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+"""
+`TestDBStorage` test case to test the `DBStorage` class
+"""
+from models.amenity import Amenity
+from models.city import City
+from models.compact import update_attributes
+from models.place import Place
+from models.state import State
+from models.user import User
+from models.engine.db_storage import DBStorage
+import os
+import sqlite3
+import unittest
+
+
+class TestDBStorage(unittest.TestCase):
+    """Tests for 'DBStorage' class attributes and methods"""
+
+    def setUp(self):
+        """Create a `DBStorage` on a scratch database"""
+        self.path = "test_hbnb.db"
+        DBStorage._DBStorage__db_path = self.path
+        self.db = DBStorage()
+        self.db.reload()
+
+    def tearDown(self):
+        """Close and remove the scratch database"""
+        self.db.close()
+        DBStorage._DBStorage__db_path = "hbnb.db"
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def reopen(self):
+        """`DBStorage`: returns a new `DBStorage` loaded from the database"""
+        self.db.close()
+        db = DBStorage()
+        db.reload()
+        return db
+
+    def test_methods(self):
+        """Tests the `FileStorage` interface is implemented"""
+        for method in ('all', 'new', 'save', 'reload', 'count', 'get',
+                       'delete', 'touch', 'classes', 'relink', 'related',
+                       'query', 'add_index', 'lookup'):
+            self.assertTrue(hasattr(DBStorage, method))
+
+    def test_tables(self):
+        """Tests one table per class, with indexed foreign keys"""
+        connection = sqlite3.connect(self.path)
+        tables = {row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        indexes = {row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        connection.close()
+        self.assertEqual(tables, set(self.db.classes()))
+        for index in ('City_state_id', 'Place_city_id', 'Place_user_id',
+                      'Review_place_id', 'Review_user_id'):
+            self.assertIn(index, indexes)
+
+    def test_save_reload(self):
+        """Tests objects survive a save and reload"""
+        state = State()
+        state.name = "California"
+        city = City()
+        city.state_id = state.id
+        city.population = 1000
+        place = Place()
+        place.amenity_ids = ["a", "b"]
+        place.max_guest = "many"
+        for obj in (state, city, place):
+            self.db.new(obj)
+        self.db.save()
+        db = self.reopen()
+        self.assertEqual(db.count(), 3)
+        for obj in (state, city, place):
+            stored = db.get(type(obj), obj.id)
+            self.assertEqual(stored.to_dict(), obj.to_dict())
+            self.assertEqual(str(stored), str(obj))
+        db.close()
+
+    def test_update_delete(self):
+        """Tests `save` writes changed and deleted objects"""
+        users = [User(), User()]
+        for user in users:
+            self.db.new(user)
+        self.db.save()
+        users[0].email = "a@b.c"
+        self.db.touch(users[0])
+        self.db.delete(users[1])
+        self.assertEqual(self.db.count(User), 1)
+        self.db.save()
+        db = self.reopen()
+        self.assertEqual(list(db.all(User)), ["User." + users[0].id])
+        self.assertEqual(db.get('User', users[0].id).email, "a@b.c")
+        self.assertIsNone(db.get(User, users[1].id))
+        self.assertEqual(db.all(Amenity), {})
+        db.close()
+
+    def test_related(self):
+        """Tests `related` finds the objects referencing an id"""
+        state = State()
+        cities = [City(), City()]
+        for city in cities:
+            city.state_id = state.id
+            self.db.new(city)
+        self.assertEqual(len(self.db.related(City, "state_id", state.id)), 2)
+        self.db.delete(cities[0])
+        self.assertEqual(self.db.related("City", "state_id", state.id),
+                         [cities[1]])
+        self.db.save()
+        db = self.reopen()
+        self.assertEqual([c.id for c in db.related(City, "state_id",
+                                                   state.id)],
+                         [cities[1].id])
+        city = db.get(City, cities[1].id)
+        update_attributes(city, {'state_id': "other"})
+        db.relink(city, "state_id", state.id)
+        self.assertEqual(db.related(City, "state_id", state.id), [])
+        self.assertEqual(db.related(City, "state_id", "other"), [city])
+        db.close()
+
+    def test_query(self):
+        """Tests queries through a sorted index follow changes"""
+        places = [Place(), Place(), Place()]
+        for i, place in enumerate(places):
+            place.price_by_night = i * 100
+            self.db.new(place)
+        self.db.add_index(Place, "price_by_night", "sorted")
+        self.assertEqual(self.db.indexes(),
+                         {"Place": {"price_by_night": "sorted"}})
+        self.assertEqual(
+            self.db.lookup(Place, {"price_by_night": [("gte", 100)]}),
+            (places[1:], {"price_by_night"}))
+        update_attributes(places[0], {'price_by_night': 300})
+        self.db.touch(places[0])
+        self.db.delete(places[2])
+        self.assertEqual(
+            self.db.query(Place).where(price_by_night__gte=100)
+            .order_by("-price_by_night").all(), [places[0], places[1]])
+
+    def test_near(self):
+        """Tests places near a point follow changes"""
+        places = [Place(), Place(), Place()]
+        for i, place in enumerate(places):
+            update_attributes(place, {'latitude': 10.0,
+                                      'longitude': i / 10})
+            self.db.new(place)
+        self.assertEqual(self.db.near(10, 0.15, 10), places[1:3])
+        update_attributes(places[0], {'longitude': 0.19})
+        self.db.touch(places[0], "longitude")
+        self.db.delete(places[1])
+        self.db.new(Place())
+        self.assertEqual(self.db.near(10, 0.15, 10, 5),
+                         [places[0], places[2]])
+
+    def test_search(self):
+        """Tests searches follow changes"""
+        places = [Place(), Place()]
+        for place, name in zip(places, ("Quiet loft", "Loft")):
+            update_attributes(place, {'name': name})
+            self.db.new(place)
+        self.assertEqual(self.db.search(Place, "quiet loft"), places)
+        update_attributes(places[1], {'description': "so quiet"})
+        self.db.touch(places[1], "description")
+        self.db.delete(places[0])
+        self.assertEqual(self.db.search("Place", "quiet"), places[1:])
+        with self.assertRaises(ValueError):
+            self.db.search(User, "quiet")
+
+    def test_batch(self):
+        """Tests the saves of a batch block are made once on exit"""
+        def rows():
+            connection = sqlite3.connect(self.path)
+            count = connection.execute('SELECT COUNT(*) FROM State')
+            count = count.fetchone()[0]
+            connection.close()
+            return count
+        with self.db.batch():
+            for i in range(3):
+                self.db.new(State())
+                self.db.save()
+            self.assertEqual(rows(), 0)
+        self.assertEqual(rows(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,13 +10,17 @@ from models.review import Review
 from models.state import State
 from models.user import User
 from models.engine.file_storage import FileStorage
+from models.engine import codec
+from models.engine.json_stream import iter_items
 from models import storage
 from datetime import datetime
 import json
 import os
+import pickle
 import time
 import uuid
 import unittest
+from unittest.mock import patch
 
 
 class TestFileStorage(unittest.TestCase):
@@ -109,9 +113,9 @@ class TestFileStorage(unittest.TestCase):
         self.assertEqual(str(e.exception), "all() missing 1 required "
                          + "positional argument: 'self'")
         with self.assertRaises(TypeError) as e:
-            self.a.all(1)
-        self.assertEqual(str(e.exception), 'all() takes 1 positional '
-                         + 'argument but 2 were given')
+            self.a.all(1, 2)
+        self.assertEqual(str(e.exception), 'all() takes from 1 to 2 '
+                         + 'positional arguments but 3 were given')
         # test __objects is returned by all
         self.assertEqual(FileStorage._FileStorage__objects, self.a.all())
         self.assertEqual(FileStorage._FileStorage__objects, self.b.all())
@@ -119,6 +123,27 @@ class TestFileStorage(unittest.TestCase):
                      for obj in self.all_objs}
         FileStorage._FileStorage__objects = objs_dict
         self.assertEqual(list(self.b.all().values()), self.all_objs)
+        # test all(cls) only returns objects of cls
+        for cls in (User, 'User'):
+            self.assertEqual(list(self.b.all(cls).values()), self.users)
+        self.assertEqual(self.b.all(Amenity), {})
+
+    def test_count(self):
+        """Tests the `count` method"""
+        self.assertEqual(storage.count(), len(self.all_objs))
+        self.assertEqual(storage.count(Place), 3)
+        self.assertEqual(storage.count('Amenity'), 0)
+        storage.delete(self.places[0])
+        self.assertEqual(storage.count(Place), 2)
+        Place()
+        self.assertEqual(storage.count('Place'), 3)
+        # an id containing a class name must not be counted for it
+        u = User()
+        storage.delete(u)
+        u.id = 'User-' + u.id
+        storage.new(u)
+        self.assertEqual(storage.count(User), 4)
+        self.assertEqual(storage.count(BaseModel), 3)
 
     def test_save(self):
         """Tests the `save` method"""
@@ -174,6 +199,58 @@ class TestFileStorage(unittest.TestCase):
         for k, v in self.a.all().items():
             self.assertEqual(str(v), str(old_objects_dict[k]))
 
+    def test_classes(self):
+        """Tests the `classes` registry matches `models.class_dict`"""
+        from models import class_dict
+        registry = storage.classes()
+        self.assertEqual(set(registry), set(class_dict))
+        self.assertIs(registry['Place'], Place)
+        self.assertIs(registry['BaseModel'], BaseModel)
+
+    def test_reload_skips_init(self):
+        """Tests `reload` hydrates objects without calling `__init__`"""
+        storage.save()
+        storage._FileStorage__objects = {}
+        with patch.object(BaseModel, '__init__') as init:
+            storage.reload()
+            init.assert_not_called()
+        for obj in self.all_objs:
+            key = obj.__class__.__name__ + "." + obj.id
+            self.assertIs(type(storage.all()[key]), type(obj))
+            self.assertEqual(str(storage.all()[key]), str(obj))
+
+    def test_reload_parses_timestamps_lazily(self):
+        """Tests reloaded timestamps are only parsed when read, and saved
+        verbatim when never read"""
+        user = User()
+        storage.save()
+        with open("file.json", encoding='utf-8') as file:
+            saved = json.load(file)["User." + user.id]
+        storage._FileStorage__objects = {}
+        storage.reload()
+        obj = storage.get(User, user.id)
+        self.assertEqual(obj.__dict__['created_at'], saved['created_at'])
+        self.assertEqual(obj.to_dict(), saved)
+        storage.save()
+        with open("file.json", encoding='utf-8') as file:
+            self.assertEqual(json.load(file)["User." + user.id], saved)
+        self.assertEqual(obj.updated_at, user.updated_at)
+        self.assertIs(type(obj.__dict__['updated_at']), datetime)
+        self.assertIs(type(obj.__dict__['created_at']), str)
+
+    def test_reload_interns_references(self):
+        """Tests reloaded objects referencing the same id share its string"""
+        state_id = str(uuid.uuid4())
+        cities = [City(), City()]
+        for city in cities:
+            city.state_id = "".join(state_id)
+        storage.save()
+        storage._FileStorage__objects = {}
+        storage.reload()
+        first, second = (storage.get(City, city.id) for city in cities)
+        self.assertEqual(first.state_id, state_id)
+        self.assertIs(first.state_id, second.state_id)
+
     def test_doc(self):
         """Tests presence of documentation"""
         self.assertIsNotNone(__import__('models.engine.file_storage').__doc__)
@@ -184,5 +261,692 @@ class TestFileStorage(unittest.TestCase):
         self.assertIsNotNone(FileStorage.reload.__doc__)
 
 
+class TestFileStorageJournal(unittest.TestCase):
+    """Tests for the append-only journal mode of `FileStorage`"""
+
+    def setUp(self):
+        """Switch `storage` to journal mode on a scratch file"""
+        self.path = "test_journal.json"
+        FileStorage._FileStorage__file_path = self.path
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__journal_limit = 3
+        storage._FileStorage__objects = {}
+        storage.save()
+
+    def tearDown(self):
+        """Restore the default settings and remove scratch files"""
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__journal_limit = 1000
+        storage._FileStorage__objects = {}
+        for path in (self.path, self.path + ".journal"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_save_appends(self):
+        """Tests `save` appends records instead of rewriting the file"""
+        with open(self.path, 'r', encoding='utf-8') as file:
+            snapshot = file.read()
+        u = User()
+        u.save()
+        with open(self.path, 'r', encoding='utf-8') as file:
+            self.assertEqual(file.read(), snapshot)
+        with open(self.path + ".journal", 'r', encoding='utf-8') as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(records, [{'key': 'User.' + u.id,
+                                    'obj': u.to_dict()}])
+
+    def test_reload_replays(self):
+        """Tests `reload` applies journal records over the snapshot"""
+        a, b = State(), State()
+        a.save()
+        b.name = "Texas"
+        b.save()
+        storage.delete(a)
+        storage.save()
+        storage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(list(storage.all().keys()), ['State.' + b.id])
+        self.assertEqual(storage.all()['State.' + b.id].name, "Texas")
+
+    def test_compaction(self):
+        """Tests the journal is folded into the snapshot past the limit"""
+        objs = []
+        for i in range(3):
+            objs.append(City())
+            objs[-1].save()
+        self.assertTrue(os.path.exists(self.path + ".journal"))
+        objs[0].save()
+        self.assertFalse(os.path.exists(self.path + ".journal"))
+        with open(self.path, 'r', encoding='utf-8') as file:
+            self.assertEqual(set(json.load(file)),
+                             {'City.' + obj.id for obj in objs})
+
+    def test_convert(self):
+        """Tests `convert` applies the journal of the source"""
+        a, b = State(), State()
+        a.save()
+        b.name = "Texas"
+        b.save()
+        storage.delete(a)
+        storage.save()
+        storage.convert(self.path, "test_convert.json")
+        with open("test_convert.json", 'r', encoding='utf-8') as file:
+            records = json.load(file)
+        os.remove("test_convert.json")
+        self.assertEqual(records, {'State.' + b.id: b.to_dict()})
+
+    def test_changed_in_place(self):
+        """Tests lists changed in place are journaled, once"""
+        place = Place()
+        place.amenity_ids = []
+        place.save()
+        place.amenity_ids.append("a1")
+        storage.save()
+        storage.save()
+        with open(self.path + ".journal", 'r', encoding='utf-8') as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[1]['obj']['amenity_ids'], ["a1"])
+
+    def test_torn_record(self):
+        """Tests a partially written last record is ignored"""
+        p = Place()
+        p.save()
+        with open(self.path + ".journal", 'a', encoding='utf-8') as file:
+            file.write('{"key": "Place.')
+        storage._FileStorage__objects = {}
+        storage.reload()
+        self.assertIn('Place.' + p.id, storage.all())
+
+    def test_save_after_torn_record(self):
+        """Tests records appended after a torn record are reloaded"""
+        p = Place()
+        p.save()
+        with open(self.path + ".journal", 'a', encoding='utf-8') as file:
+            file.write('{"key": "Place.')
+        storage._FileStorage__objects = {}
+        storage.reload()
+        u = User()
+        u.save()
+        storage._FileStorage__objects = {}
+        storage.reload()
+        self.assertIn('Place.' + p.id, storage.all())
+        self.assertIn('User.' + u.id, storage.all())
+
+
+class TestFileStorageDirty(unittest.TestCase):
+    """Tests for the dirty tracking and fragment cache of `FileStorage`"""
+
+    def setUp(self):
+        """Store a few saved objects"""
+        storage._FileStorage__objects = {}
+        self.objs = [User(), User(), User()]
+        storage.save()
+
+    def tearDown(self):
+        """Resets FileStorage data"""
+        storage._FileStorage__objects = {}
+        storage.save()
+
+    def test_only_dirty_encoded(self):
+        """Tests `save` only encodes changed objects"""
+        codec = storage._FileStorage__codec
+        with patch.object(codec, 'encode', wraps=codec.encode) as encode:
+            def encoded():
+                return [c.args[0]['id'] for c in encode.call_args_list
+                        if isinstance(c.args[0], dict)]
+            storage.save()
+            self.assertEqual(encoded(), [])
+            self.objs[1].first_name = "Betty"
+            storage.save()
+            self.assertEqual(encoded(), [self.objs[1].id])
+            self.objs[2].save()
+            self.assertEqual(encoded(), [self.objs[1].id, self.objs[2].id])
+
+    def test_file_content(self):
+        """Tests spliced fragments produce the same file content"""
+        self.objs[0].email = "a@b.c"
+        storage.delete(self.objs[1])
+        storage.save()
+        path = storage._FileStorage__file_path
+        with open(path, 'r', encoding='utf-8') as file:
+            self.assertEqual(json.load(file),
+                             {k: v.to_dict()
+                              for k, v in storage.all().items()})
+
+    def test_changed_in_place(self):
+        """Tests lists changed in place are saved, without `touch`"""
+        place = Place()
+        place.amenity_ids = []
+        storage.save()
+        place.amenity_ids.append("a1")
+        storage.save()
+        path = storage._FileStorage__file_path
+        with open(path, 'r', encoding='utf-8') as file:
+            self.assertEqual(json.load(file)['Place.' + place.id]
+                             ['amenity_ids'], ["a1"])
+
+    def test_reload_drops_fragments(self):
+        """Tests objects loaded by `reload` are saved as read, not as
+        cached before"""
+        path = storage._FileStorage__file_path
+        key = 'User.' + self.objs[0].id
+        with open(path, 'r', encoding='utf-8') as file:
+            records = json.load(file)
+        records[key]['first_name'] = "Edited"
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(records, file)
+        storage.reload()
+        User().save()
+        with open(path, 'r', encoding='utf-8') as file:
+            self.assertEqual(json.load(file)[key]['first_name'], "Edited")
+
+
+class TestFileStorageLazy(unittest.TestCase):
+    """Tests for the lazy loading mode of `FileStorage`"""
+
+    def setUp(self):
+        """Save a few objects and reload them lazily"""
+        storage._FileStorage__objects = {}
+        self.users = [User(), User()]
+        self.place = Place()
+        storage.save()
+        FileStorage._FileStorage__lazy = True
+        storage._FileStorage__objects = {}
+        storage.reload()
+
+    def tearDown(self):
+        """Restore eager loading and reset FileStorage data"""
+        FileStorage._FileStorage__lazy = False
+        storage._FileStorage__objects = {}
+        storage.save()
+
+    def test_reload_keeps_raw(self):
+        """Tests `reload` does not hydrate any object"""
+        self.assertEqual(storage._FileStorage__objects, {})
+        self.assertEqual(storage.count(), 3)
+        self.assertEqual(storage.count(User), 2)
+
+    def test_get(self):
+        """Tests `get` hydrates only the requested object"""
+        obj = storage.get(User, self.users[0].id)
+        self.assertEqual(str(obj), str(self.users[0]))
+        self.assertEqual(list(storage._FileStorage__objects),
+                         ['User.' + self.users[0].id])
+        self.assertIs(storage.get('User', self.users[0].id), obj)
+        self.assertIsNone(storage.get(Place, self.users[1].id))
+        self.assertEqual(storage.count(), 3)
+
+    def test_all(self):
+        """Tests `all` hydrates the requested objects"""
+        self.assertEqual(len(storage.all(Place)), 1)
+        self.assertEqual(len(storage._FileStorage__objects), 1)
+        self.assertEqual({k: str(v) for k, v in storage.all().items()},
+                         {obj.__class__.__name__ + '.' + obj.id: str(obj)
+                          for obj in self.users + [self.place]})
+
+    def test_save_keeps_raw(self):
+        """Tests `save` writes records that were never hydrated"""
+        storage.get(Place, self.place.id).name = "Loft"
+        storage.save()
+        FileStorage._FileStorage__lazy = False
+        storage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.count(), 3)
+        self.assertEqual(storage.get(Place, self.place.id).name, "Loft")
+
+    def test_new_replaces_raw(self):
+        """Tests `new` replaces a record of the same key not hydrated yet"""
+        user = User(**dict(self.users[0].to_dict(), email="new"))
+        storage.new(user)
+        self.assertEqual(storage.count(), 3)
+        self.assertIs(storage.all(User)['User.' + user.id], user)
+        storage.save()
+        FileStorage._FileStorage__lazy = False
+        storage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.count(), 3)
+        self.assertEqual(storage.get(User, user.id).email, "new")
+
+
+class TestFileStorageReferences(unittest.TestCase):
+    """Tests for the reference index of `FileStorage`"""
+
+    def setUp(self):
+        """Create a state with two cities and a place"""
+        storage._FileStorage__objects = {}
+        self.state = State()
+        self.cities = [City(), City()]
+        for city in self.cities:
+            city.state_id = self.state.id
+        self.place = Place()
+        self.place.city_id = self.cities[0].id
+
+    def tearDown(self):
+        """Restore eager loading and reset FileStorage data"""
+        FileStorage._FileStorage__lazy = False
+        storage._FileStorage__objects = {}
+        storage.save()
+
+    def ids(self, objs):
+        """`set`: returns the ids of `objs`"""
+        return {obj.id for obj in objs}
+
+    def test_related(self):
+        """Tests `related` finds the objects referencing an id"""
+        self.assertEqual(self.ids(storage.related(City, "state_id",
+                                                  self.state.id)),
+                         self.ids(self.cities))
+        self.assertEqual(storage.related("Place", "city_id",
+                                         self.cities[0].id), [self.place])
+        self.assertEqual(storage.related(City, "state_id", "nope"), [])
+        self.assertEqual(storage.related(Review, "place_id",
+                                         self.place.id), [])
+
+    def test_accessors(self):
+        """Tests the relationship properties of the models"""
+        self.assertEqual(self.ids(self.state.cities), self.ids(self.cities))
+        self.assertEqual(self.cities[0].places, [self.place])
+        self.assertEqual(self.cities[1].places, [])
+
+    def test_move(self):
+        """Tests setting a reference field re-indexes the object"""
+        self.place.city_id = self.cities[1].id
+        self.assertEqual(self.cities[0].places, [])
+        self.assertEqual(self.cities[1].places, [self.place])
+        self.cities[0].state_id = ""
+        self.assertEqual(self.state.cities, [self.cities[1]])
+
+    def test_delete(self):
+        """Tests deleted objects leave the index"""
+        storage.delete(self.cities[0])
+        self.assertEqual(self.state.cities, [self.cities[1]])
+        self.cities[0].state_id = self.state.id
+        self.assertEqual(self.state.cities, [self.cities[1]])
+
+    def test_reload(self):
+        """Tests the index is rebuilt on reload, eager or lazy"""
+        storage.save()
+        for lazy in (False, True):
+            FileStorage._FileStorage__lazy = lazy
+            storage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(self.ids(storage.related(
+                City, "state_id", self.state.id)), self.ids(self.cities))
+            self.assertEqual(self.ids(storage.related(
+                Place, "city_id", self.cities[0].id)), {self.place.id})
+
+    def test_reset(self):
+        """Tests replacing `__objects` drops the index"""
+        storage._FileStorage__objects = {}
+        self.assertEqual(self.state.cities, [])
+
+
+class TestFileStorageStream(unittest.TestCase):
+    """Tests for the streaming reload of `FileStorage`"""
+
+    def setUp(self):
+        """Enable streaming reloads"""
+        FileStorage._FileStorage__stream = True
+        storage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Restore whole-file reloads and reset FileStorage data"""
+        FileStorage._FileStorage__stream = False
+        storage._FileStorage__objects = {}
+        storage.save()
+
+    def test_reload(self):
+        """Tests a streamed reload gives back the saved objects"""
+        objs = [User(), Place(), BaseModel()]
+        objs[1].amenity_ids = ["a", "b"]
+        objs[1].save()
+        saved = {k: v.to_dict() for k, v in storage.all().items()}
+        storage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual({k: v.to_dict() for k, v in storage.all().items()},
+                         saved)
+        self.assertEqual(storage.count(User), 1)
+        self.assertIsInstance(storage.get(Place, objs[1].id).updated_at,
+                              datetime)
+
+    def test_reload_streams(self):
+        """Tests a streamed reload never reads the whole file at once"""
+        for _ in range(100):
+            User().save()
+        storage._FileStorage__objects = {}
+        with patch("models.engine.file_storage.iter_items",
+                   wraps=lambda file: iter_items(file, 256)) as items:
+            with patch.object(FileStorage, "_FileStorage__read") as read:
+                storage.reload()
+        items.assert_called_once()
+        read.assert_not_called()
+        self.assertEqual(storage.count(User), 100)
+
+    def test_save(self):
+        """Tests a streamed save writes every object without caching its
+        JSON text"""
+        storage._FileStorage__fragments.clear()
+        objs = [User(), Place(), State()]
+        objs[0].first_name = "Betty"
+        storage.save()
+        self.assertEqual(storage._FileStorage__fragments, {})
+        with open(storage._FileStorage__file_path, encoding='utf-8') as file:
+            self.assertEqual(json.load(file),
+                             {obj.__class__.__name__ + "." + obj.id:
+                              obj.to_dict() for obj in objs})
+
+
+class TestCodec(unittest.TestCase):
+    """Tests for the JSON codecs of `models.engine.codec`"""
+
+    def setUp(self):
+        """Resets FileStorage data"""
+        storage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Restore the default codec and reset FileStorage data"""
+        FileStorage._FileStorage__codec = codec.get_codec()
+        storage._FileStorage__objects = {}
+        storage.save()
+
+    def test_get_codec(self):
+        """Tests `get_codec` picks an installed codec or fails clearly"""
+        self.assertTrue(codec.get_codec().available)
+        self.assertIsInstance(codec.get_codec("json"), codec.JSONCodec)
+        with self.assertRaises(ValueError):
+            codec.get_codec("yaml")
+
+    def test_round_trip(self):
+        """Tests every installed codec saves and reloads the same objects"""
+        for name, cls in codec.codecs.items():
+            if not cls.available:
+                continue
+            with self.subTest(codec=name):
+                FileStorage._FileStorage__codec = cls()
+                storage._FileStorage__objects = {}
+                objs = [Place(), Review(), User()]
+                objs[0].name = "Caf\u00e9 \"Loft\""
+                storage.save()
+                path = storage._FileStorage__file_path
+                with open(path, 'r', encoding='utf-8') as file:
+                    self.assertEqual(json.load(file),
+                                     {k: v.to_dict()
+                                      for k, v in storage.all().items()})
+                storage._FileStorage__objects = {}
+                storage.reload()
+                for obj in objs:
+                    key = obj.__class__.__name__ + "." + obj.id
+                    self.assertEqual(str(storage.all()[key]), str(obj))
+
+    def test_datetimes(self):
+        """Tests datetimes are encoded like `isoformat` does"""
+        now = datetime.now()
+        for name, cls in codec.codecs.items():
+            if cls.available:
+                self.assertEqual(json.loads(cls().dumps({'t': now})),
+                                 {'t': now.isoformat()}, name)
+
+    def test_encode(self):
+        """Tests `encode` returns the UTF-8 bytes of `dumps`"""
+        data = {'name': "Café", 'n': [1, 2.5, None]}
+        for name, cls in codec.codecs.items():
+            if cls.available:
+                self.assertIs(type(cls().encode(data)), bytes, name)
+                self.assertEqual(cls().encode(data).decode('utf-8'),
+                                 cls().dumps(data), name)
+
+
+class TestFileStoragePickle(unittest.TestCase):
+    """Tests for the binary pickle snapshot format of `FileStorage`"""
+
+    def setUp(self):
+        """Point `storage` at a pickle snapshot"""
+        self.path = "test_snapshot.pickle"
+        FileStorage._FileStorage__file_path = self.path
+        storage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Restore the JSON snapshot and remove the scratch file"""
+        FileStorage._FileStorage__file_path = "file.json"
+        storage._FileStorage__objects = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_save_reload(self):
+        """Tests objects survive a pickle save and reload"""
+        objs = [User(), Place(), Review()]
+        objs[1].price_by_night = 120
+        storage.save()
+        with open(self.path, 'rb') as file:
+            records = pickle.load(file)
+        self.assertEqual(set(records),
+                         {o.__class__.__name__ + "." + o.id for o in objs})
+        for record in records.values():
+            self.assertIs(type(record['created_at']), datetime)
+        storage._FileStorage__objects = {}
+        storage.reload()
+        for obj in objs:
+            key = obj.__class__.__name__ + "." + obj.id
+            self.assertEqual(storage.all()[key].to_dict(), obj.to_dict())
+
+    def test_convert(self):
+        """Tests `convert` between JSON and pickle snapshots"""
+        FileStorage._FileStorage__file_path = "file.json"
+        objs = [State(), City()]
+        storage.save()
+        storage.convert("file.json", self.path)
+        FileStorage._FileStorage__file_path = self.path
+        storage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual({k: v.to_dict() for k, v in storage.all().items()},
+                         {o.__class__.__name__ + "." + o.id: o.to_dict()
+                          for o in objs})
+
+    def test_convert_no_timestamps(self):
+        """Tests `convert` keeps records without timestamps as they are"""
+        FileStorage._FileStorage__file_path = "file.json"
+        records = {"User.1": {"id": "1", "__class__": "User"}}
+        with open("file.json", 'w', encoding='utf-8') as file:
+            json.dump(records, file)
+        storage.convert("file.json", self.path)
+        with open(self.path, 'rb') as file:
+            self.assertEqual(pickle.load(file), records)
+
+    def test_convert_format(self):
+        """Tests `HBNB_FS_FORMAT` does not apply to the converted files"""
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__format = "json"
+        try:
+            state = State()
+            storage.save()
+            storage.convert("file.json", self.path)
+        finally:
+            FileStorage._FileStorage__format = None
+        with open(self.path, 'rb') as file:
+            self.assertEqual(list(pickle.load(file)), ['State.' + state.id])
+
+
+class TestFileStorageRecords(unittest.TestCase):
+    """Tests for the memory-mapped JSON lines layout of `FileStorage`"""
+
+    def setUp(self):
+        """Save a few objects to a record file and reload it"""
+        self.path = "test_snapshot.jsonl"
+        FileStorage._FileStorage__file_path = self.path
+        storage._FileStorage__objects = {}
+        self.users = [User(), User()]
+        self.place = Place()
+        self.place.name = "Loft"
+        storage.save()
+        storage._FileStorage__objects = {}
+        storage.reload()
+
+    def tearDown(self):
+        """Restore the JSON snapshot and remove the scratch file"""
+        FileStorage._FileStorage__file_path = "file.json"
+        storage._FileStorage__objects = {}
+        storage._FileStorage__record_file().close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_reload_reads_index(self):
+        """Tests `reload` only reads the record offsets"""
+        self.assertEqual(storage._FileStorage__objects, {})
+        self.assertEqual(storage.count(), 3)
+        self.assertEqual(storage.count(User), 2)
+
+    def test_get(self):
+        """Tests `get` decodes a single record"""
+        with patch.object(storage._FileStorage__codec, 'loads') as loads:
+            loads.side_effect = json.loads
+            obj = storage.get(Place, self.place.id)
+            loads.assert_called_once()
+        self.assertEqual(obj.to_dict(), self.place.to_dict())
+
+    def test_save(self):
+        """Tests `save` keeps untouched records and writes changed ones"""
+        storage.get(User, self.users[0].id).email = "a@b.c"
+        storage.save()
+        self.assertEqual(storage.get(User, self.users[1].id).to_dict(),
+                         self.users[1].to_dict())
+        storage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.get(User, self.users[0].id).email, "a@b.c")
+        self.assertEqual(storage.count(), 3)
+        self.assertEqual(storage.get(Place, self.place.id).to_dict(),
+                         self.place.to_dict())
+
+    def test_new_replaces_raw(self):
+        """Tests `new` replaces a record of the same key not decoded yet"""
+        user = User(**dict(self.users[0].to_dict(), email="new"))
+        storage.new(user)
+        self.assertEqual(storage.count(), 3)
+        storage.save()
+        storage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.count(), 3)
+        self.assertEqual(storage.get(User, user.id).email, "new")
+
+    def test_convert(self):
+        """Tests `convert` from a record file to JSON"""
+        storage.convert(self.path, "test_convert.json")
+        with open("test_convert.json", 'r', encoding='utf-8') as file:
+            records = json.load(file)
+        os.remove("test_convert.json")
+        self.assertEqual(records["Place." + self.place.id],
+                         self.place.to_dict())
+
+
+class TestFileStorageBatch(unittest.TestCase):
+    """Tests for the `batch` and `transaction` blocks of `FileStorage`"""
+
+    def setUp(self):
+        """Resets FileStorage data"""
+        storage._FileStorage__objects = {}
+        storage.save()
+
+    def tearDown(self):
+        """Resets FileStorage data"""
+        storage._FileStorage__objects = {}
+        storage.save()
+
+    def test_single_write(self):
+        """Tests the saves of a block, nested or not, make one write"""
+        with patch.object(FileStorage, '_FileStorage__write_snapshot') as w:
+            with storage.batch():
+                for i in range(5):
+                    User().save()
+                with storage.transaction():
+                    Place().save()
+                self.assertEqual(w.call_count, 0)
+            self.assertEqual(w.call_count, 1)
+            with storage.batch():
+                pass
+            self.assertEqual(w.call_count, 1)
+
+    def test_saved_on_error(self):
+        """Tests changes made before an error are still saved"""
+        with self.assertRaises(ValueError):
+            with storage.batch():
+                u = User()
+                u.save()
+                raise ValueError
+        path = storage._FileStorage__file_path
+        with open(path, 'r', encoding='utf-8') as file:
+            self.assertIn('User.' + u.id, json.load(file))
+
+    def test_fsync(self):
+        """Tests `fsync` only applies to the save of the block"""
+        with patch('os.fsync') as fsync:
+            with storage.batch(fsync=False):
+                User().save()
+            fsync.assert_not_called()
+            self.assertTrue(storage._FileStorage__fsync)
+
+
+class TestFileStorageWriteBehind(unittest.TestCase):
+    """Tests for the write-behind mode of `FileStorage`"""
+
+    def setUp(self):
+        """Enable write-behind with a 50ms flush interval"""
+        storage._FileStorage__objects = {}
+        storage.save()
+        FileStorage._FileStorage__flush_interval = 0.05
+        self.path = storage._FileStorage__file_path
+
+    def tearDown(self):
+        """Disable write-behind and reset FileStorage data"""
+        storage.flush()
+        FileStorage._FileStorage__flush_interval = 0
+        storage._FileStorage__objects = {}
+        storage.save()
+
+    def stored(self):
+        """`dict`: returns the content of the storage file"""
+        with open(self.path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def test_background_flush(self):
+        """Tests the thread writes a save without any `flush` call"""
+        u = User()
+        u.save()
+        for i in range(100):
+            if self.stored():
+                break
+            time.sleep(0.01)
+        self.assertIn('User.' + u.id, self.stored())
+
+    def test_debounce(self):
+        """Tests a burst of saves is written at most once per interval"""
+        write = FileStorage._FileStorage__write_snapshot
+        with patch.object(FileStorage, '_FileStorage__write_snapshot',
+                          autospec=True, side_effect=write) as w:
+            for i in range(20):
+                User().save()
+            storage.flush()
+            self.assertLessEqual(w.call_count, 2)
+            time.sleep(0.15)
+            self.assertLessEqual(w.call_count, 2)
+        self.assertEqual(len(self.stored()), 20)
+
+    def test_batch_fsync(self):
+        """Tests the `fsync` of a block applies to its save"""
+        with patch('os.fsync') as fsync:
+            with storage.batch(fsync=False):
+                u = User()
+                u.save()
+            self.assertIn('User.' + u.id, self.stored())
+            fsync.assert_not_called()
+
+    def test_flush(self):
+        """Tests `flush` writes a due save immediately"""
+        p = Place()
+        p.save()
+        storage.flush()
+        self.assertIn('Place.' + p.id, self.stored())
+
+
 if __name__ == '__main__':
     unittest.main()
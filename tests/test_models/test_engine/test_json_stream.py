@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+"""
+Test cases for the `models.engine.json_stream` parser
+"""
+from models.engine.json_stream import iter_items
+import io
+import json
+import unittest
+
+
+class TestIterItems(unittest.TestCase):
+    """Tests for the `iter_items` function"""
+
+    def items(self, text, chunk_size=1 << 16):
+        """`list`: returns the pairs `iter_items` yields for `text`"""
+        return list(iter_items(io.StringIO(text), chunk_size))
+
+    def test_empty(self):
+        """Tests an empty object yields nothing"""
+        self.assertEqual(self.items("{}"), [])
+        self.assertEqual(self.items(" {\n} "), [])
+
+    def test_chunks(self):
+        """Tests values cut by chunk boundaries are parsed whole"""
+        data = {"User.{}".format(i): {"id": str(i), "name": "é \"x\" " * i,
+                                      "tags": [i, {"n": None}]}
+                for i in range(50)}
+        for text in (json.dumps(data), json.dumps(data, indent=4)):
+            for chunk_size in (1, 7, 64, 1 << 16):
+                self.assertEqual(self.items(text, chunk_size),
+                                 list(data.items()))
+
+    def test_lazy(self):
+        """Tests pairs are yielded before the rest of the file is read"""
+        pairs = iter_items(io.StringIO('{"a": {}, "b": {'), 4)
+        self.assertEqual(next(pairs), ("a", {}))
+        with self.assertRaises(ValueError):
+            next(pairs)
+
+    def test_invalid(self):
+        """Tests malformed files raise `ValueError`"""
+        for text in ("", "[]", '{"a": 1}', '{"a" {}}', '{"a": {}',
+                     '{"a": {}, }', '{1: {}}', '{"a": {} "b": {}}'):
+            with self.assertRaises(ValueError, msg=text):
+                self.items(text, 3)
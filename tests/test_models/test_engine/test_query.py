@@ -0,0 +1,315 @@
+#!/usr/bin/python3
+"""
+Test cases for `models.engine.query` and the attribute indexes of
+`FileStorage`
+"""
+from models.engine.attribute_index import (AttributeIndex, SortedIndex,
+                                           SortedKeys)
+from models.engine.file_storage import FileStorage
+from models.engine.query import Query
+from models.place import Place
+from models.user import User
+from models import storage
+import random
+from types import SimpleNamespace
+import unittest
+from unittest.mock import patch
+
+
+class TestQuery(unittest.TestCase):
+    """Tests for the `Query` class, without indexes"""
+
+    def setUp(self):
+        """Create places with various prices and guests"""
+        storage._FileStorage__objects = {}
+        self.places = []
+        for i in range(10):
+            place = Place()
+            place.name = "Place {}".format(i)
+            place.price_by_night = i * 20
+            place.max_guest = i % 4
+            self.places.append(place)
+        User()
+
+    def tearDown(self):
+        """Drop the indexes and reset FileStorage data"""
+        for name, fields in storage.indexes().items():
+            for field in fields:
+                storage.drop_index(name, field)
+        storage._FileStorage__objects = {}
+        storage.save()
+
+    def names(self, query):
+        """`list`: returns the names of the results of `query`"""
+        return [place.name for place in query.all()]
+
+    def test_query(self):
+        """Tests a query without conditions returns the class objects"""
+        self.assertIsInstance(storage.query(Place), Query)
+        self.assertEqual(set(storage.query(Place).all()), set(self.places))
+        self.assertEqual(storage.query("Place").count(), 10)
+        self.assertEqual(storage.query("Amenity").all(), [])
+
+    def test_where(self):
+        """Tests conditions with each operator"""
+        query = storage.query(Place)
+        self.assertEqual(self.names(query.where(name="Place 3")),
+                         ["Place 3"])
+        self.assertEqual(
+            set(self.names(query.where(price_by_night__lt=60))),
+            {"Place 0", "Place 1", "Place 2"})
+        self.assertEqual(
+            set(self.names(query.where(price_by_night__gte=140,
+                                       max_guest__ne=3))),
+            {"Place 8", "Place 9"})
+        self.assertEqual(
+            set(self.names(query.where(price_by_night__lte=40)
+                           .where(price_by_night__gt=0))),
+            {"Place 1", "Place 2"})
+        self.assertEqual(
+            set(self.names(query.where(max_guest__in=[0, 2]))),
+            {"Place 0", "Place 2", "Place 4", "Place 6", "Place 8"})
+        self.places[5].amenity_ids = ["a", "b"]
+        self.assertEqual(self.names(query.where(amenity_ids__contains="b")),
+                         ["Place 5"])
+
+    def test_where_mismatch(self):
+        """Tests objects without the attribute, or with a value of another
+        type, do not match"""
+        self.places[0].price_by_night = "cheap"
+        self.places[1].rating = 5
+        query = storage.query(Place)
+        self.assertNotIn("Place 0",
+                         self.names(query.where(price_by_night__lt=60)))
+        self.assertEqual(self.names(query.where(rating__gte=1)),
+                         ["Place 1"])
+
+    def test_unknown_operator(self):
+        """Tests an unknown operator raises"""
+        with self.assertRaises(ValueError):
+            storage.query(Place).where(price_by_night__under=10)
+
+    def test_invalid_counts(self):
+        """Tests negative or non-int limits and offsets raise"""
+        query = storage.query(Place).order_by("name")
+        for count in (-1, 1.5, "2", None):
+            with self.assertRaises(ValueError):
+                query.limit(count)
+            with self.assertRaises(ValueError):
+                storage.query(Place).offset(count)
+        self.assertEqual(len(query.limit(0).all()), 0)
+
+    def test_order_by(self):
+        """Tests sorting, limit and offset"""
+        query = storage.query(Place).order_by("-price_by_night")
+        self.assertEqual(self.names(query.limit(2)), ["Place 9", "Place 8"])
+        self.assertEqual(self.names(query.offset(8)),
+                         ["Place 1", "Place 0"])
+        self.assertEqual(self.names(query.offset(3).limit(2)),
+                         ["Place 6", "Place 5"])
+        self.assertEqual(
+            self.names(storage.query(Place).order_by("max_guest",
+                                                     "-price_by_night")
+                       .limit(3)),
+            ["Place 8", "Place 4", "Place 0"])
+        self.assertEqual(query.first().name, "Place 9")
+        self.assertIsNone(query.where(name="none").first())
+        self.assertEqual(len(storage.query(Place).limit(3).all()), 3)
+
+    def test_order_by_mixed(self):
+        """Tests values of different types sort by type, missing last"""
+        self.places[0].rank = "b"
+        self.places[1].rank = 2
+        self.places[2].rank = "a"
+        self.places[3].rank = 1
+        self.assertEqual(
+            self.names(storage.query(Place).order_by("rank").limit(5)),
+            ["Place 3", "Place 1", "Place 2", "Place 0", "Place 4"])
+
+
+class TestQueryIndexed(TestQuery):
+    """Tests for the `Query` class through hash and sorted indexes"""
+
+    def setUp(self):
+        """Create the places and index their attributes"""
+        super().setUp()
+        storage.add_index(Place, "name")
+        storage.add_index(Place, "max_guest")
+        storage.add_index("Place", "price_by_night", "sorted")
+
+    def test_indexes(self):
+        """Tests `indexes` lists the declared indexes"""
+        self.assertEqual(storage.indexes(),
+                         {"Place": {"name": "hash", "max_guest": "hash",
+                                    "price_by_night": "sorted"}})
+        with self.assertRaises(ValueError):
+            storage.add_index(Place, "name", "btree")
+
+    def lookup(self, field, *conditions):
+        """`list`: returns the places `lookup` finds for the `(op, value)`
+        pairs `conditions` on `field`"""
+        found = storage.lookup(Place, {field: list(conditions)})
+        return None if found is None else found[0]
+
+    def test_lookup(self):
+        """Tests conditions on indexed attributes do not scan"""
+        self.assertEqual(self.lookup("price_by_night", ("lt", 40)),
+                         self.places[:2])
+        self.assertIsNone(self.lookup("name", ("lt", "Place 2")))
+        self.assertIsNone(self.lookup("latitude", ("eq", 0)))
+        self.assertEqual(storage.lookup(Place, {
+            "max_guest": [("gte", 1)], "name": [("eq", "Place 5")],
+            "price_by_night": [("lt", 160)]}), ([self.places[5]], {"name"}))
+        self.assertEqual(storage.lookup(Place, {
+            "price_by_night": [("gte", 160), ("ne", 180)]}),
+            (self.places[8:], set()))
+        with patch.object(AttributeIndex, 'intersect_above', 0):
+            objs, answered = storage.lookup(Place, {
+                "max_guest": [("in", [1, 2])], "name": [("ne", "Place 5")],
+                "price_by_night": [("lt", 160)]})
+        self.assertEqual(set(objs), {self.places[i] for i in (1, 2, 5, 6)})
+        self.assertEqual(answered, {"max_guest", "price_by_night"})
+        with patch.object(FileStorage, 'all') as scan:
+            self.assertEqual(
+                self.names(storage.query(Place).where(
+                    name="Place 4", price_by_night__gte=0)), ["Place 4"])
+            self.assertEqual(
+                len(storage.query(Place).where(max_guest=1).all()), 3)
+        scan.assert_not_called()
+
+    def test_maintained(self):
+        """Tests the indexes follow new, changed and deleted objects"""
+        place = Place()
+        place.price_by_night = 30
+        self.places[0].price_by_night = 500
+        self.places[1].name = "Renamed"
+        storage.delete(self.places[2])
+        self.assertEqual(self.lookup("price_by_night", ("lt", 40)),
+                         [self.places[1], place])
+        self.assertEqual(self.lookup("price_by_night", ("gt", 180)),
+                         [self.places[0]])
+        self.assertEqual(self.lookup("name", ("eq", "Renamed")),
+                         [self.places[1]])
+        self.assertEqual(self.lookup("name", ("eq", "Place 1")), [])
+        self.assertEqual(self.lookup("max_guest", ("eq", 2)),
+                         [self.places[6]])
+
+    def test_reload(self):
+        """Tests the indexes are rebuilt on reload, eager or lazy"""
+        storage.save()
+        for lazy in (False, True):
+            FileStorage._FileStorage__lazy = lazy
+            try:
+                storage._FileStorage__objects = {}
+                storage.reload()
+                self.assertEqual(
+                    [p.id for p in self.lookup("price_by_night",
+                                               ("lte", 20))],
+                    [p.id for p in self.places[:2]])
+            finally:
+                FileStorage._FileStorage__lazy = False
+
+    def test_drop_index(self):
+        """Tests dropped indexes are not used anymore"""
+        storage.drop_index(Place, "name")
+        self.assertIsNone(self.lookup("name", ("eq", "Place 1")))
+        self.assertNotIn("name", storage.indexes()["Place"])
+
+    def test_range(self):
+        """Tests the bounds on one field make a single lookup"""
+        with patch.object(FileStorage, 'lookup',
+                          wraps=storage.lookup) as lookup:
+            self.assertEqual(
+                self.names(storage.query(Place).where(
+                    price_by_night__gt=40, price_by_night__lte=100,
+                    price_by_night__ne=80)),
+                ["Place 3", "Place 5"])
+        lookup.assert_called_once_with(
+            "Place", {"price_by_night": [("gt", 40), ("lte", 100),
+                                         ("ne", 80)]})
+        self.assertEqual(self.lookup("price_by_night", ("gte", 60),
+                                     ("lt", "z")), [])
+        self.assertEqual(len(self.lookup("price_by_night",
+                                         ("in", [0, 20, 20, "x"]))), 2)
+        self.assertIsNone(self.lookup("name", ("in", "Place 10")))
+        self.assertEqual(
+            self.names(storage.query(Place).where(name__in="Place 10")),
+            ["Place 1"])
+
+
+class TestSortedKeys(unittest.TestCase):
+    """Tests for the `SortedKeys` list"""
+
+    def between(self, pairs, lower, upper):
+        """`list`: returns the keys of `pairs` within the bounds"""
+        return [key for value, key in sorted(pairs)
+                if (lower is None or value > lower[0] or
+                    lower[1] and value == lower[0]) and
+                (upper is None or value < upper[0] or
+                 upper[1] and value == upper[0])]
+
+    def test_between(self):
+        """Tests ranges stay right through insertions and removals across
+        many small chunks"""
+        rng = random.Random(0)
+        with patch.object(SortedKeys, 'load', 4):
+            pairs = sorted((i % 7, str(i)) for i in range(40))
+            keys = SortedKeys([value for value, key in pairs],
+                              [key for value, key in pairs])
+            pairs = set(pairs)
+            for step in range(2000):
+                if pairs and rng.random() < 0.45:
+                    pair = rng.choice(sorted(pairs))
+                    pairs.discard(pair)
+                    keys.remove(*pair)
+                else:
+                    pair = (rng.randrange(20), str(rng.randrange(10 ** 6)))
+                    if pair not in pairs:
+                        pairs.add(pair)
+                        keys.add(*pair)
+                if step % 40 == 0:
+                    self.assertEqual(len(keys), len(pairs))
+                    for i in range(10):
+                        lower, upper = [
+                            rng.choice([None, (rng.randrange(-1, 21),
+                                               rng.random() < 0.5)])
+                            for bound in range(2)]
+                        self.assertEqual(keys.between(lower, upper),
+                                         self.between(pairs, lower, upper))
+
+
+class TestAttributeIndex(unittest.TestCase):
+    """Tests for the `AttributeIndex` class"""
+
+    def test_spec(self):
+        """Tests indexes declared by a `HBNB_FS_INDEXES` value"""
+        index = AttributeIndex(" Place.price_by_night:sorted,User.email ")
+        self.assertEqual(index.declared(),
+                         {"Place": {"price_by_night": "sorted"},
+                          "User": {"email": "hash"}})
+        self.assertFalse(AttributeIndex(""))
+        for spec in ("Place", "Place.", "Place.name:btree"):
+            with self.assertRaises(ValueError):
+                AttributeIndex(spec)
+
+    def test_sorted_groups(self):
+        """Tests a sorted index keeps numbers and strings apart and skips
+        values of other types"""
+        values = [3, "b", 1.5, [1], "a", None, True, 3]
+        objects = {"Place.{}".format(i): SimpleNamespace(price=value)
+                   for i, value in enumerate(values)}
+        objects["Place.x"] = SimpleNamespace()
+        index = SortedIndex("price")
+        index.rebuild(objects)
+        self.assertEqual(index.lookup([("gte", 1)]),
+                         ["Place.6", "Place.2", "Place.0", "Place.7"])
+        self.assertEqual(index.lookup([("lt", "b")]), ["Place.4"])
+        self.assertIsNone(index.lookup([("eq", None)]))
+        index.update("Place.4", SimpleNamespace(price=2))
+        self.assertEqual(index.lookup([("gt", 1), ("lte", 2)]),
+                         ["Place.2", "Place.4"])
+        self.assertEqual(index.lookup([("gt", "")]), ["Place.1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""
+`TestRecordFile` test case to test the `RecordFile` class
+"""
+from models.engine.codec import get_codec
+from models.engine.record_file import RecordFile
+import json
+import os
+import unittest
+
+
+class TestRecordFile(unittest.TestCase):
+    """Tests for 'RecordFile' class attributes and methods"""
+
+    def setUp(self):
+        """Create a `RecordFile` on a scratch path"""
+        self.path = "test_records.jsonl"
+        self.records = RecordFile(self.path, get_codec("json"))
+
+    def tearDown(self):
+        """Close and remove the scratch file"""
+        self.records.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_missing_file(self):
+        """Tests `index` raises when there is no file"""
+        with self.assertRaises(FileNotFoundError):
+            self.records.index()
+
+    def test_write_read(self):
+        """Tests records written can be read back one at a time"""
+        data = {"User.1": {"id": "1"}, "City.2": {"id": "2", "name": "é"}}
+        index = self.records.write(
+            (key, json.dumps(value, ensure_ascii=False).encode('utf-8'))
+            for key, value in data.items())
+        self.assertEqual(list(index), list(data))
+        self.assertEqual(self.records.index(), index)
+        for key, value in data.items():
+            self.assertEqual(json.loads(self.records.read(*index[key])),
+                             value)
+        with open(self.path, 'r', encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(json.loads(lines[1]), data["City.2"])
+
+    def test_empty(self):
+        """Tests a file without records has an empty index"""
+        self.assertEqual(self.records.write([]), {})
+        self.assertEqual(self.records.index(), {})
+
+    def test_rewrite_while_reading(self):
+        """Tests the records of the current file can feed a rewrite"""
+        index = self.records.write([("A.1", b'{"id": "1"}')])
+        index = self.records.write(
+            [("A.1", self.records.read(*index["A.1"])),
+             ("A.2", b'{"id": "2"}')])
+        self.assertEqual(self.records.read(*index["A.1"]), b'{"id": "1"}')
+        self.assertEqual(self.records.read(*index["A.2"]), b'{"id": "2"}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+"""
+Test cases for `models.engine.spatial_index` and the `near` method of
+`FileStorage`
+"""
+from models.engine import spatial_index
+from models.engine.file_storage import FileStorage
+from models.engine.spatial_index import SpatialIndex, distances
+from models.place import Place
+from models.user import User
+from models import storage
+import random
+from types import SimpleNamespace
+import unittest
+from unittest.mock import patch
+
+
+class Point(SimpleNamespace):
+    """A stand-in for a place, with `latitude` and `longitude`"""
+    pass
+
+
+class TestSpatialIndex(unittest.TestCase):
+    """Tests for the `SpatialIndex` class and `distances`"""
+
+    def test_distances(self):
+        """Tests great-circle distances between known points"""
+        paris, london = (48.8566, 2.3522), (51.5074, -0.1278)
+        found = distances(*paris, [london, paris, (-48.8566, -177.6478)])
+        self.assertAlmostEqual(found[0], 343.6, delta=0.5)
+        self.assertAlmostEqual(found[1], 0)
+        self.assertAlmostEqual(found[2], 20015.1, delta=0.5)
+
+    def brute(self, points, lat, lon, radius):
+        """`list`: returns the `(distance, key)` pairs of `points` within
+        `radius` of the point at `lat`, `lon`, nearest first"""
+        found = distances(lat, lon, list(points.values()))
+        return sorted((distance, key)
+                      for distance, key in zip(found, points)
+                      if distance <= radius)
+
+    def test_near(self):
+        """Tests searches anywhere, across the antimeridian and around the
+        poles, find the same points as measuring the distance to all"""
+        rng = random.Random(0)
+        points = {}
+        index = SpatialIndex("Point")
+        for i in range(3000):
+            if i % 3:
+                lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            else:
+                lat = rng.choice([89.5, -89.5, 0, 45])
+                lat = max(-90, min(90, lat + rng.uniform(-1, 1)))
+                lon = rng.choice([-180, 179.9, 0]) + rng.uniform(-1, 1)
+            key = "Point.{}".format(i)
+            points[key] = (lat, lon)
+            index.update(key, Point(latitude=lat, longitude=lon))
+        with patch.object(spatial_index, 'numpy', None):
+            for i in range(100):
+                lat, lon = rng.choice([
+                    (rng.uniform(-90, 90), rng.uniform(-180, 180)),
+                    (rng.choice([90, -90, 89.9]), rng.uniform(-180, 180)),
+                    (rng.uniform(-60, 60), rng.choice([-180, 180]))])
+                radius = rng.choice([0, 10, 100, 500, 3000, 30000])
+                expected = self.brute(points, lat, lon, radius)
+                self.assertEqual(
+                    [key for distance, key in index.near(lat, lon, radius)],
+                    [key for distance, key in expected])
+                self.assertEqual(index.near(lat, lon, radius, 3),
+                                 expected[:3])
+
+    @unittest.skipIf(spatial_index.numpy is None, "NumPy is not installed")
+    def test_near_numpy(self):
+        """Tests NumPy finds the same points as plain Python"""
+        rng = random.Random(1)
+        index = SpatialIndex("Point")
+        for i in range(2000):
+            index.update("Point.{}".format(i), Point(
+                latitude=rng.uniform(40, 50), longitude=rng.uniform(0, 10)))
+        for limit in (None, 0, 5):
+            found = index.near(45, 5, 200, limit)
+            with patch.object(spatial_index, 'numpy', None):
+                expected = index.near(45, 5, 200, limit)
+            self.assertEqual([key for distance, key in found],
+                             [key for distance, key in expected])
+
+    def test_update(self):
+        """Tests moved, removed and invalid points"""
+        index = SpatialIndex("Point")
+        point = Point(latitude=10, longitude=10)
+        index.update("Point.1", point)
+        index.update("Point.2", Point(latitude=10.01, longitude=10))
+        index.update("User.1", User())
+        for lat, lon in ((None, 1), ("10", 10), (91, 0), (0, float("nan")),
+                         (True, 0)):
+            index.update("Point.x", Point(latitude=lat, longitude=lon))
+        index.update("Point.y", Point())
+        self.assertEqual(len(index), 2)
+        point.latitude = -10
+        index.update("Point.1", point)
+        self.assertEqual([key for distance, key in index.near(10, 10, 5)],
+                         ["Point.2"])
+        self.assertEqual([key for distance, key in index.near(-10, 10, 5)],
+                         ["Point.1"])
+        index.remove("Point.1")
+        index.remove("Point.z")
+        self.assertEqual(index.near(-10, 10, 5), [])
+        self.assertEqual(len(index), 1)
+
+    def test_invalid(self):
+        """Tests points, radiuses and limits out of range raise"""
+        index = SpatialIndex()
+        for args in ((91, 0, 1), (0, float("inf"), 1), ("0", 0, 1),
+                     (0, 0, -1), (0, 0, float("nan")), (0, 0, 1, -1)):
+            with self.assertRaises(ValueError):
+                index.near(*args)
+
+
+class TestFileStorageNear(unittest.TestCase):
+    """Tests for the `near` method of `FileStorage`"""
+
+    def setUp(self):
+        """Create places along the equator, 0.1 degree apart"""
+        storage._FileStorage__objects = {}
+        self.places = []
+        for i in range(10):
+            place = Place()
+            place.name = "Place {}".format(i)
+            place.latitude = 0.0
+            place.longitude = i / 10
+            self.places.append(place)
+
+    def tearDown(self):
+        """Reset FileStorage data"""
+        storage._FileStorage__objects = {}
+        storage.save()
+
+    def test_near(self):
+        """Tests places are found nearest first, up to the limit"""
+        self.assertEqual(storage.near(0, 0.22, 25),
+                         [self.places[i] for i in (2, 3, 1, 4, 0)])
+        self.assertEqual(storage.near(0, 0.22, 25, 2), self.places[2:4])
+        self.assertEqual(storage.near(10, 0, 100), [])
+        with self.assertRaises(ValueError):
+            storage.near(0, 0, -1)
+
+    def test_maintained(self):
+        """Tests the index follows new, moved and deleted places"""
+        storage.near(0, 0, 1)
+        place = Place()
+        place.latitude = 45.0
+        place.longitude = 0.0
+        self.places[1].latitude = 45.01
+        storage.delete(self.places[2])
+        self.places[3].longitude = "far"
+        unset = Place()
+        unset.longitude = 0.3
+        self.assertEqual(storage.near(45, 0, 10), [place, self.places[1]])
+        self.assertEqual(storage.near(0, 0.3, 12), [self.places[4]])
+        self.assertEqual(storage.near(0, 0, 1), [self.places[0]])
+
+    def test_reload(self):
+        """Tests the index is rebuilt on reload, eager or lazy"""
+        storage.near(0, 0, 1)
+        storage.save()
+        for lazy in (False, True):
+            FileStorage._FileStorage__lazy = lazy
+            try:
+                storage._FileStorage__objects = {}
+                storage.reload()
+                self.assertEqual([p.id for p in storage.near(0, 0.9, 12)],
+                                 [self.places[9].id, self.places[8].id])
+            finally:
+                FileStorage._FileStorage__lazy = False
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+#!/usr/bin/python3
+"""
+Test cases for `models.engine.text_index` and the `search` method of
+`FileStorage`
+"""
+from models.engine import text_index
+from models.engine.file_storage import FileStorage
+from models.engine.text_index import InvertedIndex, TextIndex, tokenize
+from models.place import Place
+from models.review import Review
+from models.user import User
+from models import storage
+from math import log
+import random
+from types import SimpleNamespace
+import unittest
+from unittest.mock import patch
+
+
+class TestInvertedIndex(unittest.TestCase):
+    """Tests for the `InvertedIndex` class"""
+
+    def test_tokenize(self):
+        """Tests text is split into casefolded words"""
+        self.assertEqual(tokenize("Cozy, quiet   STUDIO! Straße n°5"),
+                         ["cozy", "quiet", "studio", "strasse", "n", "5"])
+        self.assertEqual(tokenize(" - "), [])
+
+    def bm25(self, texts, words):
+        """`list`: returns the `(score, key)` pairs of the `{key: text}`
+        dictionary `texts` matching `words`, computed from scratch"""
+        docs = {key: tokenize(text) for key, text in texts.items()}
+        average = sum(map(len, docs.values())) / len(docs)
+        scores = {}
+        for word in words:
+            found = [key for key, doc in docs.items() if word in doc]
+            idf = log(1 + (len(docs) - len(found) + 0.5) / (len(found) + 0.5))
+            for key in found:
+                tf = docs[key].count(word)
+                scores[key] = scores.get(key, 0) + idf * tf * 2.2 / (
+                    tf + 1.2 * (0.25 + 0.75 * len(docs[key]) / average))
+        return sorted(((score, key) for key, score in scores.items()),
+                      key=lambda pair: (-pair[0], pair[1]))
+
+    def test_search(self):
+        """Tests results are ranked by BM25, through additions, changes and
+        removals"""
+        rng = random.Random(0)
+        vocabulary = ["w{}".format(i) for i in range(30)]
+        texts = {}
+        index = InvertedIndex(("text",))
+        for step in range(600):
+            key = "Review.{}".format(rng.randrange(80))
+            if texts and rng.random() < 0.2:
+                texts.pop(key, None)
+                index.remove(key)
+            else:
+                texts[key] = " ".join(rng.choice(vocabulary[:rng.randint(
+                    1, 30)]) for i in range(rng.randint(0, 12)))
+                index.update(key, SimpleNamespace(text=texts[key]))
+            if step % 50 == 0:
+                words = rng.sample(vocabulary, 2)
+                found = index.search(" ".join(words))
+                expected = self.bm25(texts, words)
+                self.assertEqual([key for score, key in found],
+                                 [key for score, key in expected])
+                for pair, other in zip(found, expected):
+                    self.assertAlmostEqual(pair[0], other[0])
+                self.assertEqual(index.search(" ".join(words), 3),
+                                 found[:3])
+        self.assertEqual(len(index), len(texts))
+
+    def test_fields(self):
+        """Tests the words of every field count, and values that are not
+        strings are skipped"""
+        index = InvertedIndex(("name", "description"))
+        index.update("Place.1", SimpleNamespace(name="Loft",
+                                                description="A quiet loft"))
+        index.update("Place.2", SimpleNamespace(name=5, description="quiet"))
+        index.update("Place.3", SimpleNamespace())
+        self.assertEqual([key for score, key in index.search("LOFT")],
+                         ["Place.1"])
+        self.assertEqual({key for score, key in index.search("quiet")},
+                         {"Place.1", "Place.2"})
+        self.assertEqual(index.search("5 missing"), [])
+        self.assertEqual(len(index), 3)
+
+    def test_prefix(self):
+        """Tests a word ending in "*" matches the words starting with it,
+        counted once per object"""
+        index = InvertedIndex(("text",))
+        index.update("Review.1", SimpleNamespace(text="clean and cleanest"))
+        index.update("Review.2", SimpleNamespace(text="cleaning"))
+        index.update("Review.3", SimpleNamespace(text="clear"))
+        index.update("Review.4", SimpleNamespace(text="unclean"))
+        self.assertEqual({key for score, key in index.search("clean*")},
+                         {"Review.1", "Review.2"})
+        self.assertEqual(len(index.search("cle*")), 3)
+        self.assertEqual(index.search("clean"), index.search("clean clean"))
+        index.remove("Review.2")
+        self.assertEqual([key for score, key in index.search("cleani*")],
+                         [])
+
+    def test_unchanged(self):
+        """Tests objects whose texts did not change are not re-tokenized"""
+        index = InvertedIndex(("text",))
+        review = SimpleNamespace(text="great view")
+        index.update("Review.1", review)
+        with patch.object(text_index, 'tokenize',
+                          wraps=tokenize) as split:
+            index.update("Review.1", review)
+            split.assert_not_called()
+            review.text = "poor view"
+            index.update("Review.1", review)
+            self.assertEqual(split.call_count, 2)
+            split.assert_called_with("poor view")
+        self.assertEqual(index.search("great"), [])
+        self.assertEqual(len(index.search("poor")), 1)
+
+
+class TestFileStorageSearch(unittest.TestCase):
+    """Tests for the `search` method of `FileStorage`"""
+
+    def setUp(self):
+        """Create places and reviews"""
+        storage._FileStorage__objects = {}
+        self.places = []
+        for name, description in (("Sea loft", "Quiet loft by the sea"),
+                                  ("City studio", "Loud but central"),
+                                  ("Farm", "Quiet farm, far from the city")):
+            place = Place()
+            place.name = name
+            place.description = description
+            self.places.append(place)
+        self.review = Review()
+        self.review.text = "Quiet and clean"
+
+    def tearDown(self):
+        """Reset FileStorage data"""
+        storage._FileStorage__objects = {}
+        storage.save()
+
+    def test_search(self):
+        """Tests the best matches come first, up to the limit"""
+        self.assertEqual(storage.search(Place, "loft"), self.places[:1])
+        self.assertEqual(storage.search("Place", "quiet city"),
+                         [self.places[2], self.places[1], self.places[0]])
+        self.assertEqual(storage.search(Place, "quiet city", 1),
+                         [self.places[2]])
+        self.assertEqual(storage.search(Review, "QUIET"), [self.review])
+        self.assertEqual(storage.search(Place, "cent*"), [self.places[1]])
+        with self.assertRaises(ValueError):
+            storage.search(User, "quiet")
+
+    def test_maintained(self):
+        """Tests the index follows new, changed and deleted objects"""
+        storage.search(Place, "loft")
+        place = Place()
+        place.description = "Loft with a garden"
+        self.places[0].description = "By the sea"
+        self.places[0].name = "Sea house"
+        storage.delete(self.places[2])
+        self.assertEqual(storage.search(Place, "loft"), [place])
+        self.assertEqual(storage.search(Place, "quiet farm"), [])
+
+    def test_reload(self):
+        """Tests the index is rebuilt on reload, eager or lazy"""
+        storage.search(Place, "loft")
+        storage.save()
+        for lazy in (False, True):
+            FileStorage._FileStorage__lazy = lazy
+            try:
+                storage._FileStorage__objects = {}
+                storage.reload()
+                self.assertEqual([p.id for p in storage.search(Place,
+                                                               "farm")],
+                                 [self.places[2].id])
+            finally:
+                FileStorage._FileStorage__lazy = False
+
+    def test_text_index(self):
+        """Tests indexes are only built for the classes searched"""
+        index = TextIndex()
+        self.assertFalse(index)
+        index.build("Review", storage.all(Review))
+        self.assertTrue(index.built("Review"))
+        self.assertFalse(index.built("Place"))
+        self.assertTrue(index.watches("Review", "text"))
+        self.assertFalse(index.watches("Review", "rating"))
+        self.assertFalse(index.watches("Place"))
+
+
+if __name__ == '__main__':
+    unittest.main()
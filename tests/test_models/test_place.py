@@ -4,7 +4,9 @@
 """
 from models.base_model import BaseModel
 from models.place import Place
+from models.review import Review
 from datetime import datetime
+from sys import intern
 import time
 import uuid
 import unittest
@@ -164,6 +166,28 @@ class TestPlace(unittest.TestCase):
             obj_dict['updated_at'] = obj.updated_at.isoformat()
             self.assertEqual(obj.to_dict(), obj_dict)
 
+    def test_reviews(self):
+        """Tests `reviews` lists the reviews referencing the place"""
+        self.assertEqual(self.a.reviews, [])
+        review = Review()
+        review.place_id = self.a.id
+        self.assertEqual(self.a.reviews, [review])
+        self.assertEqual(self.b.reviews, [])
+        review.place_id = self.b.id
+        self.assertEqual(self.a.reviews, [])
+        self.assertEqual(self.b.reviews, [review])
+        self.assertNotIn('reviews', self.a.to_dict())
+
+    def test_amenity_ids(self):
+        """Tests the list of amenity ids assigned is kept, not copied"""
+        amenity_id = str(uuid.uuid4())
+        ids = [amenity_id[:18] + amenity_id[18:]]
+        self.a.amenity_ids = ids
+        ids.append(str(uuid.uuid4()))
+        self.assertIs(self.a.amenity_ids, ids)
+        self.assertEqual(len(self.a.amenity_ids), 2)
+        self.assertIs(ids[0], intern(amenity_id))
+
     def test_doc(self):
         """Tests presence of documentation"""
         self.assertIsNotNone(__import__('models.place').__doc__)